@@ -9,6 +9,7 @@ from opentrons.broker import publish, subscribe
 from opentrons.containers import get_container, location_to_list
 from opentrons.containers.placeable import Module as ModulePlaceable
 from opentrons.commands import tree, types
+from opentrons.drivers import serial_stats
 from opentrons.protocols import execute_protocol
 from opentrons import robot, modules
 
@@ -65,6 +66,11 @@ class Session(object):
         self.command_log = {}
         self.errors = []
 
+        # Expected seconds each command (by id) and the whole protocol take
+        # to run, from the motion time model of the driver while simulating
+        self.command_durations = {}
+        self.estimated_duration = None
+
         self._containers = []
         self._instruments = []
         self._modules = []
@@ -123,11 +129,17 @@ class Session(object):
         stack = []
         res = []
         commands = []
+        # delays are not sent to the driver while simulating
+        delays = [0.0]
 
         self._containers.clear()
         self._instruments.clear()
         self._modules.clear()
         self._interactions.clear()
+        self.command_durations.clear()
+
+        def estimated_time():
+            return robot._driver.estimated_time + delays[0]
 
         def on_command(message):
             payload = message['payload']
@@ -138,7 +150,7 @@ class Session(object):
             if message['$'] == 'before':
                 level = len(stack)
 
-                stack.append(message)
+                stack.append((len(res), estimated_time()))
                 commands.append(payload)
 
                 res.append(
@@ -146,10 +158,15 @@ class Session(object):
                         'level': level,
                         'description': description,
                         'id': len(res)})
+                if message['name'] == types.DELAY:
+                    delays[0] += _delay_seconds(payload)
             else:
-                stack.pop()
+                command_id, start = stack.pop()
+                self.command_durations[command_id] = round(
+                    estimated_time() - start, 3)
 
         unsubscribe = subscribe(types.COMMAND, on_command)
+        protocol_start = estimated_time()
 
         try:
             # ensure actual pipettes are cached before driver is disconnected
@@ -168,6 +185,8 @@ class Session(object):
             # think that it holds a pipette model that it actually does not
             robot.connect()
             unsubscribe()
+            self.estimated_duration = round(
+                estimated_time() - protocol_start, 3)
 
             instruments, containers, modules, interactions = _accumulate(
                 [_get_labware(command) for command in commands])
@@ -249,6 +268,7 @@ class Session(object):
             raise e
         finally:
             _unsubscribe()
+            serial_stats.log_stats()
 
         return self
 
@@ -316,6 +336,10 @@ class Session(object):
         robot.home_z()
 
 
+def _delay_seconds(payload):
+    return payload.get('minutes', 0) * 60 + payload.get('seconds', 0)
+
+
 def _accumulate(iterable):
     return reduce(
         lambda x, y: tuple([x + y for x, y in zip(x, y)]),
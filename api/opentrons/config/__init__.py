@@ -34,6 +34,9 @@ backup_robot_conf = '/etc/robot-data'
 backup_labware_def = '/etc/labware'
 index_filename = 'index.json'
 
+# Parsed index files by path, with the file_stamp they were read at
+_index_cache = {}
+
 
 def settings_dir():
     """
@@ -67,15 +70,37 @@ def settings_dir():
     return res
 
 
+def file_stamp(path: str):
+    """
+    Returns a value that changes whenever the file at `path` is written,
+    created or deleted, to tell if a copy read from it is still current
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
 def get_config_index() -> dict:
     """
     Load the config index file from the settings directory. The `settings_dir`
-    function should guarantee that this file exists.
+    function should guarantee that this file exists. The parsed index is
+    cached until the file changes, so callers must not modify it.
     :return: the contents of the the base config file
     """
-    rewrite_needed = False
     base_path = settings_dir()
     file_path = os.path.join(base_path, index_filename)
+    stamp = file_stamp(file_path)
+    cached = _index_cache.get(file_path)
+    if cached is None or cached[0] != stamp:
+        res = _load_config_index(base_path, file_path)
+        cached = _index_cache[file_path] = (file_stamp(file_path), res)
+    return cached[1]
+
+
+def _load_config_index(base_path: str, file_path: str) -> dict:
+    rewrite_needed = False
     with open(file_path) as base_config_file:
         res = json.load(base_config_file)
     defaults = _generate_base_config()[1]
@@ -152,6 +177,8 @@ def _generate_base_config(skip_usb=False) -> (str, dict):
                 usb_settings_dir, 'user-definitions'),
             'offsetDir': os.path.join(usb_settings_dir, 'offsets')
         },
+        'labwareBundleFile': os.path.join(
+            usb_settings_dir, 'labware-bundle.bin'),
         'pipetteConfigFile': os.path.join(
             usb_settings_dir, 'pipetteData.json'),
         'featureFlagFile': os.path.join(
@@ -170,6 +197,7 @@ def _generate_base_config(skip_usb=False) -> (str, dict):
             'offsetDir': os.path.join(
                 resin_ot_data_dir, 'labware', 'offsets')
         },
+        'labwareBundleFile': '/etc/labware-bundle.bin',
         'pipetteConfigFile': '/etc/robot-data/pipette-config.json',
         'featureFlagFile': os.path.join(resin_settings_dir, 'settings.json'),
         'deckCalibrationFile': os.path.join(
@@ -208,6 +236,7 @@ def _generate_base_config(skip_usb=False) -> (str, dict):
 
 
 def write_base_config(path: str, config_data: dict):
+    _index_cache.pop(os.path.join(path, index_filename), None)
     try:
         os.makedirs(path, exist_ok=True)
         with open(os.path.join(path, index_filename), 'w') as base_f:
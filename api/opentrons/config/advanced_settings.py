@@ -1,7 +1,7 @@
 import json
 import logging
 from copy import copy
-from opentrons.config import get_config_index
+from opentrons.config import get_config_index, file_stamp
 
 log = logging.getLogger(__name__)
 
@@ -50,17 +50,32 @@ settings = [
         old_id='disable-home-on-boot',
         title='Disable home on boot',
         description='Prevent robot from homing motors on boot'
+    ),
+    Setting(
+        _id='streamGcode',
+        title='Stream motion commands',
+        description='Send several moves to the motor controller at once'
+                    ' rather than waiting for each move to finish'
+    ),
+    Setting(
+        _id='asyncSerialIO',
+        title='Asynchronous serial I/O',
+        description='Read responses from the motor controller and modules'
+                    ' on a shared event loop as soon as they arrive'
     )
 ]
 
 settings_by_id = {s.id: s for s in settings}
 settings_by_old_id = {s.old_id: s for s in settings}
 
+# Parsed settings files by path, with the file_stamp they were read at
+_settings_cache = {}
+
 
 def get_adv_setting(_id: str) -> bool:
     _id = _clean_id(_id)
-    s = get_all_adv_settings()
-    return s.get(_id).get('value')
+    settings_file = get_config_index().get('featureFlagFile')
+    return _cached_settings(settings_file)[_id]
 
 
 def get_all_adv_settings() -> dict:
@@ -70,7 +85,7 @@ def get_all_adv_settings() -> dict:
     """
     settings_file = get_config_index().get('featureFlagFile')
 
-    values = _read_settings_file(settings_file)
+    values = dict(_cached_settings(settings_file))
     for key, value in values.items():
         s = copy(settings_by_id[key].__dict__)
         s.pop('old_id')
@@ -85,6 +100,7 @@ def set_adv_setting(_id: str, value):
     s = _read_settings_file(settings_file)
     s[_id] = value
     _write_settings_file(s, settings_file)
+    _settings_cache.pop(settings_file, None)
 
 
 def _clean_id(_id: str) -> str:
@@ -102,6 +118,21 @@ def _read_json_file(path: str) -> dict:
     return data
 
 
+def _cached_settings(settings_file: str) -> dict:
+    """
+    The result of `_read_settings_file`, only read again once the file has
+    changed on disk. Must not be modified
+    """
+    stamp = file_stamp(settings_file)
+    cached = _settings_cache.get(settings_file)
+    if cached is None or cached[0] != stamp:
+        values = _read_settings_file(settings_file)
+        # reading may have rewritten the file to migrate old keys
+        cached = (file_stamp(settings_file), values)
+        _settings_cache[settings_file] = cached
+    return cached[1]
+
+
 def _read_settings_file(settings_file: str) -> dict:
     """
     Read the settings file, which is a json object with settings IDs as keys
@@ -21,3 +21,11 @@ def dots_deck_type():
 
 def disable_home_on_boot():
     return advs.get_adv_setting('disableHomeOnBoot')
+
+
+def stream_gcode():
+    return advs.get_adv_setting('streamGcode')
+
+
+def async_serial_io():
+    return advs.get_adv_setting('asyncSerialIO')
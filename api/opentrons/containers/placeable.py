@@ -5,7 +5,11 @@ import re
 import functools
 
 from collections import OrderedDict
+from collections.abc import Sequence
 from itertools import chain
+from types import MappingProxyType
+
+import numpy as np
 
 from opentrons.util.vector import Vector
 from opentrons.config import feature_flags as ff
@@ -80,6 +84,68 @@ def humanize_location(location):
     return repr(well)
 
 
+def normalize_properties(properties):
+    """
+    Fills in the width, length and height of :properties: in place
+    """
+    if 'radius' in properties:
+        properties['width'] = properties['radius'] * 2
+        properties['length'] = properties['radius'] * 2
+
+    if 'diameter' in properties:
+        properties['width'] = properties['diameter']
+        properties['length'] = properties['diameter']
+
+    if 'depth' in properties:
+        properties['height'] = properties['depth']
+
+    for dimension in ['length', 'width', 'height']:
+        if dimension not in properties:
+            properties[dimension] = 0
+    return properties
+
+
+class ChildView(Sequence):
+    """
+    Read-only view over a slice of a Placeable's children, so slicing a
+    container does not copy its wells
+    """
+    __slots__ = ('_array', '_range')
+
+    def __init__(self, array, s=slice(None)):
+        self._array = array
+        self._range = range(len(array))[s]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            view = ChildView.__new__(ChildView)
+            view._array = self._array
+            view._range = self._range[index]
+            return view
+        return self._array[self._range[index]]
+
+    def __iter__(self):
+        array = self._array
+        for index in self._range:
+            yield array[index]
+
+    def __len__(self):
+        return len(self._range)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _layout_changed():
+    """
+    Invalidates the absolute coordinates memoized by every :Placeable:
+    """
+    Placeable._layout_version += 1
+
+
 class Placeable(object):
     """
     This class represents every item on the deck:
@@ -91,6 +157,10 @@ class Placeable(object):
     * calculate coordinates in different reference systems
     """
 
+    # Bumped whenever a placeable moves or is added to a new parent, which
+    # is rare once a protocol is set up (see :coordinates:)
+    _layout_version = 0
+
     def __init__(self, parent=None, properties=None):
         """
         Initiaize placeable.
@@ -101,32 +171,21 @@ class Placeable(object):
         """
 
         # For performance optimization reasons we are tracking children
-        # by name and by reference
+        # by name and by reference, plus an array of children and a map
+        # of names to their index in it
         self.children_by_name = OrderedDict()
         self.children_by_reference = OrderedDict()
+        self._children = []
+        self._child_positions = {}
         self._coordinates = Vector(0, 0, 0)
+        self._absolute = None
 
         self.parent = parent
 
         if properties is None:
             properties = {}
 
-        self.properties = properties
-
-        if 'radius' in properties:
-            properties['width'] = properties['radius'] * 2
-            properties['length'] = properties['radius'] * 2
-
-        if 'diameter' in properties:
-            properties['width'] = properties['diameter']
-            properties['length'] = properties['diameter']
-
-        if 'depth' in properties:
-            properties['height'] = properties['depth']
-
-        for dimension in ['length', 'width', 'height']:
-            if dimension not in properties:
-                properties[dimension] = 0
+        self.properties = normalize_properties(properties)
 
     def __getitem__(self, name):
         """
@@ -136,7 +195,7 @@ class Placeable(object):
         if isinstance(name, slice):
             return self.get_children_from_slice(name)
         elif isinstance(name, int):
-            return self.get_children_list()[name]
+            return self._child_array()[name]
         elif isinstance(name, str):
             return self.get_child_by_name(name)
         else:
@@ -160,10 +219,10 @@ class Placeable(object):
         )
 
     def __iter__(self):
-        return iter(self.get_children_list())
+        return iter(self._child_array())
 
     def __len__(self):
-        return len(self.get_children_list())
+        return len(self._child_array())
 
     def __bool__(self):
         return True
@@ -176,28 +235,27 @@ class Placeable(object):
         if not self.get_parent():
             raise Exception('Must have a parent')
 
-        children = self.parent.get_children_list()
-        my_loc = children.index(self)
-        return children[my_loc + 1]
+        my_loc = self.parent._child_position(self.get_name())
+        return self.parent._child_array()[my_loc + 1]
 
     def iter(self):
         """
         Returns an iterable built from this Placeable's children list
         """
-        return iter(self.get_children_list())
+        return iter(self._child_array())
 
     def chain(self, *args):
         """
         Returns an itertools.chain built from this Placeable's children list
         and appending any passed lists with *args
         """
-        return itertools.chain(self.get_children_list(), *args)
+        return itertools.chain(self._child_array(), *args)
 
     def cycle(self):
         """
         Returns an itertools.cycle from this Placeable's children list
         """
-        return itertools.cycle(self.get_children_list())
+        return itertools.cycle(self._child_array())
 
     def get_name(self):
         """
@@ -218,7 +276,19 @@ class Placeable(object):
         """
         Returns the list of children in the order they were added
         """
-        return list(self.children_by_reference.keys())
+        return list(self._child_array())
+
+    def _child_array(self):
+        """
+        Returns the children in order, without copying. Must not be modified
+        """
+        return self._children
+
+    def _child_position(self, name):
+        """
+        Returns the index of the child called :name: in :_child_array:
+        """
+        return self._child_positions[name]
 
     def get_path(self, reference=None):
         """
@@ -246,12 +316,33 @@ class Placeable(object):
             raise Exception(
                 'Reference {} is not in Ancestry'.format(reference))
 
+    @property
+    def _coordinates(self):
+        return self._position
+
+    @_coordinates.setter
+    def _coordinates(self, coordinates):
+        self._position = coordinates
+        _layout_changed()
+
     def coordinates(self, reference=None):
         """
         Returns the coordinates of a :Placeable: relative to :reference:
+
+        Coordinates relative to the root are memoized, and built from the
+        memoized coordinates of the parent, until anything moves
         """
-        coordinates = [i._coordinates for i in self.get_trace(reference)]
-        return functools.reduce(lambda a, b: a + b, coordinates)
+        if reference is not None:
+            coordinates = [i._coordinates for i in self.get_trace(reference)]
+            return functools.reduce(lambda a, b: a + b, coordinates)
+
+        version = Placeable._layout_version
+        if self._absolute is None or self._absolute[0] != version:
+            res = self._coordinates
+            if self.parent is not None:
+                res = res + self.parent.coordinates()
+            self._absolute = (version, res)
+        return self._absolute[1]
 
     def add(self, child, name=None, coordinates=None):
         """
@@ -271,8 +362,33 @@ class Placeable(object):
         if coordinates:
             child._coordinates = Vector(coordinates)
         child.parent = self
+        _layout_changed()
         self.children_by_name[name] = child
         self.children_by_reference[child] = name
+        self._child_positions[name] = len(self._children)
+        self._children.append(child)
+
+    def add_wells(self, wells):
+        """
+        Adds wells from an ordered mapping of names to dicts of x, y, z and
+        well properties. Their geometry is stored in a single :WellArray:
+        """
+        names = list(wells)
+        array = WellArray.from_dicts([wells[name] for name in names])
+        if array is None:
+            for name in names:
+                properties = dict(wells[name])
+                coordinates = tuple(properties.pop(axis) for axis in 'xyz')
+                self.add(Well(properties=properties), name, coordinates)
+            return
+        self.add_well_array(names, array)
+
+    def add_well_array(self, names, array):
+        """
+        Adds a well backed by each row of :WellArray: :array:, in order
+        """
+        for index, name in enumerate(names):
+            self.add(Well.from_array(array, index), name)
 
     def get_deck(self):
         """
@@ -313,8 +429,10 @@ class Placeable(object):
         """
         Retrieves child's name by index
         """
-        return self.get_children_list().index(
-            self.get_child_by_name(name))
+        try:
+            return self._child_position(name)
+        except KeyError:
+            raise ValueError('{} is not a child of {}'.format(name, self))
 
     def get_children_from_slice(self, s):
         """
@@ -326,7 +444,7 @@ class Placeable(object):
         if isinstance(s.stop, str):
             s = slice(
                 s.start, self.get_index_from_name(s.stop), s.step)
-        return WellSeries(self.get_children_list()[s])
+        return WellSeries(ChildView(self._child_array(), s))
 
     def has_children(self):
         """
@@ -493,11 +611,143 @@ class Deck(Placeable):
         return container_instance in self.containers()
 
 
+class WellArray(object):
+    """
+    Geometry of the wells of a :Container: as NumPy columns with one row
+    per well: an (N, 3) array of coordinates and one array per property,
+    holding NaN where a well does not have that property
+    """
+    columns = (
+        'depth', 'diameter', 'radius', 'height', 'width', 'length',
+        'total-liquid-volume')
+
+    def __init__(self, coordinates, properties):
+        self.coordinates = coordinates
+        self.properties = properties
+
+    @classmethod
+    def from_dicts(cls, wells):
+        """
+        Builds the columns from dicts of x, y, z and well properties.
+        Returns *None* if a well has a property without a column
+        """
+        if not set().union(*wells) <= set(cls.columns + ('x', 'y', 'z')):
+            return None
+        coordinates = np.array(
+            [(well['x'], well['y'], well['z']) for well in wells])
+        assert coordinates.dtype.kind in 'iuf', 'coordinates must be numbers'
+        properties = {
+            name: np.array(
+                [well.get(name, np.nan) for well in wells], dtype=float)
+            for name in cls.columns}
+        return cls.from_columns(
+            coordinates.astype(float).reshape(-1, 3), properties)
+
+    @classmethod
+    def from_columns(cls, coordinates, properties):
+        """
+        Builds the array from an (N, 3) array of coordinates and a dict of
+        property columns as found in a definition, which it takes over
+        """
+        count = len(coordinates)
+        properties = {
+            name: properties.get(name, np.full(count, np.nan))
+            for name in cls.columns}
+
+        # the same as normalize_properties, a column at a time
+        def fill(column, values):
+            present = ~np.isnan(values)
+            properties[column][present] = values[present]
+
+        fill('width', properties['radius'] * 2)
+        fill('length', properties['radius'] * 2)
+        fill('width', properties['diameter'])
+        fill('length', properties['diameter'])
+        fill('height', properties['depth'])
+        for dimension in ['length', 'width', 'height']:
+            column = properties[dimension]
+            column[np.isnan(column)] = 0
+        return cls(coordinates, properties)
+
+    def row(self, index):
+        """
+        Returns the properties of one well as a :dict:
+        """
+        res = {}
+        for name, column in self.properties.items():
+            value = column[index].item()
+            if not math.isnan(value):
+                res[name] = value
+        return res
+
+
 class Well(Placeable):
     """
     Class representing a Well
+
+    Wells of a :Container: loaded from a labware definition keep their
+    coordinates and properties in a row of a :WellArray: shared with the
+    other wells (see :Placeable.add_wells:), so a well is only a handful
+    of slots rather than dicts and a :Vector: of its own
     """
-    pass
+    __slots__ = ('parent', '_array', '_index', '_properties', '_absolute')
+
+    # wells never have children
+    children_by_name = MappingProxyType(OrderedDict())
+    children_by_reference = MappingProxyType(OrderedDict())
+    _children = ()
+    _child_positions = MappingProxyType({})
+
+    def __init__(self, parent=None, properties=None):
+        self.parent = parent
+        self._array = WellArray(np.zeros((1, 3)), {})
+        self._index = 0
+        self._properties = normalize_properties(
+            {} if properties is None else properties)
+        self._absolute = None
+
+    @classmethod
+    def from_array(cls, array, index, parent=None):
+        """
+        Returns a well backed by row :index: of :array:
+        """
+        well = cls.__new__(cls)
+        well.parent = parent
+        well._array = array
+        well._index = index
+        # only built when asked for, see :properties:
+        well._properties = None
+        well._absolute = None
+        return well
+
+    @property
+    def _coordinates(self):
+        return Vector(*self._array.coordinates[self._index].tolist())
+
+    @_coordinates.setter
+    def _coordinates(self, coordinates):
+        self._array.coordinates[self._index] = tuple(coordinates)
+        _layout_changed()
+
+    @property
+    def properties(self):
+        if self._properties is None:
+            self._properties = self._array.row(self._index)
+        return self._properties
+
+    def _size(self, name):
+        if self._properties is None:
+            return self._array.properties[name][self._index].item()
+        return self._properties[name]
+
+    def x_size(self):
+        return self._size('width')
+
+    def y_size(self):
+        return self._size('length')
+
+    def z_size(self):
+        return self._size('height')
 
 
 class Slot(Placeable):
@@ -524,6 +774,7 @@ class Container(Placeable):
         self.grid = None
         self.grid_transposed = None
         self.ordering = None
+        self._ordered = None
 
     def invalidate_grid(self):
         """
@@ -679,11 +930,32 @@ class Container(Placeable):
         """
         return self.wells(*args, **kwargs)
 
-    def get_children_list(self):
-        if ff.split_labware_definitions():
-            return [self[i] for i in list(chain.from_iterable(self.ordering))]
-        else:
-            return super(Container, self).get_children_list()
+    def add(self, child, name=None, coordinates=None):
+        super(Container, self).add(child, name, coordinates)
+        self._ordered = None
+
+    def _child_array(self):
+        if not ff.split_labware_definitions():
+            return super(Container, self)._child_array()
+        return self._ordered_children()[0]
+
+    def _child_position(self, name):
+        if not ff.split_labware_definitions():
+            return super(Container, self)._child_position(name)
+        return self._ordered_children()[1][name]
+
+    def _ordered_children(self):
+        """
+        Children in the order of :ordering: and a map of their names to
+        indices, built once after the wells and ordering are set
+        """
+        if self._ordered is None or self._ordered[0] is not self.ordering:
+            names = list(chain.from_iterable(self.ordering))
+            self._ordered = (
+                self.ordering,
+                [self.get_child_by_name(name) for name in names],
+                {name: index for index, name in enumerate(names)})
+        return self._ordered[1:]
 
     def _parse_wells_to_and_length(self, *args, **kwargs):
         start = args[0] if len(args) else 0
@@ -691,12 +963,11 @@ class Container(Placeable):
         step = kwargs.get('step', 1)
         length = kwargs.get('length', 1)
 
-        wrapped_wells = [
-            w
-            for i in range(3)
-            for w in self.get_children_list()
-        ]
-        total_kids = len(self.get_children_list())
+        # index into the children as if they were repeated three times,
+        # without building that list
+        children = self._child_array()
+        total_kids = len(children)
+        wrapped_wells = _WrappedChildren(children, 3)
 
         if isinstance(start, str):
             start = self.get_index_from_name(start)
@@ -731,6 +1002,21 @@ class Container(Placeable):
             raise ValueError('Placeable.wells(x=, y=) expects ints')
 
 
+class _WrappedChildren(object):
+    """
+    The children repeated :times: times, only materialized when sliced
+    """
+    def __init__(self, children, times):
+        self.children = children
+        self.times = times
+
+    def __getitem__(self, s):
+        children = self.children
+        total = len(children)
+        indices = range(total * self.times)[s]
+        return [children[i % total] for i in indices]
+
+
 class WellSeries(Container):
     """
     :WellSeries: represents a series of wells to make
@@ -745,14 +1031,21 @@ class WellSeries(Container):
 
     def __init__(self, wells, name=None):
         if isinstance(wells, dict):
-            self.items = wells
+            self._items = wells
             self.values = list(wells.values())
         else:
-            self.items = {w.get_name(): w for w in wells}
+            # built on the first lookup by name, see :items:
+            self._items = None
             self.values = wells
         self.offset = 0
         self.name = name
 
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = {w.get_name(): w for w in self.values}
+        return self._items
+
     def set_offset(self, offset):
         """
         Set index of a well that will be used to mimic :Placeable:
@@ -777,6 +1070,15 @@ class WellSeries(Container):
             raise AttributeError()
         return getattr(self.values[self.offset], name)
 
+    @property
+    def _coordinates(self):
+        return self.values[self.offset]._coordinates
+
+    def coordinates(self, reference=None):
+        if reference is self:
+            return self._coordinates
+        return self.values[self.offset].coordinates(reference)
+
     def get_name(self):
         if self.name is None:
             return str(self)
@@ -791,5 +1093,15 @@ class WellSeries(Container):
     def get_children_list(self):
         return list(self.values)
 
+    def _child_array(self):
+        return self.values
+
+    def _child_position(self, name):
+        well = self.get_child_by_name(name)
+        for index, value in enumerate(self.values):
+            if value is well:
+                return index
+        raise KeyError(name)
+
     def get_child_by_name(self, name):
         return self.items.get(name)
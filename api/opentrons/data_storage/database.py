@@ -1,8 +1,12 @@
 # pylama:ignore=E252
 import sqlite3
+import contextlib
+import threading
 # import warnings
 from typing import List
-from opentrons.containers.placeable import Container, Well, Module
+from collections import OrderedDict
+from opentrons.containers.placeable import (
+    Container, Well, Module, normalize_properties)
 from opentrons.data_storage import database_queries as db_queries
 from opentrons.util import environment
 from opentrons.util.vector import Vector
@@ -19,9 +23,48 @@ database_path = environment.get_path('DATABASE_FILE')
 if not fflags.split_labware_definitions():
     log.debug("Database path: {}".format(database_path))
 
+_connection = None
+_connection_path = None
+_connection_lock = threading.RLock()
+
+# order of the ContainerWells columns after container_name
+_WELL_COLUMNS = (
+    'location', 'x', 'y', 'z', 'depth', 'volume', 'diameter', 'length',
+    'width')
+
 # ======================== Private Functions ======================== #
 
 
+@contextlib.contextmanager
+def _database():
+    """
+    Yields the connection to the database at `database_path`. It is opened
+    once (in WAL mode) and kept until the path changes, rather than opened
+    for every call; sqlite3 also caches the compiled statements of a
+    connection. Callers hold a lock while using it, so it can be shared
+    between threads
+    """
+    global _connection, _connection_path
+    with _connection_lock:
+        if _connection is None or _connection_path != database_path:
+            _close_connection()
+            conn = sqlite3.connect(database_path, check_same_thread=False)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.DatabaseError:
+                log.exception('Could not switch database to WAL mode:')
+            _connection, _connection_path = conn, database_path
+        yield _connection
+
+
+def _close_connection():
+    global _connection, _connection_path
+    with _connection_lock:
+        if _connection is not None:
+            _connection.close()
+        _connection, _connection_path = None, None
+
+
 def _parse_container_obj(container: Container):
     # Note: in the new labware system, container coordinates are always (0,0,0)
     return dict(zip('xyz', container._coordinates))
@@ -47,24 +90,31 @@ def _parse_well_obj(well: Well):
 
 
 def _create_container_obj_in_db(db, container: Container, container_name: str):
-    db_queries.create_container(
-        db, container_name, **_parse_container_obj(container)
-    )
-    for well in iter(container):
-        _create_well_obj_in_db(db, container_name, well)
+    _create_container_objs_in_db(db, [(container_name, container)])
+
+
+def _create_container_objs_in_db(db, containers):
+    container_rows = []
+    well_rows = []
+    for container_name, container in containers:
+        x, y, z = container._coordinates
+        container_rows.append((container_name, x, y, z))
+        well_rows.extend(
+            _well_row(container_name, well) for well in iter(container))
+    db_queries.create_containers_with_wells(db, container_rows, well_rows)
 
 
 def _load_container_object_from_db(db, container_name: str):
-    db_data = db_queries.get_container_by_name(db, container_name)
-    if not db_data:
+    rows = db_queries.get_container_with_wells(db, container_name)
+    if not rows:
         raise ValueError(
             "No container with name {} found in Containers database"
             .format(container_name)
         )
 
-    container_type, *rel_coords = db_data
-    wells = db_queries.get_wells_by_container_name(db, container_name)
-    if not wells:
+    container_type, *rel_coords = rows[0][:4]
+    wells = [row[4:] for row in rows]
+    if wells[0][0] is None:
         raise ResourceWarning(
             "No wells for container {} found in ContainerWells database"
             .format(container_name)
@@ -78,8 +128,8 @@ def _load_container_object_from_db(db, container_name: str):
     container.properties['type'] = container_type
     container._coordinates = Vector(rel_coords)
     log.debug("Loading {} with coords {}".format(rel_coords, container_type))
-    for well in wells:
-        container.add(*_load_well_object_from_db(db, well))
+    container.add_wells(OrderedDict(
+        _load_well_object_from_db(db, well) for well in wells))
     return container
 
 
@@ -99,11 +149,10 @@ def _delete_container_object_in_db(db, container_name: str):
     db_queries.delete_container(db, container_name)
 
 
-def _create_well_obj_in_db(db, container_name: str, well: Well):
+def _well_row(container_name: str, well: Well) -> tuple:
     well_data = _parse_well_obj(well)
-    db_queries.insert_well_into_db(
-        db_conn=db, container_name=container_name, **well_data
-    )
+    return (container_name,) + tuple(
+        well_data[column] for column in _WELL_COLUMNS)
 
 
 def _load_well_object_from_db(db, well_data):
@@ -114,14 +163,14 @@ def _load_well_object_from_db(db, well_data):
                  'diameter', 'length', 'width'],
                 [depth, volume, diameter, length, width])
     property_dict = {k: v for k, v in props if v}
-    well = Well(properties=property_dict)
+    sizes = normalize_properties(property_dict.copy())
     # subtract half the size, because
     # Placeable assigns X-Y to bottom-left corner,
     # but db assigns X-Y to well center
-    x -= (well.x_size() / 2)
-    y -= (well.y_size() / 2)
-    well_coordinates = (x, y, z)
-    return (well, location, well_coordinates)
+    x -= (sizes['width'] / 2)
+    y -= (sizes['length'] / 2)
+    property_dict.update(x=x, y=y, z=z)
+    return (location, property_dict)
 
 
 def _list_all_containers_by_name(db):
@@ -147,19 +196,9 @@ def _get_db_version(db):
 
 
 def _calculate_offset(labware: Container) -> dict:
-    new_definition = serializers.labware_to_json(labware)
-    base_definition = ldef.load_json(
-        new_definition['metadata']['name'], with_offset=False)
-    first_well = list(base_definition['wells'].keys())[0]
-    base_well = base_definition['wells'][first_well]
-    new_well = new_definition['wells'][first_well]
-
-    slot_coords = labware.parent.coordinates()
-
-    x, y, z = [
-        new_well[axis] - base_well[axis] - slot_coords[axis]
-        for axis in 'xyz'
-    ]
+    # wells keep the coordinates of the definition and the offset is only
+    # applied to the labware itself (see `load_labware`)
+    x, y, z = labware._coordinates
     log.debug("Calculated offset for {} in {}: {}".format(
         labware.get_name(), labware.get_parent(), (x, y, z)))
     return {'x': x, 'y': y, 'z': z}
@@ -168,12 +207,22 @@ def _calculate_offset(labware: Container) -> dict:
 
 # ======================== Public Functions ======================== #
 def save_new_container(container: Container, container_name: str) -> bool:
+    return save_new_containers([(container_name, container)])
+
+
+def save_new_containers(containers) -> bool:
+    """
+    Saves pairs of (container name, container) like `save_new_container`,
+    writing all of them to the database in a single transaction
+    """
     if fflags.split_labware_definitions():
         # warnings.warn('save_new_container is deprecated, please use save_labware')  # noqa
-        res = save_labware(container, container_name)
+        res = all([
+            save_labware(container, container_name)
+            for container_name, container in containers])
     else:
-        db_conn = sqlite3.connect(database_path)
-        _create_container_obj_in_db(db_conn, container, container_name)
+        with _database() as db_conn:
+            _create_container_objs_in_db(db_conn, containers)
         res = True  # old create fn does not return anything
     return res
 
@@ -188,14 +237,28 @@ def load_container(container_name: str) -> Container:
         # warnings.warn('save_new_container is deprecated, please use save_labware')  # noqa
         res = load_labware(container_name)
     else:
-        db_conn = sqlite3.connect(database_path)
-        res = _load_container_object_from_db(db_conn, container_name)
+        with _database() as db_conn:
+            res = _load_container_object_from_db(db_conn, container_name)
     return res
 
 
 def load_labware(labware_name: str) -> Container:
-    jdef = ldef.load_json(labware_name)
-    return serializers.json_to_labware(jdef)
+    """
+    Loads a labware with the wells of its definition and its calibrated
+    offset as the coordinates of the labware, so that calibrating it again
+    only moves the labware
+    """
+    bundled = ldef.load_bundled(labware_name, with_offset=False)
+    if bundled is not None:
+        labware = serializers.bundled_to_labware(bundled)
+    else:
+        labware = serializers.json_to_labware(
+            ldef.load_definition(labware_name))
+    offset = ldef.load_offset(labware_name)
+    if offset:
+        labware._coordinates = Vector(
+            offset['x'], offset['y'], offset['z'])
+    return labware
 
 
 def overwrite_container(container: Container) -> bool:
@@ -205,8 +268,8 @@ def overwrite_container(container: Container) -> bool:
     else:
         log.debug("Overwriting container definition: {}".format(
             container.get_type()))
-        db_conn = sqlite3.connect(database_path)
-        _update_container_object_in_db(db_conn, container)
+        with _database() as db_conn:
+            _update_container_object_in_db(db_conn, container)
         res = True  # old overwrite fn does not return anything
     return res
 
@@ -223,8 +286,8 @@ def delete_container(container_name) -> bool:
     if fflags.split_labware_definitions():
         raise NotImplementedError  # What should delete do in the new system?
     else:
-        db_conn = sqlite3.connect(database_path)
-        _delete_container_object_in_db(db_conn, container_name)
+        with _database() as db_conn:
+            _delete_container_object_in_db(db_conn, container_name)
         res = True  # old delete fn does not return anything
     return res
 
@@ -234,8 +297,8 @@ def list_all_containers() -> List[str]:
         # warnings.warn('list_all_containers is deprecated, please use list_all_labware')  # noqa
         res = list_all_labware()
     else:
-        db_conn = sqlite3.connect(database_path)
-        res = _list_all_containers_by_name(db_conn)
+        with _database() as db_conn:
+            res = _list_all_containers_by_name(db_conn)
     return res
 
 
@@ -247,8 +310,8 @@ def load_module(module_name: str) -> Container:
     if fflags.split_labware_definitions():
         raise NotImplementedError
     else:
-        db_conn = sqlite3.connect(database_path)
-        res = _load_module_dict_from_db(db_conn, module_name)
+        with _database() as db_conn:
+            res = _load_module_dict_from_db(db_conn, module_name)
     return res
 
 
@@ -258,6 +321,7 @@ def change_database(db_path: str):
         # warnings.warn('database operations no longer have an effect')
         pass
     database_path = db_path
+    _close_connection()
 
 
 def get_version():
@@ -265,25 +329,27 @@ def get_version():
     if fflags.split_labware_definitions():
         # warnings.warn('database operations no longer have an effect')
         pass
-    db_conn = sqlite3.connect(database_path)
-    return _get_db_version(db_conn)
+    with _database() as db_conn:
+        return _get_db_version(db_conn)
 
 
 def set_version(version):
     if fflags.split_labware_definitions():
         # warnings.warn('database operations no longer have an effect')
         pass
-    db_conn = sqlite3.connect(database_path)
-    db_queries.set_user_version(db_conn, version)
+    with _database() as db_conn:
+        db_queries.set_user_version(db_conn, version)
 
 
 def reset():
     """ Unmount and remove the sqlite database (used in robot reset) """
+    _close_connection()
     if os.path.exists(database_path):
         os.remove(database_path)
-    # Not an os.path.join because it is a suffix to the full filename
-    journal_path = database_path + '-journal'
-    if os.path.exists(journal_path):
-        os.remove(journal_path)
+    # Not os.path.joins because they are suffixes to the full filename
+    for suffix in ['-journal', '-wal', '-shm']:
+        journal_path = database_path + suffix
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
 
 # ======================== END Public Functions ======================== #
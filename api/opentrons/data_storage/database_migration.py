@@ -51,6 +51,7 @@ def migrate_containers_and_wells():
     load_all_containers_from_disk()
     print("Json container file load complete.")
     print("Starting migration...")
+    containers = []
     for container_name in list_container_names():
         print('migrating {} from json to database'.format(container_name))
         container = get_persisted_container(container_name)
@@ -61,7 +62,9 @@ def migrate_containers_and_wells():
                 container_name,
                 container._coordinates))
 
-        database.save_new_container(container, container_name)
+        containers.append((container_name, container))
+
+    database.save_new_containers(containers)
     print("Database migration complete!")
 
 
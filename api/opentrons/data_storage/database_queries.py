@@ -33,6 +33,18 @@ def create_container(db_conn, container_name, x, y, z):
         )
 
 
+def create_containers_with_wells(db_conn, containers, wells):
+    """
+    Inserts rows of (name, x, y, z) into Containers and rows of the
+    ContainerWells columns into ContainerWells in a single transaction
+    """
+    with db_conn:
+        db_conn.executemany(
+            'INSERT INTO Containers VALUES (?, ?, ?, ?)', containers)
+        db_conn.executemany(
+            'INSERT INTO ContainerWells VALUES (?,?,?,?,?,?,?,?,?,?)', wells)
+
+
 def get_container_by_name(db_conn, container_name):
     with db_conn:
         cursor = db_conn.cursor()
@@ -43,6 +55,27 @@ def get_container_by_name(db_conn, container_name):
         return cursor.fetchone()
 
 
+def get_container_with_wells(db_conn, container_name):
+    """
+    Returns one row per well of the container, each the container columns
+    followed by the well columns. A container without wells is a single
+    row with NULL well columns, and an unknown container no rows
+    """
+    with db_conn:
+        cursor = db_conn.cursor()
+        cursor.execute(
+            '''
+            SELECT Containers.*, ContainerWells.* from Containers
+            LEFT JOIN ContainerWells
+            ON ContainerWells.container_name = Containers.name
+            WHERE Containers.name=?
+            ORDER BY ContainerWells.rowid
+            ''',
+            (container_name,)
+        )
+        return cursor.fetchall()
+
+
 def update_container(db_conn, container_name, x, y, z):
     with db_conn:
         db_conn.execute(
@@ -69,25 +102,6 @@ def delete_container(db_conn, container_name):
 
 
 # ------------- Well Functions -------------#
-def insert_well_into_db(db_conn, container_name, location, x, y, z,
-                        depth, volume, diameter, length, width):
-    with db_conn:
-        db_conn.execute(
-            'INSERT INTO ContainerWells VALUES (?,?,?,?,?,?,?,?,?,?)',
-            (
-                container_name,
-                location,
-                x,
-                y,
-                z,
-                depth,
-                volume,
-                diameter,
-                length,
-                width,)
-        )
-
-
 def get_wells_by_container_name(db_conn, container_name):
     with db_conn:
         cursor = db_conn.cursor()
@@ -0,0 +1,199 @@
+"""
+Packs labware definitions into one binary bundle that can be memory-mapped
+and read without parsing a JSON file per labware.
+
+Layout of a bundle file:
+- `MAGIC` (8 bytes), then the length of the index as a little-endian uint64
+- the index: UTF-8 JSON with the property `columns` stored for every well
+  and, for every labware, its metadata, ordering, well names and the range
+  of rows holding its wells
+- zero padding up to a multiple of 8 bytes
+- one little-endian float64 row per well: x, y, z and then the `columns`,
+  with NaN where a well does not have that property
+
+Build a bundle from a directory of definitions with:
+
+    python labware_bundle.py <definition dir> <bundle file>
+
+This module only depends on the standard library and numpy, so that it can
+run as a script while building an image.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b'OTLBND01'
+COLUMNS = (
+    'depth', 'diameter', 'radius', 'height', 'width', 'length',
+    'total-liquid-volume')
+_HEADER = struct.Struct('<8sQ')
+_AXES = ('x', 'y', 'z')
+
+
+class BundledLabware(object):
+    """
+    One labware read from a bundle. The arrays are private copies, so they
+    can be modified (e.g. to apply an offset)
+    """
+    def __init__(self, metadata, ordering, well_names, coordinates,
+                 properties):
+        self.metadata = metadata
+        self.ordering = ordering
+        self.well_names = well_names
+        self.coordinates = coordinates
+        self.properties = properties
+
+    def to_json(self) -> dict:
+        """
+        Returns the definition in the format of the JSON files
+        """
+        columns = [
+            (name, column.tolist())
+            for name, column in self.properties.items()]
+        wells = {}
+        for index, (name, xyz) in enumerate(
+                zip(self.well_names, self.coordinates.tolist())):
+            well = {
+                prop: column[index] for prop, column in columns
+                if column[index] == column[index]}  # skip NaN
+            well.update(zip(_AXES, xyz))
+            wells[name] = well
+        return {
+            'metadata': json.loads(json.dumps(self.metadata)),
+            'ordering': [list(column) for column in self.ordering],
+            'wells': wells}
+
+
+class LabwareBundle(object):
+    def __init__(self, buffer, index, rows):
+        self._buffer = buffer
+        self._index = index
+        self._rows = rows
+
+    @classmethod
+    def open(cls, path: str):
+        """
+        Memory-maps the bundle at path. Returns None if there is no valid
+        bundle there
+        """
+        try:
+            with open(path, 'rb') as bundle_file:
+                buffer = mmap.mmap(
+                    bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(buffer) < _HEADER.size:
+            return None
+        magic, index_length = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            return None
+        start = _HEADER.size
+        index = json.loads(
+            buffer[start:start + index_length].decode('utf-8'))
+        width = len(_AXES) + len(index['columns'])
+        rows = np.frombuffer(
+            buffer,
+            dtype='<f8',
+            offset=_align(start + index_length)).reshape(-1, width)
+        return cls(buffer, index, rows)
+
+    def __contains__(self, labware_name):
+        return labware_name in self._index['labware']
+
+    def names(self):
+        return sorted(self._index['labware'])
+
+    def get(self, labware_name: str) -> BundledLabware:
+        entry = self._index['labware'][labware_name]
+        rows = self._rows[entry['start']:entry['start'] + entry['count']]
+        properties = {
+            name: rows[:, len(_AXES) + column].copy()
+            for column, name in enumerate(self._index['columns'])}
+        return BundledLabware(
+            json.loads(json.dumps(entry['metadata'])),
+            [list(column) for column in entry['ordering']],
+            list(entry['wells']),
+            rows[:, :len(_AXES)].copy(),
+            properties)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _pack(definition: dict, start: int):
+    """
+    Returns the index entry and rows of one definition, or None if a well
+    has a property that is not in COLUMNS
+    """
+    names = list(definition['wells'])
+    rows = []
+    for name in names:
+        well = definition['wells'][name]
+        if not set(well) <= set(_AXES + COLUMNS):
+            return None
+        rows.append(
+            [well[axis] for axis in _AXES] +
+            [well.get(column, np.nan) for column in COLUMNS])
+    entry = {
+        'metadata': definition.get('metadata', {}),
+        'ordering': definition.get('ordering', []),
+        'wells': names,
+        'start': start,
+        'count': len(rows)}
+    return entry, rows
+
+
+def build_bundle(definition_dir: str, bundle_path: str) -> list:
+    """
+    Packs every definition in definition_dir into a bundle at bundle_path.
+    :return: the names of the definitions that were left out because they
+        can not be packed
+    """
+    index = {'columns': list(COLUMNS), 'labware': {}}
+    rows = []
+    skipped = []
+    for filename in sorted(os.listdir(definition_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext != '.json':
+            continue
+        with open(os.path.join(definition_dir, filename)) as defn_file:
+            packed = _pack(json.load(defn_file), len(rows))
+        if packed is None:
+            skipped.append(name)
+            continue
+        index['labware'][name], labware_rows = packed
+        rows.extend(labware_rows)
+
+    index_bytes = json.dumps(index).encode('utf-8')
+    header = _HEADER.pack(MAGIC, len(index_bytes))
+    padding = _align(len(header) + len(index_bytes)) \
+        - len(header) - len(index_bytes)
+    data = np.array(rows, dtype='<f8').reshape(-1, len(_AXES) + len(COLUMNS))
+
+    tmp_path = bundle_path + '.tmp'
+    with open(tmp_path, 'wb') as bundle_file:
+        bundle_file.write(header)
+        bundle_file.write(index_bytes)
+        bundle_file.write(b'\0' * padding)
+        bundle_file.write(data.tobytes())
+    os.replace(tmp_path, bundle_path)
+    return skipped
+
+
+def main(argv):
+    if len(argv) != 3:
+        print('usage: {} <definition dir> <bundle file>'.format(argv[0]))
+        return 1
+    skipped = build_bundle(argv[1], argv[2])
+    for name in skipped:
+        print('Left {} out of the bundle'.format(name))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
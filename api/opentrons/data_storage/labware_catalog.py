@@ -0,0 +1,193 @@
+"""
+An in-memory index of the names of all labware that can be loaded, with a
+short summary of each, across the places definitions come from:
+
+- `user`: definitions in the user definition directory
+- `default`: definitions in the base definition directory
+- `legacy`: containers in the old `default-containers.json` and custom
+        container files (see `old_container_loading`)
+
+The index is refreshed incrementally: directories are only listed again
+once their `file_stamp` changes, and a file is only parsed again once its
+own stamp changes, so listings and lookups are served from memory.
+"""
+import os
+import json
+from collections import namedtuple, OrderedDict
+from typing import List
+from opentrons.config import get_config_index, file_stamp
+from opentrons.data_storage import old_container_loading
+
+SOURCES = ('user', 'default', 'legacy')
+
+LabwareEntry = namedtuple(
+    'LabwareEntry',
+    ['name', 'source', 'path', 'well_count', 'footprint',
+     'display_category'])
+LabwareEntry.__doc__ = """
+A labware in the catalog. `footprint` is the (x, y, z) size in mm of the
+box from the origin of the labware that holds all of its wells
+"""
+
+# directory -> (stamp, {name: path})
+_directories = {}
+# (source, path) -> (stamp, {name: LabwareEntry})
+_files = {}
+
+
+def _definition_dir(source: str) -> str:
+    key = {'user': 'userDefinitionDir', 'default': 'baseDefinitionDir'}
+    return get_config_index().get('labware', {}).get(key[source])
+
+
+def _definition_files(directory: str) -> dict:
+    """
+    :return: the definition files in directory by labware name
+    """
+    if not directory:
+        return {}
+    stamp = file_stamp(directory)
+    cached = _directories.get(directory)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    try:
+        files = {
+            os.path.splitext(filename)[0]: os.path.join(directory, filename)
+            for filename in os.listdir(directory)
+            if filename.endswith('.json')}
+    except (FileNotFoundError, NotADirectoryError):
+        files = {}
+    _directories[directory] = (stamp, files)
+    return files
+
+
+def _footprint(wells, centered: bool) -> tuple:
+    """
+    Size of the box from the origin that holds all wells, which are
+    positioned by their bottom-left corner, or their center if `centered`
+    """
+    size = [0, 0, 0]
+    for well in wells:
+        width = well.get('diameter') or well.get('width') or 0
+        length = well.get('diameter') or well.get('length') or 0
+        depth = well.get('depth') or well.get('height') or 0
+        x, y = well.get('x', 0), well.get('y', 0)
+        if centered:
+            x, y = x - width / 2, y - length / 2
+        size = [
+            max(size[0], x + width),
+            max(size[1], y + length),
+            max(size[2], well.get('z', 0) + depth)]
+    return tuple(round(dim, 2) for dim in size)
+
+
+def _summarize_definition(name: str, path: str, source: str) -> dict:
+    with open(path) as defn_file:
+        defn = json.load(defn_file)
+    wells = defn.get('wells', {})
+    return {name: LabwareEntry(
+        name,
+        source,
+        path,
+        len(wells),
+        _footprint(wells.values(), centered=False),
+        defn.get('metadata', {}).get('displayCategory'))}
+
+
+def _summarize_containers(path: str) -> dict:
+    res = {}
+    containers = old_container_loading.read_containers_file(path)
+    for name, container in containers.items():
+        if not name:
+            continue
+        wells = container.get('locations', {})
+        res[name] = LabwareEntry(
+            name,
+            'legacy',
+            path,
+            len(wells),
+            _footprint(wells.values(), centered=True),
+            None)
+    return res
+
+
+def _entries_in_file(source: str, path: str, name: str=None) -> dict:
+    stamp = file_stamp(path)
+    cached = _files.get((source, path))
+    if cached and cached[0] == stamp:
+        return cached[1]
+    try:
+        if source == 'legacy':
+            entries = _summarize_containers(path)
+        else:
+            entries = _summarize_definition(name, path, source)
+    except (OSError, ValueError):
+        entries = {}
+    _files[(source, path)] = (stamp, entries)
+    return entries
+
+
+def _legacy_files() -> List[str]:
+    # later files take precedence, as in `load_all_containers_from_disk`
+    return old_container_loading.get_custom_container_files() + [
+        old_container_loading.default_containers_path]
+
+
+def names(source: str) -> List[str]:
+    """
+    :return: the sorted names of the labware in one of `SOURCES`. Listing
+        definitions does not read the files
+    """
+    if source == 'legacy':
+        return sorted(entries(source))
+    return sorted(_definition_files(_definition_dir(source)))
+
+
+def entries(source: str) -> dict:
+    """
+    :return: a dict of names to `LabwareEntry` for one of `SOURCES`
+    """
+    res = {}
+    if source == 'legacy':
+        for path in _legacy_files():
+            res.update(_entries_in_file(source, path))
+    else:
+        files = _definition_files(_definition_dir(source))
+        for name, path in files.items():
+            res.update(_entries_in_file(source, path, name))
+    return res
+
+
+def find(name: str, sources=SOURCES) -> LabwareEntry:
+    """
+    :return: the entry of the labware that loading name would use, looking
+        through sources in order, or None if there is none
+    """
+    for source in sources:
+        if source == 'legacy':
+            entry = entries(source).get(name)
+        else:
+            path = _definition_files(_definition_dir(source)).get(name)
+            entry = path and _entries_in_file(source, path, name).get(name)
+        if entry:
+            return entry
+    return None
+
+
+def catalog(sources=SOURCES) -> List[LabwareEntry]:
+    """
+    :return: one entry for every labware name across sources, sorted by
+        name, with sources earlier in the list taking precedence
+    """
+    res = OrderedDict()
+    for source in reversed(sources):
+        res.update(entries(source))
+    return [res[name] for name in sorted(res)]
+
+
+def clear():
+    """
+    Forgets everything indexed so far
+    """
+    _directories.clear()
+    _files.clear()
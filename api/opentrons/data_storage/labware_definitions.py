@@ -1,8 +1,13 @@
 # pylama:ignore=E252
 import os
 import json
+import copy
+import functools
 from typing import List
-from opentrons.config import get_config_index
+import numpy as np
+from opentrons.config import get_config_index, file_stamp
+from opentrons.data_storage.labware_bundle import LabwareBundle
+from opentrons.data_storage import labware_catalog
 import logging
 
 """
@@ -125,9 +130,12 @@ def offset_dir():
     return get_config_index().get('labware', {}).get('offsetDir')
 
 
+def bundle_file():
+    return get_config_index().get('labwareBundleFile')
+
+
 def _load_definition(path: str, labware_name: str) -> dict:
-    definition_file = os.path.join(
-        path, "{}.json".format(labware_name))
+    definition_file = _definition_file(path, labware_name)
     try:
         with open(definition_file) as defn_f:
             lw = json.load(defn_f)
@@ -152,12 +160,59 @@ def _load_offset(path: str, labware_name: str) -> dict:
     return offs
 
 
+def _definition_file(path: str, labware_name: str) -> str:
+    return os.path.join(path, "{}.json".format(labware_name))
+
+
+def _copy_definition(defn: dict) -> dict:
+    """
+    Returns a copy of a definition that the caller is free to modify. Much
+    cheaper than a deepcopy, since wells only hold numbers
+    """
+    res = {
+        key: copy.deepcopy(value) for key, value in defn.items()
+        if key not in ('wells', 'ordering')}
+    if 'wells' in defn:
+        res['wells'] = {
+            name: dict(well) for name, well in defn['wells'].items()}
+    if 'ordering' in defn:
+        res['ordering'] = [list(column) for column in defn['ordering']]
+    return res
+
+
 def _load(default_defn_dir: str,
           user_defn_root_path: str,
           labware_name: str,
           offset_dir_path: str,
           with_offset: bool) -> dict:
     """
+    Loads a definition like `_load_parsed`, but only parses the files again
+    once any of them has changed on disk (see `file_stamp`). Each call
+    returns a separate copy.
+    """
+    files = [
+        _definition_file(user_defn_root_path, labware_name),
+        _definition_file(default_defn_dir, labware_name)]
+    if with_offset:
+        files.append(_definition_file(offset_dir_path, labware_name))
+    stamps = tuple(file_stamp(f) for f in files)
+    return _copy_definition(_load_parsed(
+        default_defn_dir,
+        user_defn_root_path,
+        labware_name,
+        offset_dir_path,
+        with_offset,
+        stamps))
+
+
+@functools.lru_cache(maxsize=64)
+def _load_parsed(default_defn_dir: str,
+                 user_defn_root_path: str,
+                 labware_name: str,
+                 offset_dir_path: str,
+                 with_offset: bool,
+                 stamps: tuple) -> dict:
+    """
     Try to find definition file in <user_defn_dir> first, then fall back to
     <default_defn_dir>. If a definition is found in either place, look for an
     offset file in <offset_dir> and apply it if found.
@@ -169,6 +224,8 @@ def _load(default_defn_dir: str,
     :param labware_name: Name of labware definition file (without extension)
     :param with_offset: A boolean flag to control whether the offset file
         should also be loaded and applied, if one exists
+    :param stamps: the `file_stamp`s of the files read, only used as part
+        of the cache key. Results are shared and must not be modified
     :return: a dict of the definition with offset applied to each well
     """
     lw = _load_definition(user_defn_root_path, labware_name)
@@ -189,6 +246,9 @@ def _load(default_defn_dir: str,
 
 
 def load_json(labware_name: str, with_offset: bool=True) -> dict:
+    bundled = load_bundled(labware_name, with_offset)
+    if bundled is not None:
+        return bundled.to_json()
     return _load(
         default_definition_dir(),
         user_defn_dir(),
@@ -197,17 +257,75 @@ def load_json(labware_name: str, with_offset: bool=True) -> dict:
         with_offset)
 
 
-def _list_labware(path: str) -> List[str]:
-    try:
-        lw = list(map(lambda x: os.path.splitext(x)[0], os.listdir(path)))
-    except FileNotFoundError:
-        lw = []
+@functools.lru_cache(maxsize=4)
+def _open_bundle(path: str, stamp: tuple):
+    """
+    Memory-maps the bundle at path, or returns None if there is none. The
+    `file_stamp` of the bundle is only part of the cache key, so that a
+    rebuilt bundle is mapped again
+    """
+    if stamp is None:
+        return None
+    return LabwareBundle.open(path)
+
+
+def load_bundled(labware_name: str, with_offset: bool=True):
+    """
+    Looks a default definition up in the precompiled labware bundle (see
+    `opentrons.data_storage.labware_bundle`), which is much faster than
+    parsing its JSON file.
+
+    :return: a `BundledLabware` with the offset applied, or None if the
+        labware is not bundled or is overridden by a user definition, in
+        which case callers should fall back to `load_json`
+    """
+    path = bundle_file()
+    if not path:
+        return None
+    bundle = _open_bundle(path, file_stamp(path))
+    if bundle is None or labware_name not in bundle:
+        return None
+    if os.path.exists(_definition_file(user_defn_dir(), labware_name)):
+        return None
+    lw = bundle.get(labware_name)
+    offs = _load_offset(offset_dir(), labware_name) if with_offset else None
+    if offs:
+        offset = np.array([offs[axis] for axis in 'xyz'])
+        lw.coordinates = np.round(lw.coordinates + offset, 2)
     return lw
 
 
+def load_definition(labware_name: str) -> dict:
+    """
+    Loads a definition like `load_json`, without its offset. The same dict
+    is returned to every caller until the files change, so it must not be
+    modified
+    """
+    default_defn_dir = default_definition_dir()
+    user_defn_root_path = user_defn_dir()
+    stamps = (
+        file_stamp(_definition_file(user_defn_root_path, labware_name)),
+        file_stamp(_definition_file(default_defn_dir, labware_name)))
+    return _load_parsed(
+        default_defn_dir,
+        user_defn_root_path,
+        labware_name,
+        offset_dir(),
+        False,
+        stamps)
+
+
+def load_offset(labware_name: str) -> dict:
+    """
+    :return: the calibrated offset of a labware as a dict with keys 'x', 'y'
+        and 'z', or an empty dict if it has not been calibrated
+    """
+    return _load_offset(offset_dir(), labware_name)
+
+
 def list_all_labware() -> List[str]:
-    user_list = [] + _list_labware(user_defn_dir())
-    default_list = [] + _list_labware(default_definition_dir())
+    user_list = labware_catalog.names('user')
+    default_list = labware_catalog.names('default')
     return sorted(list(set(user_list + default_list)))
 
 
@@ -248,6 +366,8 @@ def save_user_definition(defn: dict) -> bool:
         if not os.path.exists(defn_dir):
             os.makedirs(defn_dir, exist_ok=True)
         successful = _save_user_definition(defn_dir, defn)
+        _load_parsed.cache_clear()
+        labware_catalog.clear()
     except OSError:
         log.exception('Failed to save user definition with exception:')
         successful = False
@@ -266,4 +386,6 @@ def save_labware_offset(name: str, offset: dict) -> bool:
     offset_d = offset_dir()
     if not os.path.exists(offset_d):
         os.makedirs(offset_d, exist_ok=True)
-    return _save_offset(offset_d, name, offset)
+    successful = _save_offset(offset_d, name, offset)
+    _load_parsed.cache_clear()
+    return successful
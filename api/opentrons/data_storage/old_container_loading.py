@@ -11,12 +11,15 @@ import numbers
 import os
 import pkg_resources
 from collections import OrderedDict
+from opentrons.config import file_stamp
 from opentrons.containers.placeable import Container, Well
 from opentrons.util import environment
 from opentrons.util.vector import Vector
 
 persisted_containers_dict = {}
 containers_file_list = []
+# path -> (file_stamp, containers) of the files read so far
+_containers_files = {}
 
 containers_dir_path = pkg_resources.resource_filename(
     'opentrons.config',
@@ -47,11 +50,25 @@ def load_all_containers_from_disk():
 
 # TODO: How should we handle faulty container paths?
 def load_containers_from_file_path(file_path):
+    persisted_containers_dict.update(read_containers_file(file_path))
+
+
+def read_containers_file(file_path):
+    """
+    Returns the containers in a container file, only reading it again once
+    it has changed. The result is shared and must not be modified
+    """
+    stamp = file_stamp(file_path)
+    cached = _containers_files.get(file_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
     with open(file_path) as f:
-        persisted_containers_dict.update(json.load(
+        containers = OrderedDict(json.load(
             f,
             object_pairs_hook=OrderedDict
         ).get('containers', [(None, None)]))
+    _containers_files[file_path] = (stamp, containers)
+    return containers
 
 
 def get_custom_container_files():
@@ -1,8 +1,6 @@
 # pylama:ignore=E252
-from opentrons.containers.placeable import Well, Container
+from opentrons.containers.placeable import Well, WellArray, Container
 from opentrons.util.vector import Vector
-from numbers import Number
-from typing import Tuple
 
 """
 Methods for converting between Well<->json and Container<->json.
@@ -12,32 +10,29 @@ Current implementation of json->Container and json->Well based on
 """
 
 
-def _json_to_well(
-        json_well: dict) -> Tuple[Well, Tuple[Number, Number, Number]]:
-    well_properties = json_well.copy()
-    x = well_properties.pop('x')
-    y = well_properties.pop('y')
-    z = well_properties.pop('z')
-    assert isinstance(x, Number)
-    assert isinstance(y, Number)
-    assert isinstance(z, Number)
+def json_to_labware(json_defn: dict) -> Container:
+    container = Container()
+    container._coordinates = Vector(0, 0, 0)
 
-    well = Well(properties=well_properties)
+    # json_defn may be shared between labware, so it is only read
+    container.add_wells(json_defn.get('wells'))
+    container.ordering = [list(column) for column in json_defn['ordering']]
 
-    well_coordinates = (x, y, z)
-    return well, well_coordinates
+    return container
 
 
-def json_to_labware(json_defn: dict) -> Container:
-    container_data = json_defn.copy()
+def bundled_to_labware(bundled) -> Container:
+    """
+    Like `json_to_labware`, for a definition read from a labware bundle
+    (see `opentrons.data_storage.labware_bundle`), whose well columns are
+    used as they are
+    """
     container = Container()
     container._coordinates = Vector(0, 0, 0)
 
-    wells = container_data.get('wells')
-    for well_name, json_well in wells.items():
-        well, coordinates = _json_to_well(json_well)
-        container.add(well, well_name, coordinates)
-    container.ordering = json_defn['ordering']
+    array = WellArray.from_columns(bundled.coordinates, bundled.properties)
+    container.add_well_array(bundled.well_names, array)
+    container.ordering = bundled.ordering
 
     return container
 
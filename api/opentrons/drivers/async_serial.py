@@ -0,0 +1,220 @@
+'''
+Serial I/O on an asyncio event loop.
+
+All connections wrapped in an `AsyncSerial` share one event loop, which runs
+in its own thread (see `io_loop`). Each connection has a reader on that loop
+that appends whatever arrives to a buffer as soon as it arrives, and an
+ordered queue of commands: a command is written once the response to the
+one before it has been framed, by finding its acknowledgement in the buffer,
+so commands to different devices overlap without tying up a thread each.
+Lines that arrive while no command is waiting (such as alarms) are passed
+to a callback as soon as they are read.
+
+Commands can be awaited from any event loop with `write_and_return`, or
+from any thread other than the I/O thread with `write_and_return_sync`.
+'''
+import asyncio
+import logging
+from threading import Thread, Lock
+
+from serial.serialutil import SerialException
+
+from opentrons.drivers import serial_stats
+from opentrons.drivers.serial_communication import (
+    SerialNoResponse, DEFAULT_WRITE_TIMEOUT)
+
+log = logging.getLogger(__name__)
+
+_loop = None
+_loop_lock = Lock()
+
+
+def io_loop() -> asyncio.AbstractEventLoop:
+    '''
+    Returns the event loop that serial I/O runs on, starting the thread that
+    runs it the first time
+    '''
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            Thread(
+                target=loop.run_forever,
+                name='serial-io',
+                daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+class AsyncSerial:
+    '''
+    Wraps a `serial.Serial` connection (or anything with the same `write`,
+    `read`, `in_waiting`, `reset_input_buffer` and `fileno`) to run commands
+    through an ordered queue on `io_loop()`
+
+    on_unsolicited:
+        Called on the I/O thread with each line (str, stripped) that arrives
+        while no command is waiting for a response
+    '''
+    def __init__(self, serial_connection, on_unsolicited=None):
+        self._serial = serial_connection
+        self._on_unsolicited = on_unsolicited
+        self._loop = io_loop()
+        # Bytes read and not framed yet. Framed bytes are deleted from the
+        # front, which CPython does without moving the rest of the buffer
+        self._buffer = bytearray()
+        # (ack, future) of the command waiting for its response, the future
+        # is set to the response and the number of bytes it took
+        self._pending = None
+        # Where to look for the ack from, so nothing is searched twice
+        self._scanned = 0
+        self._reader_fd = None
+        self._queue = None
+        self._worker = None
+
+    @property
+    def connection(self):
+        return self._serial
+
+    async def write_and_return(
+            self, command, ack, timeout=DEFAULT_WRITE_TIMEOUT) -> str:
+        '''
+        Queues a command and returns the response up to ack, as
+        `serial_communication.write_and_return` does. Can be awaited from any
+        event loop
+        '''
+        future = asyncio.run_coroutine_threadsafe(
+            self._submit(command, ack, timeout), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def write_and_return_sync(
+            self, command, ack, timeout=DEFAULT_WRITE_TIMEOUT) -> str:
+        '''
+        Queues a command and blocks until its response is read. Must not be
+        called from the I/O thread
+        '''
+        future = asyncio.run_coroutine_threadsafe(
+            self._submit(command, ack, timeout), self._loop)
+        return future.result()
+
+    def close(self):
+        '''
+        Stops reading and running queued commands, failing any that are
+        still waiting. Does not close the serial connection
+        '''
+        def _close():
+            self._stop_reading()
+            if self._worker:
+                self._worker.cancel()
+
+        self._loop.call_soon_threadsafe(_close)
+
+    async def _submit(self, command, ack, timeout):
+        if self._worker is None:
+            self._queue = asyncio.Queue(loop=self._loop)
+            self._worker = self._loop.create_task(self._run())
+        if self._worker.done():
+            raise SerialNoResponse('Serial connection was closed')
+        result = self._loop.create_future()
+        self._queue.put_nowait((command, ack, timeout, result))
+        return await result
+
+    async def _run(self):
+        try:
+            while True:
+                command, ack, timeout, result = await self._queue.get()
+                if result.cancelled():
+                    continue
+                try:
+                    response = await self._write_and_return(
+                        command, ack, timeout)
+                except Exception as e:
+                    result.set_exception(e)
+                else:
+                    result.set_result(response)
+        finally:
+            while not self._queue.empty():
+                self._queue.get_nowait()[-1].cancel()
+
+    async def _write_and_return(self, command, ack, timeout):
+        # the port may have been reopened since the last command, so the
+        # reader is registered again for its current file descriptor
+        self._start_reading()
+        if self._buffer:
+            log.debug('Dropped unframed bytes: {}'.format(self._buffer))
+            self._buffer.clear()
+        response = self._loop.create_future()
+        self._pending = (ack.encode(), response)
+        self._scanned = 0
+        try:
+            log.debug('Write -> {}'.format(command.encode()))
+            start = self._loop.time()
+            self._serial.write(command.encode())
+            text, received = await asyncio.wait_for(
+                response, timeout, loop=self._loop)
+            serial_stats.record(
+                self._serial, command, received, self._loop.time() - start)
+            return text
+        except asyncio.TimeoutError:
+            # a late response must not be taken for the next one
+            self._buffer.clear()
+            self._serial.reset_input_buffer()
+            serial_stats.record_no_response(self._serial, command)
+            raise SerialNoResponse(
+                'No response from serial port after {} second(s)'.format(
+                    timeout))
+        finally:
+            self._pending = None
+
+    def _start_reading(self):
+        self._stop_reading()
+        self._reader_fd = self._serial.fileno()
+        self._loop.add_reader(self._reader_fd, self._read_available)
+
+    def _stop_reading(self):
+        if self._reader_fd is not None:
+            self._loop.remove_reader(self._reader_fd)
+            self._reader_fd = None
+
+    def _read_available(self):
+        try:
+            waiting = self._serial.in_waiting
+            data = self._serial.read(waiting) if waiting else b''
+        except (OSError, SerialException, TypeError):
+            data = b''
+        if not data:
+            # readable with nothing to read: the port was closed or hung up
+            self._stop_reading()
+            return
+        self._buffer.extend(data)
+        self._frame()
+
+    def _frame(self):
+        while self._buffer:
+            if self._pending:
+                ack, response = self._pending
+                end = self._buffer.find(ack, self._scanned)
+                if end < 0:
+                    self._scanned = max(0, len(self._buffer) - len(ack) + 1)
+                    return
+                frame_length = end + len(ack)
+            else:
+                end = self._buffer.find(b'\n')
+                if end < 0:
+                    return
+                frame_length = end + 1
+
+            with memoryview(self._buffer) as view, view[:end] as frame:
+                text = str(frame, 'utf-8', 'replace').strip()
+            del self._buffer[:frame_length]
+            self._scanned = 0
+
+            if self._pending:
+                log.debug('Read <- {}'.format(text))
+                if not response.done():
+                    response.set_result((text, frame_length))
+                self._pending = None
+            elif text:
+                log.debug('Unsolicited <- {}'.format(text))
+                if self._on_unsolicited:
+                    self._on_unsolicited(text)
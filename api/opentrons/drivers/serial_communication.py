@@ -2,6 +2,9 @@ import serial
 from serial.tools import list_ports
 import contextlib
 import logging
+from time import monotonic
+
+from opentrons.drivers import serial_stats
 
 log = logging.getLogger(__name__)
 
@@ -59,13 +62,17 @@ def _write_to_device_and_return(cmd, ack, device_connection):
     - Wait for ack return
     - return parsed response'''
     log.debug('Write -> {}'.format(cmd.encode()))
+    start = monotonic()
     device_connection.write(cmd.encode())
     response = device_connection.read_until(ack.encode())
     log.debug('Read <- {}'.format(response))
     if ack.encode() not in response:
+        serial_stats.record_no_response(device_connection, cmd)
         raise SerialNoResponse(
             'No response from serial port after {} second(s)'.format(
                 device_connection.timeout))
+    serial_stats.record(
+        device_connection, cmd, len(response), monotonic() - start)
     clean_response = _parse_serial_response(response, ack.encode())
     if clean_response:
         return clean_response.decode()
@@ -105,6 +112,28 @@ def write_and_return(
     return response
 
 
+def write_no_wait(command, serial_connection):
+    '''Write a command without waiting for its response. Read the response
+    later with `read_response`. The caller records the command in
+    `serial_stats` once its response is read'''
+    log.debug('Write -> {}'.format(command.encode()))
+    serial_connection.write(command.encode())
+
+
+def read_response(ack, serial_connection, timeout=DEFAULT_WRITE_TIMEOUT):
+    '''Read the next response, up to and including ack, and return the text
+    before ack. Unlike `write_and_return`, this does not clear the buffer'''
+    with serial_with_temp_timeout(
+            serial_connection, timeout) as device_connection:
+        response = device_connection.read_until(ack.encode())
+    log.debug('Read <- {}'.format(response))
+    if ack.encode() not in response:
+        raise SerialNoResponse(
+            'No response from serial port after {} second(s): {}'.format(
+                timeout, response))
+    return _parse_serial_response(response, ack.encode()).decode()
+
+
 def connect(device_name=None, port=None, baudrate=115200):
     '''
     Creates a serial connection
@@ -0,0 +1,173 @@
+'''
+Counters of the commands sent to serial devices, by device and G-code verb.
+
+For each verb this keeps the number of commands, the bytes sent and
+received, a histogram of round-trip latencies, the commands that got no
+response, and the retries and recoveries of the drivers after those.
+
+The verb of a command is made of the G- and M-codes in it, so that, for
+instance, moves that also set the current ("M907 G4 G0") are counted apart
+from moves that do not ("G0"). The M400 the Smoothie driver ends commands
+with is left out.
+
+Recording is cheap enough to always be on: the counters of a verb are
+allocated the first time it is seen and only incremented after that. The
+counters are not locked, so they are approximate if the same device is used
+from several threads at once.
+'''
+import logging
+import re
+from bisect import bisect_left
+
+log = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the buckets of the latency histograms, the last
+# bucket holds the latencies above LATENCY_BUCKETS[-1]
+LATENCY_BUCKETS = (
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30)
+
+_VERB_RE = re.compile(r'(?:^|\s)([GM]\d+(?:\.\d+)?)')
+_IGNORED_CODES = {'M400'}
+
+# port -> device name, see `name_device`
+_device_names = {}
+# (device, verb) -> VerbStats
+_stats = {}
+
+
+class VerbStats:
+    __slots__ = (
+        'count', 'bytes_sent', 'bytes_received', 'no_responses', 'retries',
+        'recoveries', 'total_latency', 'max_latency', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.no_responses = 0
+        self.retries = 0
+        self.recoveries = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def as_dict(self) -> dict:
+        timed = sum(self.histogram)
+        return {
+            'count': self.count,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'no_responses': self.no_responses,
+            'retries': self.retries,
+            'recoveries': self.recoveries,
+            'latency': {
+                'total': round(self.total_latency, 6),
+                'mean': round(self.total_latency / timed, 6) if timed else 0,
+                'max': round(self.max_latency, 6),
+                'histogram': [
+                    {'le': bound, 'count': count}
+                    for bound, count in zip(
+                        LATENCY_BUCKETS + (None,), self.histogram)]
+            }
+        }
+
+
+def command_verb(command: str) -> str:
+    '''
+    Returns the G- and M-codes in command, in order and without repeats,
+    e.g. "M907 G4 G0" for "M907 A0.1 G4P0.005 G0X10 G0Y20 M400"
+    '''
+    codes = []
+    for code in _VERB_RE.findall(command):
+        if code not in codes and code not in _IGNORED_CODES:
+            codes.append(code)
+    return ' '.join(codes) or (command.split() or ['(blank)'])[0]
+
+
+def name_device(connection, name: str):
+    '''
+    Counts the commands sent through connection (a `serial.Serial`) under
+    name and its port rather than under its port alone
+    '''
+    port = getattr(connection, 'port', None)
+    if port:
+        _device_names[port] = '{} {}'.format(name, port)
+
+
+def _verb_stats(connection, command) -> VerbStats:
+    port = getattr(connection, 'port', None)
+    key = (_device_names.get(port, port or 'unknown'), command_verb(command))
+    stats = _stats.get(key)
+    if stats is None:
+        stats = _stats.setdefault(key, VerbStats())
+    return stats
+
+
+def record(connection, command: str, received: int, latency: float=None):
+    '''
+    Records a command sent through connection, the number of bytes received
+    in response and the seconds it took for them to arrive (None if the
+    response is not waited for)
+    '''
+    stats = _verb_stats(connection, command)
+    stats.count += 1
+    stats.bytes_sent += len(command)
+    stats.bytes_received += received
+    if latency is not None:
+        stats.total_latency += latency
+        if latency > stats.max_latency:
+            stats.max_latency = latency
+        stats.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+
+def record_no_response(connection, command: str):
+    stats = _verb_stats(connection, command)
+    stats.count += 1
+    stats.bytes_sent += len(command)
+    stats.no_responses += 1
+
+
+def record_retry(connection, command: str):
+    '''
+    Records that a driver sent command again after it got no response
+    '''
+    _verb_stats(connection, command).retries += 1
+
+
+def record_recovery(connection, command: str):
+    '''
+    Records that a driver got a response to command after retrying it
+    '''
+    _verb_stats(connection, command).recoveries += 1
+
+
+def stats() -> dict:
+    '''
+    Returns the counters of each verb (see `VerbStats.as_dict`) by device
+    '''
+    res = {}
+    for (device, verb), verb_stats in sorted(_stats.items()):
+        res.setdefault(device, {})[verb] = verb_stats.as_dict()
+    return res
+
+
+def reset():
+    _stats.clear()
+
+
+def log_stats(level=logging.INFO):
+    '''
+    Logs the counters of each verb of each device, one line each
+    '''
+    for (device, verb), verb_stats in sorted(_stats.items()):
+        timed = sum(verb_stats.histogram)
+        log.log(
+            level,
+            '{} {}: {} sent, {}B out, {}B in, latency total {:.3f}s, '
+            'mean {:.1f}ms, max {:.1f}ms, {} no response, {} retries, '
+            '{} recoveries'.format(
+                device, verb, verb_stats.count, verb_stats.bytes_sent,
+                verb_stats.bytes_received, verb_stats.total_latency,
+                verb_stats.total_latency / timed * 1000 if timed else 0,
+                verb_stats.max_latency * 1000, verb_stats.no_responses,
+                verb_stats.retries, verb_stats.recoveries))
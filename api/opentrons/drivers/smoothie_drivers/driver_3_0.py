@@ -1,13 +1,16 @@
+from collections import deque
 from os import environ
 import logging
-from time import sleep
+from time import sleep, monotonic
 from threading import Event
 from typing import Dict
 
 from serial.serialutil import SerialException
 
-from opentrons.drivers import serial_communication
+from opentrons.drivers import serial_communication, serial_stats
+from opentrons.drivers.async_serial import AsyncSerial
 from opentrons.drivers.rpi_drivers import gpio
+from opentrons.drivers.smoothie_drivers.motion_time import MotionTimeModel
 '''
 - Driver is responsible for providing an interface for motion control
 - Driver is the only system component that knows about GCODES or how smoothie
@@ -50,8 +53,13 @@ DEFAULT_AXES_SPEED = 400
 
 XY_HOMING_SPEED = 80
 
-HOME_SEQUENCE = ['ZABC', 'X', 'Y']
-AXES = ''.join(HOME_SEQUENCE)
+# The Z mounts and the plungers, see `_plan_homing`
+MOUNT_AXES = 'ZA'
+PLUNGER_AXES = 'BC'
+AXES = MOUNT_AXES + PLUNGER_AXES + 'XY'
+# Distance in mm from their homed position that axes whose position is known
+# are moved to at full speed before homing, see `_approach_home`
+HOME_APPROACH_MARGIN = 10
 # Ignore these axis when sending move or home command
 DISABLE_AXES = ''
 
@@ -60,6 +68,11 @@ SEC_PER_MIN = 60
 
 DEFAULT_SMOOTHIE_TIMEOUT = 1
 DEFAULT_MOVEMENT_TIMEOUT = 30
+# A move times out after this many times as long as it is expected to take
+# (see `motion_time`), or DEFAULT_MOVEMENT_TIMEOUT if that is longer
+MOVEMENT_TIMEOUT_FACTOR = 2
+# Number of timed moves kept to calibrate the motion time model with
+MOTION_TIMINGS_KEPT = 200
 SMOOTHIE_BOOT_TIMEOUT = 3
 DEFAULT_STABILIZE_DELAY = 0.1
 
@@ -93,6 +106,14 @@ GCODE_ROUNDING_PRECISION = 3
 SMOOTHIE_COMMAND_TERMINATOR = 'M400\r\n\r\n'
 SMOOTHIE_ACK = 'ok\r\nok\r\n'
 
+# When streaming (see `SmoothieDriver_3_0_0.set_streaming`) each command is
+# a single line without M400, acknowledged by a single 'ok'
+SMOOTHIE_STREAM_TERMINATOR = '\r\n'
+SMOOTHIE_STREAM_ACK = 'ok\r\n'
+# Most streamed commands waiting for their 'ok' at any time. Smoothieware's
+# planner holds 32 blocks, so this leaves plenty of room for the moves
+DEFAULT_STREAM_WINDOW = 4
+
 
 class SmoothieError(Exception):
     pass
@@ -102,6 +123,11 @@ class ParseError(Exception):
     pass
 
 
+def _is_error_response(response):
+    return (ERROR_KEYWORD in response.lower()) or \
+        (ALARM_KEYWORD in response.lower())
+
+
 def _parse_number_from_substring(smoothie_substring):
     '''
     Returns the number in the expected string "N:12.3", where "N" is the
@@ -218,6 +244,26 @@ def _parse_switch_values(raw_switch_values):
     return res
 
 
+def _plan_homing(axes):
+    '''
+    Splits axes into the groups homed together with one G28.2 each, in
+    order. The Z mounts go first so that nothing is down when the gantry
+    moves, then X (see `SmoothieDriver_3_0_0._home_x`) along with the
+    plungers, which are clear of everything once the mounts are up, then Y,
+    which has to be homed after X. Without X the plungers are homed with the
+    mounts
+    '''
+    mounts = ''.join(ax for ax in MOUNT_AXES if ax in axes)
+    plungers = ''.join(ax for ax in PLUNGER_AXES if ax in axes)
+    if 'X' in axes:
+        groups = [mounts, 'X' + plungers]
+    else:
+        groups = [mounts + plungers]
+    if 'Y' in axes:
+        groups.append('Y')
+    return [group for group in groups if group]
+
+
 def _parse_homing_status_values(raw_homing_status_values):
     '''
         Parse the Smoothieware response to a G28.6 command (homing-status)
@@ -261,6 +307,30 @@ class SmoothieDriver_3_0_0:
         self._connection = None
         self._config = config
 
+        # The position is dead-reckoned from acknowledged moves and homes, and
+        # only read back from Smoothieware (M114.2) for the axes in
+        # _uncertain_axes, see `invalidate_position`. _known_home_axes are
+        # the axes whose position after homing was read back since connecting
+        self._uncertain_axes = set(AXES)
+        self._known_home_axes = set()
+
+        # Streamed commands (see `set_streaming`) that were sent without
+        # waiting, in order, whose 'ok' has not been read yet, as (command,
+        # monotonic() time it was sent)
+        self._streaming = False
+        self._stream_window = DEFAULT_STREAM_WINDOW
+        self._streamed_commands = []
+        # monotonic() time the streamed moves are expected to be done by
+        self._streamed_motion_end = 0.0
+
+        # When async I/O is enabled (see `set_async_io`) every command goes
+        # through the ordered queue of this wrapper of `_connection`
+        self._async_io = False
+        self._async_connection = None
+        # An alarm Smoothieware sent while no command was waiting, raised by
+        # the next command
+        self._alarm = None
+
         # Current settings:
         # The amperage of each axis, has been organized into three states:
         # Current-Settings is the amperage each axis was last set to
@@ -299,6 +369,20 @@ class SmoothieDriver_3_0_0:
         self._combined_speed = float(DEFAULT_AXES_SPEED)
         self._saved_axes_speed = float(self._combined_speed)
 
+        # Expected duration of moves (see `motion_time`). estimated_time is
+        # the expected duration of every move, home and dwell so far, also
+        # when simulating. motion_timings holds (modelled motion time,
+        # measured time) of recent moves, see `calibrate_motion_time`
+        self._motion_time = MotionTimeModel.from_config(config)
+        self.estimated_time = 0.0
+        self.motion_timings = deque(maxlen=MOTION_TIMINGS_KEPT)
+
+        # The current, speed and max-speed values Smoothieware was last sent
+        # (see `_record_settings`), so that only changes are sent. Values are
+        # missing when they are not known (see `resync_settings`)
+        self._firmware_settings = {}
+        self.resync_settings()
+
         # position after homing
         self._homed_position = HOMED_POSITION.copy()
         self.homed_flags = {}
@@ -324,10 +408,16 @@ class SmoothieDriver_3_0_0:
         self.log += [self._position.copy()]
 
     def update_position(self, default=None):
+        '''
+        Brings the position up to date, reading it back from Smoothieware
+        only if some axis may have moved without this driver knowing (see
+        `invalidate_position`). Otherwise the dead-reckoned position is
+        kept, updated with default
+        '''
         if default is None:
             default = self._position
 
-        if self.simulating:
+        if self.simulating or not self._uncertain_axes:
             updated_position = self._position.copy()
             updated_position.update(**default)
         else:
@@ -346,9 +436,19 @@ class SmoothieDriver_3_0_0:
 
             updated_position = _recursive_update_position(
                 DEFAULT_COMMAND_RETRIES)
+            self._uncertain_axes.clear()
 
         self._update_position(updated_position)
 
+    def invalidate_position(self, axes=AXES):
+        '''
+        Marks the position of axes as unknown, so that the next
+        `update_position` reads it back from Smoothieware. Use when axes may
+        have moved without this driver knowing, e.g. after an error, a halt
+        or being moved by hand
+        '''
+        self._uncertain_axes.update(set(axes.upper()) & set(AXES))
+
     def read_pipette_id(self, mount):
         '''
         Reads in an attached pipette's UUID
@@ -429,15 +529,94 @@ class SmoothieDriver_3_0_0:
             self.simulating = True
             return
         self.disconnect()
+        self._known_home_axes.clear()
         self._connect_to_port(port)
         self._setup()
 
     def disconnect(self):
         if self.is_connected():
             self._connection.close()
+        self._close_async_connection()
         self._connection = None
+        self._streamed_commands.clear()
+        self.resync_settings()
+        # simulated moves only change the dead-reckoned position
+        self.invalidate_position()
         self.simulating = True
 
+    def set_streaming(self, enabled, window=DEFAULT_STREAM_WINDOW):
+        '''
+        Streaming sends motion commands (moves, and the current and speed
+        settings around them) without M400 and without waiting for their
+        response, so that Smoothieware's planner can hold up to `window` of
+        them at once instead of stopping after every move.
+
+        Commands that read from Smoothieware or have to wait for motion to
+        finish (position, switches, probing, homing, delays and pausing) are
+        synchronization points: they first wait for the 'ok' of every
+        streamed command and then block with M400 as before. A limit-switch
+        alarm during a streamed command is handled as usual and raised as a
+        SmoothieError by the next command that waits for it.
+
+        enabled:
+            Boolean, whether to stream commands
+        window:
+            Integer, most streamed commands to have waiting for their 'ok'
+        '''
+        if not enabled:
+            self._flush_stream()
+        self._streaming = bool(enabled)
+        self._stream_window = max(1, int(window))
+
+    def set_async_io(self, enabled):
+        '''
+        Async I/O runs every command through an ordered queue on a shared
+        event loop (see `opentrons.drivers.async_serial`), which reads the
+        responses without blocking. The synchronous API is a thin wrapper
+        around that queue, waiting for each response in the calling thread.
+        Commands are not streamed (see `set_streaming`) while async
+        I/O is enabled.
+
+        enabled:
+            Boolean, whether to use async I/O
+        '''
+        self._flush_stream()
+        self._async_io = bool(enabled)
+        self._close_async_connection()
+        if self._async_io and self.is_connected():
+            self._open_async_connection()
+
+    def _open_async_connection(self):
+        self._async_connection = AsyncSerial(
+            self._connection, on_unsolicited=self._handle_unsolicited)
+
+    def _close_async_connection(self):
+        if self._async_connection:
+            self._async_connection.close()
+        self._async_connection = None
+        self._alarm = None
+
+    def _handle_unsolicited(self, line):
+        '''
+        Called from the I/O thread with each line Smoothieware sends while no
+        command is waiting for a response (see `set_async_io`). Smoothieware
+        ignores commands after an alarm until it is reset, so the alarm is
+        handled by the next command
+        '''
+        if _is_error_response(line):
+            log.error('Alarm from Smoothieware: {}'.format(line))
+            self._alarm = line
+
+    def resync_settings(self):
+        '''
+        Forgets the current, speed and max-speed values Smoothieware was last
+        sent, so that the next commands setting them send every value again.
+        Use when Smoothieware may have lost or changed them, e.g. after an
+        error, a reset or reconnecting
+        '''
+        self._firmware_settings = {
+            'current': {}, 'speed': None, 'max_speed': {}}
+
     def is_connected(self):
         if not self._connection:
             return False
@@ -451,6 +630,9 @@ class SmoothieDriver_3_0_0:
                 port=port,
                 baudrate=self._config.serial_speed
             )
+            serial_stats.name_device(self._connection, 'smoothie')
+            if self._async_io:
+                self._open_async_connection()
             self.simulating = False
         except SerialException:
             # if another process is using the port, pyserial raises an
@@ -556,13 +738,35 @@ class SmoothieDriver_3_0_0:
     def speed(self):
         pass
 
+    @property
+    def motion_time(self) -> MotionTimeModel:
+        '''
+        The model of how long moves take, used for their timeouts and for
+        `estimated_time`
+        '''
+        return self._motion_time
+
+    def calibrate_motion_time(self) -> MotionTimeModel:
+        '''
+        Fits the scale and overhead of `motion_time` to the moves timed so
+        far (see `motion_timings`) and returns the fitted model
+        '''
+        self._motion_time = self._motion_time.calibrate(
+            list(self.motion_timings))
+        log.info('Calibrated motion time: scale {:.3f}, overhead {:.3f}s'
+                 .format(self._motion_time.scale,
+                         self._motion_time.overhead))
+        return self._motion_time
+
     def set_speed(self, value):
         ''' set total axes movement speed in mm/second'''
         self._combined_speed = float(value)
         speed_per_min = int(self._combined_speed * SEC_PER_MIN)
+        if self._firmware_settings['speed'] == speed_per_min:
+            return
         command = GCODES['SET_SPEED'] + str(speed_per_min)
         log.debug("set_speed: {}".format(command))
-        self._send_command(command)
+        self._queue_command(command)
 
     def push_speed(self):
         self._saved_axes_speed = float(self._combined_speed)
@@ -580,13 +784,17 @@ class SmoothieDriver_3_0_0:
         '''
         self._max_speed_settings.update(settings)
         values = ['{}{}'.format(axis.upper(), value)
-                  for axis, value in sorted(settings.items())]
+                  for axis, value in sorted(settings.items())
+                  if self._firmware_settings['max_speed'].get(axis.upper())
+                  != value]
+        if not values:
+            return
         command = '{} {}'.format(
             GCODES['SET_MAX_SPEED'],
             ' '.join(values)
         )
         log.debug("set_axis_max_speed: {}".format(command))
-        self._send_command(command)
+        self._queue_command(command)
 
     def push_axis_max_speed(self):
         self._saved_max_speed_settings = self._max_speed_settings.copy()
@@ -686,16 +894,22 @@ class SmoothieDriver_3_0_0:
         this method to set the axis-current state on the actual Smoothie
         motor-driver.
         '''
-        self._send_command(self._generate_current_command())
+        command = self._generate_current_command()
+        if command:
+            self._queue_command(command)
 
     def _generate_current_command(self):
         '''
         Returns a constructed GCode string that contains this driver's
         axis-current settings, plus a small delay to wait for those settings
-        to take effect.
+        to take effect. Only the axes whose current Smoothieware was not
+        already sent are included, and if there are none the string is empty.
         '''
         values = ['{}{}'.format(axis, value)
-                  for axis, value in sorted(self.current.items())]
+                  for axis, value in sorted(self.current.items())
+                  if self._firmware_settings['current'].get(axis) != value]
+        if not values:
+            return ''
         current_cmd = '{} {}'.format(
             GCODES['SET_CURRENT'],
             ' '.join(values)
@@ -708,6 +922,36 @@ class SmoothieDriver_3_0_0:
         log.debug("_generate_current_command: {}".format(command))
         return command
 
+    def _with_current_command(self, command):
+        '''
+        Returns `command` preceded by the GCode from
+        `_generate_current_command()`, if there is any
+        '''
+        current_command = self._generate_current_command()
+        return ' '.join(filter(None, [current_command, command]))
+
+    def _record_settings(self, command):
+        '''
+        Updates the values Smoothieware was last sent with the current, speed
+        and max-speed settings in a command that it has accepted
+        '''
+        code = None
+        for word in command.split():
+            if word.startswith(GCODES['SET_SPEED']):
+                self._firmware_settings['speed'] = float(
+                    word[len(GCODES['SET_SPEED']):])
+            elif word[0] in 'GM':
+                code = word
+                if code in (GCODES['PUSH_SPEED'], GCODES['POP_SPEED']):
+                    self._firmware_settings['speed'] = None
+            elif word[0] == 'F':
+                # a feed rate given to any other GCode changes the speed
+                self._firmware_settings['speed'] = None
+            elif word[0] in AXES and code == GCODES['SET_CURRENT']:
+                self._firmware_settings['current'][word[0]] = float(word[1:])
+            elif word[0] in AXES and code == GCODES['SET_MAX_SPEED']:
+                self._firmware_settings['max_speed'][word[0]] = float(word[1:])
+
     def disengage_axis(self, axes):
         '''
         Disable the stepper-motor-driver's 36v output to motor
@@ -721,9 +965,11 @@ class SmoothieDriver_3_0_0:
         axes = ''.join(set(axes.upper()) & set(AXES))
         if axes:
             log.debug("disengage_axis: {}".format(axes))
-            self._send_command(GCODES['DISENGAGE_MOTOR'] + axes)
+            self._queue_command(GCODES['DISENGAGE_MOTOR'] + axes)
             for axis in axes:
                 self.engaged_axes[axis] = False
+            # disengaged axes can be moved by hand
+            self.invalidate_position(axes)
 
     def dwell_axes(self, axes):
         '''
@@ -781,6 +1027,8 @@ class SmoothieDriver_3_0_0:
         if not self.simulating:
             sleep(DEFAULT_STABILIZE_DELAY)
         log.debug("reset_from_error")
+        self.resync_settings()
+        self.invalidate_position()
         self._send_command(GCODES['RESET_FROM_ERROR'])
         self.update_homed_flags()
 
@@ -808,23 +1056,131 @@ class SmoothieDriver_3_0_0:
         if self.simulating:
             return
 
+        # every command sent here is a synchronization point for streaming,
+        # and its M400 also waits for the streamed moves to finish
+        self._flush_stream()
+        motion_left = self._streamed_motion_end - monotonic()
+        if timeout is not None and motion_left > 0:
+            timeout += motion_left
+
+        if self._alarm:
+            alarm, self._alarm = self._alarm, None
+            self._handle_error_response(command, alarm)
+
         command_line = command + ' ' + SMOOTHIE_COMMAND_TERMINATOR
-        ret_code = self._recursive_write_and_return(
-            command_line, timeout, DEFAULT_COMMAND_RETRIES)
+        try:
+            ret_code = self._recursive_write_and_return(
+                command_line, timeout, DEFAULT_COMMAND_RETRIES)
+        except Exception:
+            # the command may or may not have changed any settings, or moved
+            self.resync_settings()
+            self.invalidate_position()
+            raise
 
         ret_code = self._remove_unwanted_characters(command_line, ret_code)
 
         # Smoothieware returns error state if a switch was hit while moving
-        if (ERROR_KEYWORD in ret_code.lower()) or \
-                (ALARM_KEYWORD in ret_code.lower()):
-            self._reset_from_error()
-            error_axis = ret_code.strip()[-1]
-            if GCODES['HOME'] not in command and error_axis in 'XYZABC':
-                self.home(error_axis)
-            raise SmoothieError(ret_code)
+        if _is_error_response(ret_code):
+            self._handle_error_response(command, ret_code)
 
+        self._record_settings(command)
         return ret_code.strip()
 
+    def _handle_error_response(self, command, ret_code):
+        self._reset_from_error()
+        error_axis = ret_code.strip()[-1]
+        if GCODES['HOME'] not in command and error_axis in 'XYZABC':
+            self.home(error_axis)
+        raise SmoothieError(ret_code)
+
+    def _queue_command(self, command, timeout=DEFAULT_SMOOTHIE_TIMEOUT,
+                       motion_time=0.0):
+        '''
+        Streams a command (see `set_streaming`), first waiting for the 'ok'
+        of older streamed commands until fewer than the window are left. If
+        streaming is disabled, this is the same as `_send_command`
+
+        motion_time is the modelled motion time of the command (see
+        `motion_time`), used to know how long streamed moves take, or to
+        time the command otherwise
+        '''
+        if self.simulating or not self._streaming or self._async_connection:
+            start = monotonic()
+            response = self._send_command(command, timeout=timeout)
+            if motion_time and not self.simulating:
+                self._record_motion_timing(motion_time, monotonic() - start)
+            return response
+
+        while len(self._streamed_commands) >= self._stream_window:
+            self._read_stream_ack()
+        serial_communication.write_no_wait(
+            command + SMOOTHIE_STREAM_TERMINATOR, self._connection)
+        self._streamed_commands.append((command, monotonic()))
+        self._streamed_motion_end = max(
+            self._streamed_motion_end, monotonic()
+        ) + self._motion_time.command_time(motion_time)
+        # an error in a streamed command resyncs the settings when it is read
+        self._record_settings(command)
+
+    def _movement_timeout(self, motion_time):
+        '''
+        Timeout in seconds for a move with a modelled motion time of
+        motion_time
+        '''
+        return max(
+            DEFAULT_MOVEMENT_TIMEOUT,
+            MOVEMENT_TIMEOUT_FACTOR * self._motion_time.command_time(
+                motion_time))
+
+    def _record_motion_timing(self, motion_time, measured):
+        log.debug('motion time: modelled {:.3f}s, measured {:.3f}s'.format(
+            motion_time, measured))
+        self.motion_timings.append((motion_time, measured))
+
+    def _read_stream_ack(self):
+        command, sent_at = self._streamed_commands.pop(0)
+        command_line = command + SMOOTHIE_STREAM_TERMINATOR
+        # the dwell in the current prefix of a streamed command is only
+        # answered once the moves before it are done
+        timeout = DEFAULT_MOVEMENT_TIMEOUT + max(
+            0.0, self._streamed_motion_end - monotonic())
+        try:
+            response = serial_communication.read_response(
+                SMOOTHIE_STREAM_ACK,
+                self._connection,
+                timeout=timeout)
+        except serial_communication.SerialNoResponse:
+            serial_stats.record_no_response(self._connection, command_line)
+            self._streamed_commands.clear()
+            self.invalidate_position()
+            raise
+        # timed from the write, so this includes the wait for the commands
+        # streamed before it
+        serial_stats.record(
+            self._connection,
+            command_line,
+            len(response) + len(SMOOTHIE_STREAM_ACK),
+            monotonic() - sent_at)
+        response = self._remove_unwanted_characters(command, response)
+        if _is_error_response(response):
+            # the commands after the failed one are ignored by Smoothieware
+            self._streamed_commands.clear()
+            self._handle_error_response(command, response)
+
+    def _flush_stream(self):
+        '''
+        Waits for the 'ok' of every streamed command
+        '''
+        while self._streamed_commands:
+            self._read_stream_ack()
+
+    def _wait_for_motion(self):
+        '''
+        Waits until all streamed commands are done moving
+        '''
+        if self._streamed_commands:
+            self._send_command('')
+
     def _remove_unwanted_characters(self, command, response):
         # smoothieware can enter a weird state, where it repeats back
         # the sent command at the beginning of its response.
@@ -850,15 +1206,20 @@ class SmoothieDriver_3_0_0:
 
     def _recursive_write_and_return(self, cmd, timeout, retries):
         try:
-            return serial_communication.write_and_return(
-                cmd,
-                SMOOTHIE_ACK,
-                self._connection,
-                timeout=timeout)
+            if self._async_connection:
+                response = self._async_connection.write_and_return_sync(
+                    cmd, SMOOTHIE_ACK, timeout=timeout)
+            else:
+                response = serial_communication.write_and_return(
+                    cmd,
+                    SMOOTHIE_ACK,
+                    self._connection,
+                    timeout=timeout)
         except serial_communication.SerialNoResponse as e:
             retries -= 1
             if retries <= 0:
                 raise e
+            serial_stats.record_retry(self._connection, cmd)
             if not self.simulating:
                 sleep(DEFAULT_STABILIZE_DELAY)
             if self._connection:
@@ -866,8 +1227,15 @@ class SmoothieDriver_3_0_0:
                 self._connection.open()
             return self._recursive_write_and_return(
                 cmd, timeout, retries)
+        if retries < DEFAULT_COMMAND_RETRIES:
+            serial_stats.record_recovery(self._connection, cmd)
+        return response
 
-    def _home_x(self):
+    def _home_x(self, axes='X'):
+        '''
+        Homes X, and the other axes in axes along with it, after backing Y
+        off its switch
+        '''
         log.debug("_home_x")
         # move the gantry forward on Y axis with low power
         self._save_current({'Y': Y_BACKOFF_LOW_CURRENT})
@@ -884,39 +1252,37 @@ class SmoothieDriver_3_0_0:
             GCODES['ABSOLUTE_COORDS']   # set back to abs coordinate system
         )
 
-        command = '{0} {1}'.format(
-            self._generate_current_command(), relative_retract_command)
+        command = self._with_current_command(relative_retract_command)
         self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+        self._update_position({'Y': self._position['Y'] - (
+            int(Y_SWITCH_BACK_OFF_MM) - int(Y_SWITCH_REVERSE_BACK_OFF_MM))})
         self.dwell_axes('Y')
 
         # now it is safe to home the X axis
         try:
+            self._approach_home(axes)
             # override firmware's default XY homing speed, to avoid resonance
             self.set_axis_max_speed({'X': XY_HOMING_SPEED})
-            self.activate_axes('X')
-            command = '{0} {1}'.format(
-                self._generate_current_command(),
-                GCODES['HOME'] + 'X'
-            )
+            self.activate_axes(axes)
+            command = self._with_current_command(
+                GCODES['HOME'] + ''.join(sorted(axes)))
             self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
-            self.update_homed_flags(flags={'X': True})
+            self.update_homed_flags(flags={ax: True for ax in axes})
         finally:
             self.pop_axis_max_speed()
-            self.dwell_axes('X')
+            self.dwell_axes(axes)
             self._set_saved_current()
 
     def _home_y(self):
         log.debug("_home_y")
+        self._approach_home('Y')
         # override firmware's default XY homing speed, to avoid resonance
         self.push_axis_max_speed()
         self.set_axis_max_speed({'Y': XY_HOMING_SPEED})
 
         self.activate_axes('Y')
         # home the Y at normal speed (fast)
-        command = '{0} {1}'.format(
-            self._generate_current_command(),
-            GCODES['HOME'] + 'Y'
-        )
+        command = self._with_current_command(GCODES['HOME'] + 'Y')
         self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
 
         # slow the maximum allowed speed on Y axis
@@ -1028,6 +1394,61 @@ class SmoothieDriver_3_0_0:
         log.debug("_write_to_pipette: {}".format(command))
         self._send_command(command)
 
+    def _path_moves(self, targets):
+        '''
+        Returns the GCode moves through each of the `targets` in order
+        (including any plunger backlash moves), the axes that move, the
+        target of each of those axes at the end of the path, and the target
+        of each of the moves
+        '''
+        from numpy import isclose
+
+        # where Smoothieware will be after the segments so far
+        position = self.position
+
+        def valid_movement(coords, axis):
+            return not (
+                (axis in DISABLE_AXES) or
+                (coords is None) or
+                isclose(coords, position[axis])
+            )
+
+        def create_coords_list(coords_dict):
+            return [
+                axis + str(round(coords, GCODE_ROUNDING_PRECISION))
+                for axis, coords in sorted(coords_dict.items())
+                if valid_movement(coords, axis)
+            ]
+
+        moves = []
+        moving_axes = []
+        final_target = {}
+        move_targets = []
+        for target in targets:
+            backlash_target = target.copy()
+            backlash_target.update({
+                axis: value + PLUNGER_BACKLASH_MM
+                for axis, value in sorted(target.items())
+                if axis in 'BC' and position[axis] < value
+            })
+
+            target_coords = create_coords_list(target)
+            backlash_coords = create_coords_list(backlash_target)
+
+            if target_coords:
+                if backlash_coords != target_coords:
+                    moves.append(GCODES['MOVE'] + ''.join(backlash_coords))
+                    move_targets.append(backlash_target)
+                moves.append(GCODES['MOVE'] + ''.join(target_coords))
+                move_targets.append(target)
+                moving_axes += [ax for ax in target if ax not in moving_axes]
+                final_target.update(target)
+                position.update({
+                    axis: value
+                    for axis, value in target.items() if value is not None
+                })
+        return moves, moving_axes, final_target, move_targets
+
     # ----------- END Private functions ----------- #
 
     # ----------- Public interface ---------------- #
@@ -1049,69 +1470,69 @@ class SmoothieDriver_3_0_0:
             1) Smoothieware boots or resets, 2) if a HALT gcode or signal
             is sent, or 3) a homing/limitswitch error occured.
         '''
-        from numpy import isclose
+        self.move_path([target], home_flagged_axes=home_flagged_axes)
 
-        self.run_flag.wait()
+    def move_path(self, targets, home_flagged_axes=False):
+        '''
+        Move through each of the `targets` in order, as if calling `move()`
+        with each of them, but sent to Smoothieware as a single line of GCode
+        with one current setting and one wait for the whole path
 
-        def valid_movement(coords, axis):
-            return not (
-                (axis in DISABLE_AXES) or
-                (coords is None) or
-                isclose(coords, self.position[axis])
-            )
+        targets: list
+            list of dicts in the format of the `target` of `move()`
 
-        def create_coords_list(coords_dict):
-            return [
-                axis + str(round(coords, GCODE_ROUNDING_PRECISION))
-                for axis, coords in sorted(coords_dict.items())
-                if valid_movement(coords, axis)
-            ]
+        home_flagged_axes: boolean (default=False)
+            See `move()`, applies to the axes of every target
+        '''
+        if not self.run_flag.is_set():
+            # finish streamed moves before pausing
+            self._wait_for_motion()
+        self.run_flag.wait()
 
-        backlash_target = target.copy()
-        backlash_target.update({
-            axis: value + PLUNGER_BACKLASH_MM
-            for axis, value in sorted(target.items())
-            if axis in 'BC' and self.position[axis] < value
-        })
+        if home_flagged_axes:
+            # home before the currents of the move are set, since homing
+            # rests the homed axes
+            self.home_flagged_axes(''.join(self._path_moves(targets)[1]))
+
+        moves, moving_axes, final_target, move_targets = self._path_moves(
+            targets)
 
-        target_coords = create_coords_list(target)
-        backlash_coords = create_coords_list(backlash_target)
+        if moves:
+            motion_time = self._motion_time.path_time(
+                self.position,
+                move_targets,
+                self._combined_speed,
+                self._max_speed_settings)
+            self.estimated_time += self._motion_time.command_time(motion_time)
 
-        if target_coords:
             non_moving_axes = ''.join([
                 ax
                 for ax in AXES
-                if ax not in target.keys()
+                if ax not in moving_axes
             ])
             self.dwell_axes(non_moving_axes)
-            self.activate_axes(target.keys())
+            self.activate_axes(moving_axes)
 
             # include the current-setting gcodes within the moving gcode string
             # to reduce latency, since we're setting current so much
-            command = self._generate_current_command()
-
-            if backlash_coords != target_coords:
-                command += ' ' + GCODES['MOVE'] + ''.join(backlash_coords)
-            command += ' ' + GCODES['MOVE'] + ''.join(target_coords)
+            command = self._with_current_command(' '.join(moves))
 
             try:
-                for axis in target.keys():
+                for axis in moving_axes:
                     self.engaged_axes[axis] = True
-                if home_flagged_axes:
-                    self.home_flagged_axes(''.join(list(target.keys())))
                 log.debug("move: {}".format(command))
-                # TODO (andy) a movement's timeout should be calculated by
-                # how long the movement is expected to take. A default timeout
-                # of 30 seconds prevents any movements that take longer
-                self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+                self._queue_command(
+                    command,
+                    timeout=self._movement_timeout(motion_time),
+                    motion_time=motion_time)
             finally:
                 # dwell pipette motors because they get hot
-                plunger_axis_moved = ''.join(set('BC') & set(target.keys()))
+                plunger_axis_moved = ''.join(set('BC') & set(moving_axes))
                 if plunger_axis_moved:
                     self.dwell_axes(plunger_axis_moved)
                     self._set_saved_current()
 
-            self._update_position(target)
+            self._update_position(final_target)
 
     def home(self, axis=AXES, disabled=DISABLE_AXES):
 
@@ -1129,56 +1550,31 @@ class SmoothieDriver_3_0_0:
         # because of the use of set operations below, which will de-duplicate
         # characters from the resulting string
 
-        # HOME_SEQUENCE defines a pattern for homing, specifically that the
-        # ZABC axes should be homed first so that horizontal movement doesn't
-        # happen with the pipette down (which could bump into things). Then
-        # the X axis is homed, which has to happen before Y. Finally Y can be
-        # homed. This variable will contain the sequence just explained, but
-        # filters out unrequested axes using set intersection (&) and then
-        # filters out disabled axes using set difference (-)
-        home_sequence = list(filter(
-            None,
-            [
-                ''.join(set(group) & set(axis) - set(disabled))
-                for group in HOME_SEQUENCE
-            ]))
+        # The requested axes, without the disabled ones, in the groups they
+        # are homed with, see `_plan_homing`
+        home_sequence = _plan_homing(set(axis) - set(disabled))
 
         non_moving_axes = ''.join([
             ax
             for ax in AXES
-            if ax not in home_sequence
+            if ax not in ''.join(home_sequence)
         ])
         self.dwell_axes(non_moving_axes)
 
         for axes in home_sequence:
             if 'X' in axes:
-                self._home_x()
+                self._home_x(axes)
             elif 'Y' in axes:
                 self._home_y()
             else:
-                # if we are homing neither the X nor Y axes, simple home
-                self.activate_axes(axes)
-
-                # include the current-setting gcodes within the moving gcode
-                # string to reduce latency, since we're setting current so much
-                command = self._generate_current_command()
-                command += ' ' + GCODES['HOME'] + ''.join(sorted(axes))
-                try:
-                    log.debug("home: {}".format(command))
-                    self._send_command(
-                        command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
-                    self.update_homed_flags(flags={ax: True for ax in axes})
-                finally:
-                    # always dwell an axis after it has been homed
-                    self.dwell_axes(axes)
-                    self._set_saved_current()
+                self._home_axes(axes)
 
         # Only update axes that have been selected for homing
         homed = {
             ax: self.homed_position.get(ax)
             for ax in ''.join(home_sequence)
         }
-        self.update_position(default=homed)
+        self._update_homed_position(homed)
         for axis in ''.join(home_sequence):
             self.engaged_axes[axis] = True
 
@@ -1193,6 +1589,79 @@ class SmoothieDriver_3_0_0:
 
         return self.position
 
+    def _home_axes(self, axes):
+        '''
+        Homes axes, which include neither X nor Y, together
+        '''
+        self._approach_home(axes)
+        self.activate_axes(axes)
+
+        # include the current-setting gcodes within the moving gcode
+        # string to reduce latency, since we're setting current so much
+        command = self._with_current_command(
+            GCODES['HOME'] + ''.join(sorted(axes)))
+        try:
+            log.debug("home: {}".format(command))
+            self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+            self.update_homed_flags(flags={ax: True for ax in axes})
+        finally:
+            # always dwell an axis after it has been homed
+            self.dwell_axes(axes)
+            self._set_saved_current()
+
+    def _approach_home(self, axes, safety_margin=HOME_APPROACH_MARGIN):
+        '''
+        Moves the axes at full speed to safety_margin mm from their homed
+        position, so that only that last distance is covered at homing
+        speed, then adds the expected time of homing them to
+        `estimated_time`.
+
+        Only axes whose position is known are moved: homed since Smoothieware
+        was last reset and not uncertain (see `invalidate_position`), and
+        more than twice safety_margin away, for the extra move to be worth it
+        '''
+        destination = {
+            ax: self.homed_position[ax] - safety_margin
+            for ax in axes
+            if self.homed_flags.get(ax)
+            and (self.simulating or ax not in self._uncertain_axes)
+            and self.homed_position[ax] - self._position[ax] >
+            2 * safety_margin
+        }
+        # as in `fast_home`, hitting the switch early is not a problem
+        try:
+            if destination:
+                self.move(destination)
+        except SmoothieError:
+            pass
+        self._estimate_home_time(axes)
+
+    def _update_homed_position(self, homed):
+        '''
+        Sets the position of the homed axes to where homing leaves them, which
+        is read back from Smoothieware the first time they are homed
+        '''
+        self.invalidate_position(''.join(set(homed) - self._known_home_axes))
+        self._uncertain_axes.difference_update(
+            set(homed) & self._known_home_axes)
+        self.update_position(default=homed)
+        if not self.simulating:
+            self._known_home_axes.update(homed)
+
+    def _estimate_home_time(self, axes):
+        '''
+        Adds the expected time of homing axes together to `estimated_time`,
+        as a move to the homed position
+        '''
+        max_speeds = dict(self._max_speed_settings)
+        max_speeds.update({'X': XY_HOMING_SPEED, 'Y': XY_HOMING_SPEED})
+        motion_time = self._motion_time.move_time(
+            self.position,
+            {ax: self.homed_position[ax] for ax in axes},
+            self._combined_speed,
+            max_speeds)
+        self.estimated_time += self._motion_time.command_time(motion_time)
+
     def fast_home(self, axis, safety_margin):
         ''' home after a controlled motor stall
 
@@ -1273,6 +1742,9 @@ class SmoothieDriver_3_0_0:
 
     def pause(self):
         if not self.simulating:
+            # streamed moves finish first, so that what happens during the
+            # pause (e.g. a delay) starts once the robot has stopped
+            self._wait_for_motion()
             self.run_flag.clear()
 
     def resume(self):
@@ -1287,6 +1759,7 @@ class SmoothieDriver_3_0_0:
             seconds=seconds
         )
         log.debug("delay: {}".format(command))
+        self.estimated_time += seconds
         self._send_command(command, timeout=int(seconds) + 1)
 
     def probe_axis(self, axis, probing_distance) -> Dict[str, float]:
@@ -1296,6 +1769,8 @@ class SmoothieDriver_3_0_0:
             log.debug("probe_axis: {}".format(command))
             self._send_command(
                 command=command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+            # where the probe stopped is only known to Smoothieware
+            self.invalidate_position(axis)
             self.update_position(self.position)
             return self.position
         else:
@@ -1350,6 +1825,8 @@ class SmoothieDriver_3_0_0:
         """
         log.debug("kill")
         self._smoothie_hard_halt()
+        # halting drops everything that was streamed
+        self._streamed_commands.clear()
         self._reset_from_error()
         self._setup()
 
@@ -1378,6 +1855,8 @@ class SmoothieDriver_3_0_0:
             sleep(0.25)
             gpio.set_high(gpio.OUTPUT_PINS['RESET'])
             sleep(0.25)
+            self._streamed_commands.clear()
+            self._known_home_axes.clear()
             self._wait_for_ack()
             self._reset_from_error()
 
@@ -1405,5 +1884,6 @@ class SmoothieDriver_3_0_0:
             sleep(0.25)
             gpio.set_high(gpio.OUTPUT_PINS['HALT'])
             sleep(0.25)
+            self.invalidate_position()
 
     # ----------- END Public interface ------------ #
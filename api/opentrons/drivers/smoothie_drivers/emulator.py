@@ -0,0 +1,368 @@
+'''
+An emulated Smoothieware board on a pseudo-terminal, for running the
+Smoothie driver through its whole serial path with no hardware attached.
+
+The emulator speaks the dialect `SmoothieDriver_3_0_0` uses: moves (G0, in
+absolute or relative coordinates), homing (G28.2) and homing status
+(G28.6), position (M114.2), limit switches (M119), currents (M907),
+speeds (G0F, M203.1, M120, M121, M204), dwells (G4), probing (G38.2), the
+pipette memory reads and writes (M369 to M372), version, and M400. A move
+towards a limit switch past the homed position answers with an ALARM and
+halts the board until M999, as Smoothieware does, and `alarm` sends one
+unprompted.
+
+Every line is answered after a configurable latency. Moves take the time
+the motion time model (see `motion_time`) gives with the speeds the
+emulator was sent, times motion_scale (0 to move instantly), and a line
+with M400 is only answered once all moves so far are done.
+
+To run an emulator in its own process:
+
+    python -m opentrons.drivers.smoothie_drivers.emulator --latency 0.002
+
+which prints the port to connect to, for instance with
+`robot.connect(port)`. The `SmoothieEmulator` class runs one in a thread.
+'''
+import logging
+import os
+import re
+import tty
+from argparse import ArgumentParser
+from collections import deque
+from threading import Thread, Lock
+from time import sleep, monotonic
+
+from opentrons.drivers.smoothie_drivers.driver_3_0 import (
+    AXES, HOMED_POSITION, DEFAULT_AXES_SPEED, SEC_PER_MIN)
+from opentrons.drivers.smoothie_drivers.motion_time import (
+    MotionTimeModel, parse_acceleration)
+from opentrons.robot import robot_configs
+
+log = logging.getLogger(__name__)
+
+VERSION = 'Build version: emulator, Build date: Jan 1 2018 00:00:00, ' \
+    'MCU: LPC1769, System Clock: 120MHz'
+ALARM_LOCK = 'error:Alarm lock'
+# How far in mm an axis can go past its homed position before it hits its
+# limit switch
+LIMIT_SWITCH_MARGIN = 0.5
+# Number of received lines kept in `SmoothieEmulator.lines`
+LINES_KEPT = 1000
+
+_WORD_RE = re.compile(r'([A-Z])([^A-Z\s]*)')
+MOUNTS = 'LR'
+
+
+def _parse_commands(line):
+    '''
+    Splits a line of GCode into (code, {letter: value}) for each command in
+    it, such as ('G0', {'X': '10', 'Y': '20'}) for "G0X10Y20"
+    '''
+    commands = []
+    for letter, value in _WORD_RE.findall(line):
+        if letter in 'GM':
+            commands.append((letter + value, {}))
+        elif commands:
+            commands[-1][1][letter] = value
+    return commands
+
+
+class SmoothieEmulator:
+    '''
+    latency:
+        Seconds to wait before answering each line
+    motion_scale:
+        How many times as long as modelled moves take, 0 to move instantly
+    pipettes:
+        Memory of the attached pipettes by mount ('left' or 'right'), as
+        {'id': str, 'model': str}
+    '''
+    def __init__(self, latency=0.0, motion_scale=1.0, pipettes=None):
+        config = robot_configs.load()
+        self.latency = latency
+        self.motion_scale = motion_scale
+        self.position = {axis: 0.0 for axis in AXES}
+        self.homed_position = HOMED_POSITION.copy()
+        self.homed_flags = {axis: False for axis in AXES}
+        self.currents = {}
+        self.halted = False
+        self.relative = False
+        # axes whose limit switch is pressed
+        self.switches = set()
+        # the last lines received
+        self.lines = deque(maxlen=LINES_KEPT)
+        self.pipettes = {
+            mount: {'M369': b'', 'M371': b''} for mount in MOUNTS}
+        for mount, memory in (pipettes or {}).items():
+            memory_by_code = self.pipettes[mount[0].upper()]
+            memory_by_code['M369'] = memory.get('id', '').encode()
+            memory_by_code['M371'] = memory.get('model', '').encode()
+
+        acceleration, axis_accelerations = parse_acceleration(
+            config.acceleration)
+        self._motion_time = MotionTimeModel(
+            config.default_max_speed, acceleration, axis_accelerations)
+        self._speed = float(DEFAULT_AXES_SPEED)
+        self._saved_speeds = []
+        # monotonic() time when the moves so far are done
+        self._motion_end = 0.0
+
+        self._master = None
+        self._slave = None
+        self._write_lock = Lock()
+        self._handlers = {
+            'G0': self._move,
+            'G1': self._move,
+            'G4': self._dwell,
+            'G28.2': self._home,
+            'G28.6': self._homing_status,
+            'G38.2': self._probe,
+            'G90': self._absolute,
+            'G91': self._relative,
+            'M114.2': self._report_position,
+            'M119': self._switches,
+            'M120': self._push_speed,
+            'M121': self._pop_speed,
+            'M203.1': self._set_max_speed,
+            'M204': self._set_acceleration,
+            'M907': self._set_current,
+            'M369': self._read_memory,
+            'M371': self._read_memory,
+            'M370': self._write_memory,
+            'M372': self._write_memory,
+            'M400': self._wait_for_motion,
+            'M999': self._reset,
+        }
+
+    @property
+    def port(self) -> str:
+        return os.ttyname(self._slave) if self._slave is not None else None
+
+    def start(self) -> str:
+        '''
+        Opens the pseudo-terminal and starts answering on it in a thread.
+        Returns the port to connect to
+        '''
+        self._master, self._slave = os.openpty()
+        # the emulator keeps its end open so that the driver can reopen the
+        # port, as it does when retrying
+        tty.setraw(self._slave)
+        Thread(target=self._run, name='smoothie-emulator', daemon=True).start()
+        return self.port
+
+    def stop(self):
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def alarm(self, message='ALARM: Hard limit +X'):
+        '''
+        Sends an alarm nobody asked for, and halts until M999
+        '''
+        self._halt()
+        self._write(message + '\r\n')
+
+    def _run(self):
+        buffer = b''
+        while True:
+            try:
+                data = os.read(self._master, 1024)
+            except (OSError, TypeError):
+                return
+            if not data:
+                return
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                response = self.handle_line(line.decode(errors='replace'))
+                if self.latency:
+                    sleep(self.latency)
+                self._write(response)
+
+    def _write(self, text):
+        with self._write_lock:
+            try:
+                os.write(self._master, text.encode())
+            except (OSError, TypeError):
+                pass
+
+    def handle_line(self, line) -> str:
+        '''
+        Runs a line of GCode and returns the response, ending in "ok"
+        '''
+        line = line.strip()
+        self.lines.append(line)
+        if not line:
+            return 'ok\r\n'
+
+        output = []
+        if line.startswith('version'):
+            output.append(VERSION)
+            line = line[len('version'):]
+        for code, params in _parse_commands(line):
+            if self.halted and code != 'M999':
+                output = [ALARM_LOCK]
+                break
+            handler = self._handlers.get(code)
+            result = handler(code, params) if handler else None
+            if result:
+                output.append(result)
+            if self.halted:
+                break
+        return ''.join(text + '\r\n' for text in output) + 'ok\r\n'
+
+    def _halt(self):
+        self.halted = True
+        self.homed_flags = {axis: False for axis in AXES}
+        self._motion_end = 0.0
+
+    def _add_motion(self, seconds):
+        self._motion_end = max(self._motion_end, monotonic()) + \
+            seconds * self.motion_scale
+
+    def _move(self, code, params):
+        target = {}
+        for axis in AXES:
+            if axis in params:
+                value = float(params[axis])
+                target[axis] = self.position[axis] + value \
+                    if self.relative else value
+        if 'F' in params:
+            self._speed = float(params['F']) / SEC_PER_MIN
+        for axis, value in sorted(target.items()):
+            limit = self.homed_position[axis] + LIMIT_SWITCH_MARGIN
+            if value > limit:
+                self._add_motion(self._motion_time.move_time(
+                    self.position, {axis: limit}, self._speed))
+                self.position[axis] = limit
+                self.switches.add(axis)
+                self._halt()
+                return 'ALARM: Hard limit +{}'.format(axis)
+        self._add_motion(self._motion_time.move_time(
+            self.position, target, self._speed))
+        self.position.update(target)
+
+    def _dwell(self, code, params):
+        self._wait_for_motion()
+        seconds = float(params.get('P') or 0) + float(params.get('S') or 0)
+        sleep(seconds * self.motion_scale)
+
+    def _home(self, code, params):
+        axes = [axis for axis in AXES if axis in params]
+        self._add_motion(self._motion_time.move_time(
+            self.position,
+            {axis: self.homed_position[axis] for axis in axes},
+            self._speed))
+        self._wait_for_motion()
+        for axis in axes:
+            self.position[axis] = float(self.homed_position[axis])
+            self.homed_flags[axis] = True
+            # homing backs off the switch once it is found
+            self.switches.discard(axis)
+
+    def _homing_status(self, code, params):
+        return ' '.join(
+            '{}:{}'.format(axis, int(self.homed_flags[axis]))
+            for axis in AXES)
+
+    def _probe(self, code, params):
+        # the probe is touched at the end of the move
+        self._move(code, params)
+        self._wait_for_motion()
+
+    def _absolute(self, code, params):
+        self.relative = False
+
+    def _relative(self, code, params):
+        self.relative = True
+
+    def _report_position(self, code, params):
+        return 'ok MCS: ' + ' '.join(
+            '{}:{:.4f}'.format(axis, self.position[axis]) for axis in AXES)
+
+    def _switches(self, code, params):
+        return ' '.join(
+            '{}_max:{}'.format(axis, int(axis in self.switches))
+            for axis in AXES) + ' Probe: 0'
+
+    def _push_speed(self, code, params):
+        self._saved_speeds.append(self._speed)
+
+    def _pop_speed(self, code, params):
+        if self._saved_speeds:
+            self._speed = self._saved_speeds.pop()
+
+    def _set_max_speed(self, code, params):
+        self._motion_time.max_speeds.update({
+            axis: float(value)
+            for axis, value in params.items() if axis in AXES})
+
+    def _set_acceleration(self, code, params):
+        if 'S' in params:
+            self._motion_time.acceleration = float(params['S'])
+        self._motion_time.axis_accelerations.update({
+            axis: float(value)
+            for axis, value in params.items() if axis in AXES})
+
+    def _set_current(self, code, params):
+        self.currents.update({
+            axis: float(value)
+            for axis, value in params.items() if axis in AXES})
+
+    def _read_memory(self, code, params):
+        mount = next((m for m in MOUNTS if m in params), None)
+        data = self.pipettes[mount][code] if mount else b''
+        if data:
+            return '{}:{}'.format(mount, data.hex())
+
+    def _write_memory(self, code, params):
+        mount = next((m for m in MOUNTS if m in params), None)
+        if mount:
+            read_code = 'M{}'.format(int(code[1:]) - 1)
+            self.pipettes[mount][read_code] = bytes.fromhex(params[mount])
+
+    def _wait_for_motion(self, code=None, params=None):
+        left = self._motion_end - monotonic()
+        if left > 0:
+            sleep(left)
+
+    def _reset(self, code, params):
+        self.halted = False
+        self.relative = False
+
+
+def main():
+    parser = ArgumentParser(
+        description='Emulates a Smoothieware board on a pseudo-terminal')
+    parser.add_argument(
+        '--latency', type=float, default=0.0,
+        help='seconds to wait before answering each line')
+    parser.add_argument(
+        '--motion-scale', type=float, default=1.0,
+        help='how many times as long as modelled moves take (0: instant)')
+    parser.add_argument(
+        '--left-model', help='model of the pipette on the left mount')
+    parser.add_argument(
+        '--right-model', help='model of the pipette on the right mount')
+    args = parser.parse_args()
+
+    pipettes = {
+        mount: {'id': mount + '-emulated', 'model': model}
+        for mount, model in [
+            ('left', args.left_model), ('right', args.right_model)]
+        if model}
+    emulator = SmoothieEmulator(
+        latency=args.latency,
+        motion_scale=args.motion_scale,
+        pipettes=pipettes)
+    print(emulator.start(), flush=True)
+    try:
+        while True:
+            sleep(60)
+    except KeyboardInterrupt:
+        emulator.stop()
+
+
+if __name__ == '__main__':
+    main()
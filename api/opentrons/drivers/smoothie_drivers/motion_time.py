@@ -0,0 +1,164 @@
+'''
+Expected durations of Smoothieware moves.
+
+Each G0 move is modelled the way Smoothieware plans it: a straight line
+through all of its axes, at the feed rate (the combined speed of the
+cartesian axes, or of the fastest other axis if none of X, Y or Z move),
+slowed down so that no axis goes over its max speed or acceleration, with
+a trapezoidal velocity profile that starts and ends at rest.
+
+The model can be calibrated against timed moves (see `calibrate`), as the
+time a command takes also includes the serial round trip and the wait for
+M400.
+'''
+from math import sqrt
+from typing import Dict, List, Tuple
+
+CARTESIAN_AXES = 'XYZ'
+# Moves shorter than this (in mm) do not move at all
+MIN_MOVE_DISTANCE = 0.00001
+
+
+def parse_acceleration(gcode: str) -> Tuple[float, Dict[str, float]]:
+    '''
+    Returns the default acceleration and the acceleration of each axis, in
+    mm/sec^2, from an M204 command such as
+    "M204 S10000 X3000 Y2000 Z1500 A1500 B2000 C2000"
+    '''
+    default = None
+    axes = {}
+    for word in gcode.split()[1:]:
+        letter, value = word[0].upper(), float(word[1:])
+        if letter == 'S':
+            default = value
+        else:
+            axes[letter] = value
+    return default, axes
+
+
+def trapezoid_time(distance, speed, acceleration) -> float:
+    '''
+    Time in seconds to move distance (mm) from rest to rest, accelerating
+    and decelerating at acceleration (mm/sec^2) up to at most speed (mm/sec)
+    '''
+    if distance <= 0:
+        return 0.0
+    if distance * acceleration < speed * speed:
+        # never reaches speed
+        return 2 * sqrt(distance / acceleration)
+    return distance / speed + speed / acceleration
+
+
+class MotionTimeModel:
+    '''
+    max_speeds:
+        The default max speed of each axis in mm/sec, used when a move does
+        not give its own
+    acceleration:
+        The default acceleration in mm/sec^2, which each axis' own
+        acceleration may lower further
+    axis_accelerations:
+        The acceleration of each axis in mm/sec^2
+    scale, overhead:
+        The time a command is expected to take is scale times the modelled
+        motion time plus overhead seconds (see `calibrate`)
+    '''
+    def __init__(self, max_speeds, acceleration, axis_accelerations,
+                 scale=1.0, overhead=0.0):
+        self.max_speeds = dict(max_speeds)
+        self.acceleration = acceleration
+        self.axis_accelerations = dict(axis_accelerations)
+        self.scale = scale
+        self.overhead = overhead
+
+    @classmethod
+    def from_config(cls, config, scale=1.0, overhead=0.0):
+        '''
+        Builds a model from the `acceleration` and `default_max_speed` of a
+        `robot_configs.robot_config`
+        '''
+        acceleration, axis_accelerations = parse_acceleration(
+            config.acceleration)
+        return cls(config.default_max_speed, acceleration, axis_accelerations,
+                   scale=scale, overhead=overhead)
+
+    def move_time(self, start, target, speed, max_speeds=None) -> float:
+        '''
+        Modelled time in seconds for a single move
+
+        start: dict
+            position of every axis before the move
+        target: dict
+            position of the axes that move (other axes, or None values,
+            stay where they are)
+        speed: float
+            the feed rate in mm/sec
+        max_speeds: dict
+            max speed of each axis in mm/sec, if not the default ones
+        '''
+        max_speeds = max_speeds or self.max_speeds
+        deltas = {
+            axis: abs(value - start[axis])
+            for axis, value in target.items()
+            if value is not None and value != start[axis]}
+        distance = sqrt(sum(
+            deltas.get(axis, 0) ** 2 for axis in CARTESIAN_AXES))
+        if distance < MIN_MOVE_DISTANCE:
+            distance = max(deltas.values(), default=0)
+        if distance < MIN_MOVE_DISTANCE:
+            return 0.0
+
+        acceleration = self.acceleration
+        for axis, delta in deltas.items():
+            fraction = delta / distance
+            if axis in max_speeds:
+                speed = min(speed, max_speeds[axis] / fraction)
+            if axis in self.axis_accelerations:
+                acceleration = min(
+                    acceleration, self.axis_accelerations[axis] / fraction)
+        return trapezoid_time(distance, speed, acceleration)
+
+    def path_time(self, start, targets, speed, max_speeds=None) -> float:
+        '''
+        Modelled time in seconds for the moves to each of targets in order
+        (see `move_time`), before scale and overhead are applied
+        '''
+        position = dict(start)
+        total = 0.0
+        for target in targets:
+            total += self.move_time(position, target, speed, max_speeds)
+            position.update({
+                axis: value
+                for axis, value in target.items() if value is not None})
+        return total
+
+    def command_time(self, motion_time) -> float:
+        '''
+        Expected time in seconds for a command whose modelled motion time
+        is motion_time
+        '''
+        return self.scale * motion_time + self.overhead
+
+    def calibrate(self, samples: List[Tuple[float, float]]):
+        '''
+        Returns a copy of this model with the scale and overhead that best
+        fit (by least squares) the samples, a list of (modelled motion time,
+        measured command time) in seconds. With fewer than two distinct
+        motion times only the overhead is fitted
+        '''
+        count = len(samples)
+        if not count:
+            return self
+        mean_modelled = sum(modelled for modelled, _ in samples) / count
+        mean_measured = sum(measured for _, measured in samples) / count
+        variance = sum(
+            (modelled - mean_modelled) ** 2 for modelled, _ in samples)
+        scale = self.scale
+        if variance > 0:
+            scale = sum(
+                (modelled - mean_modelled) * (measured - mean_measured)
+                for modelled, measured in samples) / variance
+        overhead = max(0.0, mean_measured - scale * mean_modelled)
+        return MotionTimeModel(
+            self.max_speeds, self.acceleration, self.axis_accelerations,
+            scale=scale, overhead=overhead)
@@ -5,7 +5,8 @@ from time import sleep
 
 from serial.serialutil import SerialException
 
-from opentrons.drivers import serial_communication
+from opentrons.drivers import serial_communication, serial_stats
+from opentrons.drivers.async_serial import AsyncSerial
 from opentrons.drivers.serial_communication import SerialNoResponse
 
 '''
@@ -162,6 +163,11 @@ class TempDeck:
         self._connection = None
         self._config = config
 
+        # When async I/O is enabled (see `set_async_io`) every command goes
+        # through the ordered queue of this wrapper of `_connection`
+        self._async_io = False
+        self._async_connection = None
+
         self._temperature = {'current': 25, 'target': None}
         self._update_thread = None
 
@@ -171,16 +177,40 @@ class TempDeck:
         try:
             self.disconnect()
             self._connect_to_port(port)
+            self.set_async_io(self._async_io)
             self._wait_for_ack()  # verify the device is there
         except (SerialException, SerialNoResponse) as e:
             return str(e)
         return ''
 
     def disconnect(self):
+        self._close_async_connection()
         if self.is_connected():
             self._connection.close()
         self._connection = None
 
+    def set_async_io(self, enabled):
+        '''
+        Runs every command through an ordered queue on the event loop shared
+        by all serial devices (see `opentrons.drivers.async_serial`), whose
+        reader frames the responses as they arrive
+        '''
+        self._async_io = bool(enabled)
+        self._close_async_connection()
+        if self._async_io and self.is_connected():
+            self._async_connection = AsyncSerial(
+                self._connection, on_unsolicited=self._handle_unsolicited)
+
+    def _close_async_connection(self):
+        if self._async_connection:
+            self._async_connection.close()
+        self._async_connection = None
+
+    def _handle_unsolicited(self, line):
+        if (ERROR_KEYWORD in line.lower()) or (ALARM_KEYWORD in line.lower()):
+            log.error(
+                'Unsolicited error message from Temp-Deck: {}'.format(line))
+
     def is_connected(self) -> bool:
         if not self._connection:
             return False
@@ -293,6 +323,7 @@ class TempDeck:
                 port=port,
                 baudrate=TEMP_DECK_BAUDRATE
             )
+            serial_stats.name_device(self._connection, 'temp-deck')
         except SerialException:
             # if another process is using the port, pyserial raises an
             # exception that describes a "readiness to read" which is confusing
@@ -329,21 +360,29 @@ class TempDeck:
 
     def _recursive_write_and_return(self, cmd, timeout, retries):
         try:
-            return serial_communication.write_and_return(
-                cmd,
-                TEMP_DECK_ACK,
-                self._connection,
-                timeout)
+            if self._async_connection:
+                response = self._async_connection.write_and_return_sync(
+                    cmd, TEMP_DECK_ACK, timeout)
+            else:
+                response = serial_communication.write_and_return(
+                    cmd,
+                    TEMP_DECK_ACK,
+                    self._connection,
+                    timeout)
         except SerialNoResponse as e:
             retries -= 1
             if retries <= 0:
                 raise e
+            serial_stats.record_retry(self._connection, cmd)
             sleep(DEFAULT_STABILIZE_DELAY)
             if self._connection:
                 self._connection.close()
                 self._connection.open()
             return self._recursive_write_and_return(
                 cmd, timeout, retries)
+        if retries < DEFAULT_COMMAND_RETRIES:
+            serial_stats.record_recovery(self._connection, cmd)
+        return response
 
     def _recursive_update_temperature(self, retries) -> dict:
         try:
@@ -12,6 +12,7 @@ from opentrons.containers.placeable import (
 )
 from opentrons.helpers import helpers
 from opentrons.trackers import pose_tracker
+from opentrons.robot.mover import move_path
 
 log = logging.getLogger(__name__)
 
@@ -1826,6 +1827,29 @@ class Pipette:
 
         return pose_tree
 
+    def _move_path(self, pose_tree, waypoints):
+        """
+        Moves through each of the `waypoints`, dicts of x, y and z as passed
+        to `_move`, with a single driver command (see `mover.move_path`)
+        """
+        x, y, _ = pose_tracker.absolute(pose_tree, self)
+        dx, dy, dz = pose_tracker.change_base(
+            pose_tree,
+            src=self,
+            dst=self.mount)
+
+        path = []
+        for waypoint in waypoints:
+            new_x, new_y, new_z = [waypoint.get(axis) for axis in 'xyz']
+            if new_x is not None or new_y is not None:
+                x = x if new_x is None else new_x
+                y = y if new_y is None else new_y
+                path.append((self.robot.gantry, {'x': x - dx, 'y': y - dy}))
+            if new_z is not None:
+                path.append((self.instrument_mover, {'z': new_z - dz}))
+
+        return move_path(pose_tree, path)
+
     def _jog(self, pose_tree, axis, distance):
         assert axis in 'xyz', "Axis must be 'x', 'y', or 'z'"
         if axis in 'xy':
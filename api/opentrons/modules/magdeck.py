@@ -1,4 +1,5 @@
 from opentrons.drivers.mag_deck import MagDeck as MagDeckDriver
+from opentrons.config import feature_flags as fflags
 from opentrons import commands
 
 LABWARE_ENGAGE_HEIGHT = {'biorad-hardshell-96-PCR': 18}    # mm
@@ -112,6 +113,7 @@ class MagDeck:
         if self._port:
             self._driver = MagDeckDriver()
             self._driver.connect(self._port)
+            self._driver.set_async_io(fflags.async_serial_io())
             self._device_info = self._driver.get_device_info()
         else:
             # Sanity check: Should never happen, because connect should
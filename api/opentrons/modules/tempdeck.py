@@ -1,5 +1,6 @@
 from threading import Thread, Event
 from opentrons.drivers.temp_deck import TempDeck as TempDeckDriver
+from opentrons.config import feature_flags as fflags
 from opentrons import commands
 
 TEMP_POLL_INTERVAL_SECS = 1
@@ -120,6 +121,7 @@ class TempDeck:
         if self._port:
             self._driver = TempDeckDriver()
             self._driver.connect(self._port)
+            self._driver.set_async_io(fflags.async_serial_io())
             self._device_info = self._driver.get_device_info()
 
             self._poll_stop_event = Event()
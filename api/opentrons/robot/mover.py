@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from ..trackers.pose_tracker import Point, change_base, update, ROOT
 
 
@@ -37,6 +38,28 @@ class Mover:
             within this Mover's axis_mapping is homed before moving, if it has
             not yet done so. See driver docstring for details
         """
+        driver_target, point = self._driver_target(pose_tree, x, y, z)
+        self._driver.move(driver_target, home_flagged_axes=home_flagged_axes)
+
+        # Update pose with the new value. Since stepper motors are open loop
+        # there is no need to to query diver for position
+        return update(pose_tree, self, point)
+
+    def move_path(self, pose_tree, waypoints, home_flagged_axes=True):
+        """
+        Move through each of the `waypoints` in order, each a dict of x, y
+        and z as passed to `move`. See the `move_path` function
+        """
+        return move_path(
+            pose_tree,
+            [(self, waypoint) for waypoint in waypoints],
+            home_flagged_axes=home_flagged_axes)
+
+    def _driver_target(self, pose_tree, x=None, y=None, z=None):
+        """
+        Returns the driver target of a move to x, y and z, and the point to
+        update this Mover's pose to once it is done
+        """
         def defaults(_x, _y, _z):
             _x = _x if x is not None else 0
             _y = _y if y is not None else 0
@@ -61,11 +84,7 @@ class Mover:
         if 'z' in self._axis_mapping:
             assert z is not None, "Value must be set for each axis mapped"
             driver_target[self._axis_mapping['z']] = dst_z
-        self._driver.move(driver_target, home_flagged_axes=home_flagged_axes)
-
-        # Update pose with the new value. Since stepper motors are open loop
-        # there is no need to to query diver for position
-        return update(pose_tree, self, Point(*defaults(dst_x, dst_y, dst_z)))
+        return driver_target, Point(*defaults(dst_x, dst_y, dst_z))
 
     def home(self, pose_tree):
         self._driver.home(axis=''.join(self._axis_mapping.values()))
@@ -150,3 +169,30 @@ class Mover:
         )
 
         return update(pose_tree, self, point)
+
+
+def move_path(pose_tree, path, home_flagged_axes=True):
+    """
+    Move through a path of waypoints with a single driver command, rather
+    than one `Mover.move` per waypoint. Each waypoint is a pair of a Mover
+    and the dict of x, y and z it would be passed to `Mover.move`, and all
+    Movers must share a driver. Poses are updated once the whole path is
+    done, to the last waypoint of each Mover
+    """
+    if not path:
+        return pose_tree
+
+    driver = path[0][0]._driver
+    targets = []
+    points = OrderedDict()
+    for mover, waypoint in path:
+        assert mover._driver is driver, "Movers must share a driver"
+        driver_target, point = mover._driver_target(pose_tree, **waypoint)
+        targets.append(driver_target)
+        points[mover] = point
+
+    driver.move_path(targets, home_flagged_axes=home_flagged_axes)
+
+    for mover, point in points.items():
+        pose_tree = update(pose_tree, mover, point)
+    return pose_tree
@@ -1,6 +1,5 @@
 import os
 import logging
-from functools import lru_cache
 
 import opentrons.util.calibration_functions as calib
 from numpy import add, subtract
@@ -20,6 +19,8 @@ log = logging.getLogger(__name__)
 
 TIP_CLEARANCE_DECK = 20    # clearance when moving between different labware
 TIP_CLEARANCE_LABWARE = 5  # clearance when staying within a single labware
+ARC_PATH_MARGIN = 10       # XY clearance around labware under an arc path
+MULTI_CHANNEL_SPACING = 9  # mm between the nozzles of a multi-channel pipette
 
 
 def _setup_container(container_name):
@@ -175,6 +176,9 @@ class Robot(object):
         }
 
         self.poses = pose_tracker.init()
+        # XY footprint of each container on the deck, see
+        # `_labware_footprint`
+        self._labware_footprints = {}
 
         self._runtime_warnings = []
 
@@ -393,6 +397,8 @@ class Robot(object):
         """
 
         self._driver.connect(port=port)
+        self._driver.set_streaming(fflags.stream_gcode())
+        self._driver.set_async_io(fflags.async_serial_io())
         self.fw_version = self._driver.get_fw_version()
 
         # the below call to `cache_instrument_models` is relied upon by
@@ -412,27 +418,30 @@ class Robot(object):
         Home robot's head and plunger motors.
         """
 
-        # Home gantry first to avoid colliding with labware
-        # and to make sure tips are not in the liquid while
-        # homing plungers. Z/A axis will automatically home before X/Y
-        self.poses = self.gantry.home(self.poses)
-        # Then plungers
-        self.poses = self._actuators['left']['plunger'].home(self.poses)
-        self.poses = self._actuators['right']['plunger'].home(self.poses)
+        # Home every axis at once, so that the driver homes as many of them
+        # together as is safe: the Z/A axes first, to avoid colliding with
+        # labware and to make sure tips are not in the liquid while homing
+        # plungers, then the plungers along with X, then Y
+        self._driver.home()
+        self.poses = self.gantry.update_pose_from_driver(self.poses)
 
         # next move should not use any previously used instrument or labware
         # to prevent robot.move_to() from using risky path optimization
         self._previous_instrument = None
         self._prev_container = None
 
-        # explicitly update carriage Mover positions in pose tree
+        # explicitly update Mover positions in pose tree
         # because their Mover.home() commands aren't used here
         for a in self._actuators.values():
-            self.poses = a['carriage'].update_pose_from_driver(self.poses)
+            for mover in a.values():
+                self.poses = mover.update_pose_from_driver(self.poses)
 
     def home_z(self):
+        # both mounts are homed together
+        self._driver.home('ZA')
         for mount in ['left', 'right']:
-            self.poses = self._actuators[mount]['carriage'].home(self.poses)
+            self.poses = self._actuators[mount]['carriage'] \
+                .update_pose_from_driver(self.poses)
 
     def move_head(self, *args, **kwargs):
         self.poses = self.gantry.move(self.poses, **kwargs)
@@ -520,18 +529,16 @@ class Robot(object):
         if self._previous_instrument:
             if self._previous_instrument != instrument:
                 self._previous_instrument.retract()
-                # because we're switching pipettes, this ensures a large (safe)
-                # Z arc height will be used for the new pipette
+                # because we're switching pipettes, the new pipette's arc is
+                # not relative to the last container, but clears the tallest
+                # labware under its path (see `_create_arc`)
                 self._prev_container = None
 
         self._previous_instrument = instrument
 
         if strategy == 'arc':
             arc_coords = self._create_arc(instrument, target, placeable)
-            for coord in arc_coords:
-                self.poses = instrument._move(
-                    self.poses,
-                    **coord)
+            self.poses = instrument._move_path(self.poses, arc_coords)
 
         elif strategy == 'direct':
             position = {'x': target[0], 'y': target[1], 'z': target[2]}
@@ -564,8 +571,12 @@ class Robot(object):
             # bring the pipettes up as high as possible while calibrating
             arc_top = inst._max_deck_height()
         else:
-            # bring pipette up above the tallest container currently on deck
-            arc_top = self.max_deck_height() + TIP_CLEARANCE_DECK
+            # bring pipette up above the tallest container under its path
+            height = self._max_height_under_path(inst, destination)
+            if height is None:
+                # nothing is under the path, so only clear the deck
+                height = 0
+            arc_top = height + TIP_CLEARANCE_DECK
 
         self._prev_container = this_container
 
@@ -583,6 +594,17 @@ class Robot(object):
 
         return strategy
 
+    def _max_height_under_path(self, inst, destination):
+        """
+        Height of the tallest labware below the straight XY path from the
+        instrument's current position to destination, or None if there is
+        none
+        """
+        start = pose_tracker.absolute(self.poses, inst)
+        # the other nozzles of a multi-channel trail behind the first one
+        reach = (0, -MULTI_CHANNEL_SPACING * (inst.channels - 1))
+        return self.max_deck_height_along(start, destination, reach)
+
     def disconnect(self):
         """
         Disconnects from the robot.
@@ -710,7 +732,6 @@ class Robot(object):
             if self._is_available_slot(location, share, slot, name):
                 location.add(container, label or name)
             self.add_container_to_pose_tracker(location, container)
-            self.max_deck_height.cache_clear()
         return container
 
     def add_container_to_pose_tracker(self, location, container: Container):
@@ -724,21 +745,62 @@ class Robot(object):
             container.parent,
             pose_tracker.Point(*container._coordinates))
 
-        for well in container:
+        split_definitions = fflags.split_labware_definitions()
+        wells = list(container)
+        points = []
+        for well in wells:
             center_x, center_y, center_z = well.top()[1]
             offset_x, offset_y, offset_z = well._coordinates
-            if not fflags.split_labware_definitions():
+            if not split_definitions:
                 center_z = 0
-            self.poses = pose_tracker.add(
-                self.poses,
-                well,
-                container,
-                pose_tracker.Point(
-                    center_x + offset_x,
-                    center_y + offset_y,
-                    center_z + offset_z
-                )
-            )
+            points.append(pose_tracker.Point(
+                center_x + offset_x,
+                center_y + offset_y,
+                center_z + offset_z
+            ))
+
+        self.poses = pose_tracker.add_many(
+            self.poses,
+            wells,
+            container,
+            points
+        )
+
+        footprint = self._labware_footprint(container, wells, points)
+        if footprint is not None:
+            self._labware_footprints[container] = footprint
+
+    @staticmethod
+    def _labware_footprint(container, wells, points):
+        """
+        (min, max) XY corners of what container covers, in its coordinate
+        system: each well (its point, plus or minus half its width and
+        length), and the container's own footprint or, if that is not
+        known, the slot it is in. None if neither footprint is known
+        """
+        corners = []
+        width, length = container.properties.get('width'), \
+            container.properties.get('length')
+        slot = container.parent
+        if width and length:
+            corners += [(0, 0), (width, length)]
+        elif slot is not None and slot.properties.get('width') \
+                and slot.properties.get('length'):
+            x, y, _ = container._coordinates
+            corners += [
+                (-x, -y),
+                (slot.properties['width'] - x, slot.properties['length'] - y)]
+        else:
+            return None
+
+        for well, point in zip(wells, points):
+            half_x = (well.properties.get('width') or 0) / 2
+            half_y = (well.properties.get('length') or 0) / 2
+            corners += [
+                (point.x - half_x, point.y - half_y),
+                (point.x + half_x, point.y + half_y)]
+        xs, ys = zip(*corners)
+        return (min(xs), min(ys)), (max(xs), max(ys))
 
     @commands.publish.both(command=commands.pause)
     def pause(self):
@@ -878,12 +940,25 @@ class Robot(object):
             save
         )
 
-        self.max_deck_height.cache_clear()
-
-    @lru_cache()
     def max_deck_height(self):
+        # bounding boxes are memoized in the pose tree and only rebuilt
+        # for the ancestors of whatever moved since the last call
         return pose_tracker.max_z(self.poses, self._deck)
 
+    def max_deck_height_along(self, start, end, reach=(0, 0)):
+        """
+        :param start: XY(Z) deck coordinate the path starts from
+        :param end: XY(Z) deck coordinate the path ends at
+        :param reach: XY extent of the moving object behind each point
+        :return: Calibrated height in mm of the tallest labware whose
+        footprint is within ARC_PATH_MARGIN of the path, or None. Labware
+        whose footprint is not known always count
+        """
+        return pose_tracker.max_z_along(
+            self.poses, self._deck, start, end,
+            margin=ARC_PATH_MARGIN, reach=reach,
+            footprints=self._labware_footprints)
+
     def max_placeable_height_on_deck(self, placeable):
         """
         :param placeable:
@@ -5,6 +5,7 @@ import logging
 from aiohttp import web
 from threading import Thread
 from opentrons import robot, instruments, modules
+from opentrons.drivers import serial_stats
 from opentrons.instruments import pipette_config
 from opentrons.trackers import pose_tracker
 
@@ -119,6 +120,35 @@ async def get_engaged_axes(request):
          for k, v in robot._driver.engaged_axes.items()})
 
 
+async def get_serial_stats(request):
+    """
+    Counters of the commands sent to each serial device since the server
+    started, by G-code verb (see `opentrons.drivers.serial_stats`). If the
+    caller supplies the "reset=true" query parameter, the counters are
+    cleared after they are read. The counters are also logged.
+
+    Response shape example:
+        {"smoothie /dev/ttyAMA0": {
+            "M907 G4 G0": {
+                "count": 12,
+                "bytes_sent": 900,
+                "bytes_received": 96,
+                "no_responses": 0,
+                "retries": 0,
+                "recoveries": 0,
+                "latency": {
+                    "total": 4.2, "mean": 0.35, "max": 1.1,
+                    "histogram": [{"le": 0.001, "count": 0}, ...,
+                                  {"le": null, "count": 0}]}},
+            ...}, ...}
+    """
+    res = serial_stats.stats()
+    serial_stats.log_stats()
+    if request.url.query.get('reset') == 'true':
+        serial_stats.reset()
+    return web.json_response(res)
+
+
 async def disengage_axes(request):
     """
     Disengage axes (turn off power) primarily in order to reduce heat
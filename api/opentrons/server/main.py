@@ -196,6 +196,8 @@ def init(loop=None):
         '/motors/engaged', control.get_engaged_axes)
     server.app.router.add_post(
         '/motors/disengage', control.disengage_axes)
+    server.app.router.add_get(
+        '/debug/serial-stats', control.get_serial_stats)
     server.app.router.add_get(
         '/robot/positions', control.position_info)
     server.app.router.add_post(
@@ -0,0 +1,240 @@
+"""
+A persistent (immutable) hash map based on a hash array mapped trie.
+
+Every "mutating" operation returns a new map that shares all untouched
+branches with the original, so setting or deleting a key costs O(log32 n)
+instead of the O(n) of copying a dict. The original map is never modified,
+which makes it safe to keep references to previous versions around.
+"""
+from collections.abc import Mapping
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+HASH_MASK = (1 << 64) - 1
+
+
+def _hash(key) -> int:
+    return hash(key) & HASH_MASK
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count('1')
+
+
+def _same_key(k1, k2) -> bool:
+    return k1 is k2 or k1 == k2
+
+
+class _Leaf:
+    __slots__ = ('hash', 'key', 'value')
+
+    def __init__(self, hash_, key, value):
+        self.hash = hash_
+        self.key = key
+        self.value = value
+
+    def get(self, shift, hash_, key):
+        if _same_key(self.key, key):
+            return self.value
+        raise KeyError(key)
+
+    def assoc(self, shift, leaf):
+        if _same_key(self.key, leaf.key):
+            return leaf, False
+        return _merge(self, leaf, shift), True
+
+    def dissoc(self, shift, hash_, key):
+        if _same_key(self.key, key):
+            return None
+        raise KeyError(key)
+
+    def leaves(self):
+        yield self
+
+
+class _Collision:
+    """ Leaves whose keys have exactly the same 64 bit hash """
+    __slots__ = ('hash', 'items')
+
+    def __init__(self, hash_, items):
+        self.hash = hash_
+        self.items = items
+
+    def _index(self, key):
+        for index, leaf in enumerate(self.items):
+            if _same_key(leaf.key, key):
+                return index
+        return -1
+
+    def get(self, shift, hash_, key):
+        index = self._index(key)
+        if index < 0:
+            raise KeyError(key)
+        return self.items[index].value
+
+    def assoc(self, shift, leaf):
+        if leaf.hash != self.hash:
+            return _merge(self, leaf, shift), True
+        index = self._index(leaf.key)
+        if index < 0:
+            return _Collision(self.hash, self.items + (leaf,)), True
+        items = self.items[:index] + (leaf,) + self.items[index + 1:]
+        return _Collision(self.hash, items), False
+
+    def dissoc(self, shift, hash_, key):
+        index = self._index(key)
+        if index < 0:
+            raise KeyError(key)
+        items = self.items[:index] + self.items[index + 1:]
+        return items[0] if len(items) == 1 else _Collision(self.hash, items)
+
+    def leaves(self):
+        yield from self.items
+
+
+class _Branch:
+    __slots__ = ('bitmap', 'children')
+
+    def __init__(self, bitmap, children):
+        self.bitmap = bitmap
+        self.children = children
+
+    def _locate(self, shift, hash_):
+        bit = 1 << ((hash_ >> shift) & MASK)
+        return bit, _popcount(self.bitmap & (bit - 1))
+
+    def get(self, shift, hash_, key):
+        bit, index = self._locate(shift, hash_)
+        if not self.bitmap & bit:
+            raise KeyError(key)
+        return self.children[index].get(shift + BITS, hash_, key)
+
+    def assoc(self, shift, leaf):
+        bit, index = self._locate(shift, leaf.hash)
+        children = self.children
+        if not self.bitmap & bit:
+            return _Branch(
+                self.bitmap | bit,
+                children[:index] + (leaf,) + children[index:]), True
+        child, added = children[index].assoc(shift + BITS, leaf)
+        return _Branch(
+            self.bitmap,
+            children[:index] + (child,) + children[index + 1:]), added
+
+    def dissoc(self, shift, hash_, key):
+        bit, index = self._locate(shift, hash_)
+        if not self.bitmap & bit:
+            raise KeyError(key)
+        children = self.children
+        child = children[index].dissoc(shift + BITS, hash_, key)
+        if child is not None:
+            return _Branch(
+                self.bitmap,
+                children[:index] + (child,) + children[index + 1:])
+        bitmap = self.bitmap & ~bit
+        if not bitmap:
+            return None
+        children = children[:index] + children[index + 1:]
+        # A branch holding a single leaf can be collapsed into its parent
+        if len(children) == 1 and not isinstance(children[0], _Branch):
+            return children[0]
+        return _Branch(bitmap, children)
+
+    def leaves(self):
+        for child in self.children:
+            yield from child.leaves()
+
+
+def _merge(node, leaf, shift):
+    """ Build the smallest subtree that holds both node and leaf """
+    if node.hash == leaf.hash:
+        return _Collision(leaf.hash, (node, leaf))
+
+    idx1 = (node.hash >> shift) & MASK
+    idx2 = (leaf.hash >> shift) & MASK
+    if idx1 == idx2:
+        return _Branch(1 << idx1, (_merge(node, leaf, shift + BITS),))
+    children = (node, leaf) if idx1 < idx2 else (leaf, node)
+    return _Branch((1 << idx1) | (1 << idx2), children)
+
+
+class HAMT(Mapping):
+    """
+    Immutable mapping. Use `set` and `delete` to derive new versions.
+    Iteration order is not insertion order.
+    """
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, items=None):
+        self._root = None
+        self._size = 0
+        if items:
+            if isinstance(items, Mapping):
+                items = items.items()
+            root, size = None, 0
+            for key, value in items:
+                root, added = self._assoc(root, key, value)
+                size += added
+            self._root, self._size = root, size
+
+    @classmethod
+    def _make(cls, root, size):
+        res = cls.__new__(cls)
+        res._root = root
+        res._size = size
+        return res
+
+    @staticmethod
+    def _assoc(root, key, value):
+        leaf = _Leaf(_hash(key), key, value)
+        if root is None:
+            return leaf, True
+        return root.assoc(0, leaf)
+
+    def set(self, key, value):
+        """ Return a new map with key set to value """
+        root, added = self._assoc(self._root, key, value)
+        return self._make(root, self._size + added)
+
+    def delete(self, key):
+        """ Return a new map without key. Raises KeyError if not present """
+        if self._root is None:
+            raise KeyError(key)
+        root = self._root.dissoc(0, _hash(key), key)
+        return self._make(root, self._size - 1)
+
+    def copy(self):
+        # Immutable, so sharing is equivalent to copying
+        return self
+
+    def __getitem__(self, key):
+        # Lookups are the hot path, so walk the branches without recursing
+        node, hash_, shift = self._root, _hash(key), 0
+        while type(node) is _Branch:
+            bit = 1 << ((hash_ >> shift) & MASK)
+            if not node.bitmap & bit:
+                raise KeyError(key)
+            node = node.children[_popcount(node.bitmap & (bit - 1))]
+            shift += BITS
+        if node is None:
+            raise KeyError(key)
+        return node.get(shift, hash_, key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        if self._root is not None:
+            for leaf in self._root.leaves():
+                yield leaf.key
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, dict(self.items()))
@@ -1,11 +1,11 @@
-import functools
-import itertools
-from collections import namedtuple, UserDict
-from typing import Dict, List
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 from numpy.linalg import inv
 
+from .hamt import HAMT
+
 ROOT = 'root'
 
 
@@ -39,18 +39,37 @@ def inverse(matrix) -> np.ndarray:
 
 
 class Node(namedtuple('Node', 'parent children transform')):
+    """
+    A node may memoize its transforms to and from the root of the tree (see
+    `world`), which depend on its ancestors, and the bounding box of its
+    subtree (see `bounds`), which depends on its descendants. Since nodes are
+    shared between versions of the tree, changing a node swaps the affected
+    nodes around it for copies that only keep what is still valid.
+    """
     def add(self, child):
-        return self._replace(children=self.children + [child])
+        return self.keep(
+            self._replace(children=self.children + [child]), bounds=False)
 
     def remove(self, child):
         children = self.children.copy()
         children.remove(child)
-        return self._replace(children=children)
+        return self.keep(self._replace(children=children), bounds=False)
 
     def update(self, transform: np.ndarray):
         res = self._replace(transform=transform)
         return res
 
+    def invalidate(self):
+        return self.keep(self._replace(), world=False)
+
+    def keep(self, node, world=True, bounds=True):
+        """ Copy the memoized values that are still valid onto node """
+        if world and '_world' in self.__dict__:
+            node._world = self._world
+        if bounds and '_bounds' in self.__dict__:
+            node._bounds = self._bounds
+        return node
+
     def __eq__(self, operand):
         *values1, transform1 = self
         *values2, transform2 = operand
@@ -58,6 +77,56 @@ class Node(namedtuple('Node', 'parent children transform')):
             (transform1 == transform2).all()
 
 
+class World:
+    """ Memoized transforms between the root and a node, see `world` """
+    __slots__ = ('up', 'down', '_up_inv', '_down_inv')
+
+    def __init__(self, up: np.ndarray, down: np.ndarray) -> None:
+        self.up = up
+        self.down = down
+        self._up_inv = None
+        self._down_inv = None
+
+    @property
+    def up_inv(self) -> np.ndarray:
+        if self._up_inv is None:
+            self._up_inv = inv(self.up)
+        return self._up_inv
+
+    @property
+    def down_inv(self) -> np.ndarray:
+        if self._down_inv is None:
+            self._down_inv = inv(self.down)
+        return self._down_inv
+
+
+class PoseTree(HAMT):
+    """
+    Persistent mapping of tracked objects to their Node. Updating a pose
+    returns a new tree that shares every untouched node with the previous
+    one, so a move costs O(depth) instead of a copy of every tracked well.
+    """
+    __slots__ = ('_preorder',)
+
+    def add(self, *args, **kwargs) -> 'PoseTree':
+        # syntax sugar for chaining add operations
+        return add(self, *args, **kwargs)
+
+
+class PreOrder(namedtuple('PreOrder', 'order levels position end')):
+    """
+    Euler tour (pre-order) index of a pose tree: the subtree of order[i]
+    is order[i:end[i]], and position maps an object to its i.
+    """
+    def subtree(self, obj, level=0):
+        start = self.position[obj]
+        offset = level - self.levels[start] - 1
+        return [
+            (child, self.levels[index] + offset)
+            for index, child in enumerate(
+                self.order[start + 1:self.end[start]], start + 1)]
+
+
 def init():
     return add({}, ROOT, parent=None)
 
@@ -75,51 +144,160 @@ def add(
     state = bind(state)
 
     if parent is not None:
-        state[parent] = state[parent].add(obj)
+        state = state.set(parent, state[parent].add(obj))
+        state = _drop_bounds(state, state[parent].parent)
 
     assert obj not in state, 'object is already being tracked'
 
-    state[obj] = Node(
+    return state.set(obj, Node(
         parent=parent,
         children=[],
         transform=transform.dot(inv(translate(point)))
-    )
+    ))
+
+
+def add_many(
+        state: Dict[object, Node],
+        objs: List,
+        parent=ROOT,
+        points: List[Point] = None,
+        transform=np.identity(4)) -> Dict[object, Node]:
+    """
+    Same as calling `add` for each of objs, with the point in matching
+    position in points, but with the transforms computed in one pass
+    """
+    objs = list(objs)
+    if points is None:
+        points = [Point(0, 0, 0)] * len(objs)
+    if isinstance(transform, list):
+        transform = np.array(transform)
 
+    state = bind(state)
+    assert not any(obj in state for obj in objs), \
+        'object is already being tracked'
+    if not objs:
+        return state
+
+    offsets = np.zeros((len(objs), 4, 4))
+    offsets[:] = np.identity(4)
+    offsets[:, :3, 3] = points
+    transforms = np.matmul(transform, inv(offsets))
+
+    node = state[parent]
+    state = state.set(parent, node.keep(
+        node._replace(children=node.children + objs), bounds=False))
+    state = _drop_bounds(state, node.parent)
+    for obj, obj_transform in zip(objs, transforms):
+        state = state.set(obj, Node(
+            parent=parent, children=[], transform=obj_transform))
     return state
 
 
 def remove(state, obj):
-    state = state.copy()
-    nodes = descendants(state, obj) + [(obj, 0)]
-
-    # remove object references from their parent's children
-    for child, *_ in nodes:
-        parent = state[child].parent
-        if parent in state:
-            state[parent] = state[parent].remove(child)
-        del state[child]
-    return state
+    state = bind(state)
+
+    # descendants go away with obj, so only obj is detached from its parent
+    for child, _ in descendants(state, obj):
+        state = state.delete(child)
+
+    parent = state[obj].parent
+    if parent in state:
+        state = state.set(parent, state[parent].remove(obj))
+        state = _drop_bounds(state, state[parent].parent)
+    return state.delete(obj)
 
 
 def update(state, obj, point: Point, transform=np.identity(4)):
-    state = state.copy()
-    state[obj] = state[obj].update(
+    state = bind(state)
+    preorder = getattr(state, '_preorder', None)
+    subtree = descendants(state, obj)
+
+    node = state[obj]
+    state = state.set(obj, node.keep(node.update(
         transform.dot(inv(translate(point)))
-    )
+    ), world=False))
+    # world transforms memoized below obj are now stale, and so are the
+    # bounding boxes above it
+    for child, _ in subtree:
+        state = state.set(child, state[child].invalidate())
+    state = _drop_bounds(state, node.parent)
+
+    # the shape of the tree did not change
+    if preorder is not None:
+        state._preorder = preorder
     return state
 
 
+def preorder(state) -> PreOrder:
+    """
+    Returns the pre-order index of the tree, built in O(n) on first use and
+    then memoized. `update` carries it over to the new tree since it does not
+    change the tree's shape, while `add` and `remove` leave it to be rebuilt.
+    """
+    state = bind(state)
+    res = getattr(state, '_preorder', None)
+    if res is not None:
+        return res
+
+    order, levels, end = [], [], []
+    stack = [(obj, 0) for obj in state if state[obj].parent is None]
+    open_subtrees = []
+    while stack:
+        obj, level = stack.pop()
+        # close every subtree that obj is not part of
+        while open_subtrees and levels[open_subtrees[-1]] >= level:
+            end[open_subtrees.pop()] = len(order)
+        open_subtrees.append(len(order))
+        order.append(obj)
+        levels.append(level)
+        end.append(None)
+        stack.extend(
+            (child, level + 1) for child in reversed(state[obj].children))
+    for index in open_subtrees:
+        end[index] = len(order)
+
+    res = PreOrder(
+        order=order,
+        levels=levels,
+        position={obj: index for index, obj in enumerate(order)},
+        end=end)
+    state._preorder = res
+    return res
+
+
+def subtree_size(state, obj) -> int:
+    """ Number of descendants of obj, in O(1) once the index is built """
+    index = preorder(state)
+    position = index.position[obj]
+    return index.end[position] - position - 1
+
+
+def is_descendant(state, obj, ancestor) -> bool:
+    """ True if obj is in the subtree below ancestor """
+    index = preorder(state)
+    position, start = index.position[obj], index.position[ancestor]
+    return start < position < index.end[start]
+
+
 def descendants(state, obj, level=0):
     """ Returns a flattened list tuples of DFS traversal of subtree
     from object that contains descendant object and it's depth """
-    return sum([
-        [(child, level)] + descendants(state, child, level + 1)
-        for child in state[obj].children
-    ], [])
+    index = getattr(state, '_preorder', None)
+    if index is not None:
+        return index.subtree(obj, level)
+
+    res = []
+    stack = [(child, level) for child in reversed(state[obj].children)]
+    while stack:
+        obj, level = stack.pop()
+        res.append((obj, level))
+        stack.extend(
+            (child, level + 1) for child in reversed(state[obj].children))
+    return res
 
 
 def has_children(state, obj):
-    return True if len(descendants(state, obj)) > 0 else False
+    return len(state[obj].children) > 0
 
 
 def ascend(state, start, finish=ROOT) -> List[Node]:
@@ -128,34 +306,266 @@ def ascend(state, start, finish=ROOT) -> List[Node]:
     return [start] + ascend(state, start=state[start].parent, finish=finish)
 
 
-def change_base(state, point=Point(0, 0, 0), src=ROOT, dst=ROOT):
+def world(state, obj) -> World:
     """
-    Transforms point from source coordinate system to destination.
-    Point(0, 0, 0) means the origin of the source.
+    Returns the transforms between the root of the tree and obj, folding
+    the transforms of every node below the root. `up` is folded from obj
+    upwards, `down` from the root downwards. Results (and their inverses,
+    once needed) are memoized on the node, so they are only computed again
+    after obj or one of its ancestors has been updated.
+    """
+    node = state[obj]
+    try:
+        return node._world
+    except AttributeError:
+        pass
+
+    if node.parent is None:
+        # The root's own transform never takes part in a change of base
+        up = down = np.identity(4)
+    else:
+        parent = world(state, node.parent)
+        up = node.transform.dot(parent.up)
+        down = parent.down.dot(node.transform)
+    node._world = World(up=up, down=down)
+    return node._world
+
+
+def common_ancestor(state, first, second):
+    if first is ROOT or second is ROOT:
+        return ROOT
+    ancestors = ascend(state, second)
+    return next(node for node in ascend(state, first)
+                if any(node is ancestor for ancestor in ancestors))
+
+
+def _up_inv_many(state, objs, nodes) -> np.ndarray:
+    """
+    Stacked `world(state, obj).up_inv` of objs, whose nodes are given. What
+    is not memoized yet is computed with one batched product and inversion,
+    then memoized.
     """
-    def fold(objects):
-        return functools.reduce(
-            lambda a, b: a.dot(b),
-            [state[key].transform for key in objects],
-            np.identity(4)
-        )
+    stale = [
+        (obj, node) for obj, node in zip(objs, nodes)
+        if getattr(node.__dict__.get('_world'), '_up_inv', None) is None]
+
+    for obj, node in stale:
+        if node.parent is None:
+            world(state, obj).up_inv
+    stale = [(obj, node) for obj, node in stale if node.parent is not None]
+
+    if stale:
+        parent_worlds = {}
+        for _, node in stale:
+            if id(node.parent) not in parent_worlds:
+                parent_worlds[id(node.parent)] = world(state, node.parent)
+        parents = [parent_worlds[id(node.parent)] for _, node in stale]
+        transforms = np.array([node.transform for _, node in stale])
+        ups = np.matmul(transforms, np.array([p.up for p in parents]))
+        downs = np.matmul(np.array([p.down for p in parents]), transforms)
+        up_invs = inv(ups)
+        for (_, node), up, down, up_inv in zip(stale, ups, downs, up_invs):
+            node._world = World(up=up, down=down)
+            node._world._up_inv = up_inv
+
+    return np.array([node._world.up_inv for node in nodes])
+
+
+def change_base_many(
+        state, objs, point=Point(0, 0, 0), dst=ROOT) -> np.ndarray:
+    """
+    Vectorized `change_base` of the same point from each of objs to dst.
+    Returns an (N, 3) array with one row per object.
+    """
+    objs = list(objs)
+    if not objs:
+        return np.zeros((0, 3))
+
+    nodes = [state[obj] for obj in objs]
+    points_in_src = np.matmul(_up_inv_many(state, objs, nodes), (*point, 1))
+
+    # Group objects by their common ancestor with dst. Siblings share it, so
+    # it is looked up once per parent
+    dst_ancestors = {id(obj): obj for obj in ascend(state, dst)}
+    parent_roots = {}
+    groups = {}
+    for index, (obj, node) in enumerate(zip(objs, nodes)):
+        if id(obj) in dst_ancestors:
+            root = obj
+        else:
+            root = parent_roots.get(id(node.parent))
+            if root is None:
+                root = node.parent
+                while id(root) not in dst_ancestors:
+                    root = state[root].parent
+                parent_roots[id(node.parent)] = root
+        groups.setdefault(id(root), (root, []))[1].append(index)
+
+    dst_down = world(state, dst).down
+    res = np.empty((len(objs), 3))
+    for root, indices in groups.values():
+        transform = dst_down
+        if root is not ROOT:
+            root_world = world(state, root)
+            transform = root_world.down_inv.dot(dst_down).dot(root_world.up)
+        res[indices] = points_in_src[indices].dot(transform.T)[:, :-1]
+    return res
+
+
+def relative_transform(state, src, dst) -> np.ndarray:
+    """ The transform `change_base` applies to go from src to dst """
+    src_up_inv, dst_down = world(state, src).up_inv, world(state, dst).down
+
+    root = common_ancestor(state, src, dst)
+    if root is not ROOT:
+        root_world = world(state, root)
+        src_up_inv = root_world.up.dot(src_up_inv)
+        dst_down = root_world.down_inv.dot(dst_down)
+    return dst_down.dot(src_up_inv)
+
+
+def _transform_box(transform, lo, hi):
+    """ Axis aligned box around the 8 transformed corners of a box """
+    corners = np.array([
+        (x, y, z, 1) for x in (lo[0], hi[0])
+        for y in (lo[1], hi[1])
+        for z in (lo[2], hi[2])])
+    corners = corners.dot(transform.T)[:, :-1]
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def bounds(state, obj) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns the (min, max) corners of the axis aligned box around every
+    descendant of obj, in obj's coordinate system, or None if obj has no
+    children. Boxes are memoized on the nodes and built from the boxes of
+    the children, so after a node moves only the boxes of its ancestors
+    are computed again. The box is exact for translations and conservative
+    for any other transform.
+    """
+    node = state[obj]
+    if not node.children:
+        return None
+    try:
+        return node._bounds
+    except AttributeError:
+        pass
+
+    positions = change_base_many(state, node.children, dst=obj)
+    lo, hi = positions.min(axis=0), positions.max(axis=0)
+    for child in node.children:
+        child_bounds = bounds(state, child)
+        if child_bounds is not None:
+            child_lo, child_hi = _transform_box(
+                relative_transform(state, child, obj), *child_bounds)
+            lo, hi = np.minimum(lo, child_lo), np.maximum(hi, child_hi)
+
+    node._bounds = (lo, hi)
+    return node._bounds
+
+
+def _drop_bounds(state, obj):
+    """ Drop the memoized bounding boxes of obj and its ancestors """
+    while obj is not None:
+        node = state[obj]
+        if '_bounds' not in node.__dict__:
+            # ancestors of a node without a box do not have one either
+            break
+        state = state.set(obj, node.keep(node._replace(), bounds=False))
+        obj = node.parent
+    return state
+
 
-    up, down = ascend(state, src), list(reversed(ascend(state, dst)))
+def _segment_hits_box(start, end, lo, hi) -> bool:
+    """ Whether the XY projection of a segment crosses the XY of a box """
+    t0, t1 = 0.0, 1.0
+    for axis in (0, 1):
+        delta = end[axis] - start[axis]
+        if delta == 0:
+            if not lo[axis] <= start[axis] <= hi[axis]:
+                return False
+            continue
+        ta = (lo[axis] - start[axis]) / delta
+        tb = (hi[axis] - start[axis]) / delta
+        t0, t1 = max(t0, min(ta, tb)), min(t1, max(ta, tb))
+        if t0 > t1:
+            return False
+    return True
+
+
+def max_z_along(
+        state, root, start, end, margin=0.0, reach=(0, 0),
+        footprints=None) -> Optional[float]:
+    """
+    Highest point of the descendants of root whose footprint is crossed by
+    the XY segment from start to end (in root's coordinate system), or None
+    if the segment crosses nothing. Labware (any node with a leaf child,
+    such as a well) counts as a solid box, grown by margin in X and Y.
+    Whatever moves along the segment may also stretch from each point p to
+    p + reach (e.g. the nozzles of a multi-channel pipette).
+
+    Without footprints, the XY of a labware's box is the box around the
+    origins of its descendants. footprints maps labware to the (min, max)
+    XY corners of its footprint in its own coordinate system, which are
+    used instead; labware missing from it are counted wherever the segment
+    goes, since how far they reach is not known.
+    """
+    grow_lo = np.array([margin + max(0, reach[0]), margin + max(0, reach[1])])
+    grow_hi = np.array([margin - min(0, reach[0]), margin - min(0, reach[1])])
+    res = None
+    stack = list(state[root].children)
+    while stack:
+        obj = stack.pop()
+        box = bounds(state, obj)
+        if box is None:
+            continue
+        children = state[obj].children
+        labware = any(not state[child].children for child in children)
+        if labware and footprints is not None and obj in footprints:
+            box = _with_footprint(box, footprints[obj])
+        lo, hi = _transform_box(relative_transform(state, obj, root), *box)
+        lo[:2] -= grow_lo
+        hi[:2] += grow_hi
+        # footprints may stick out of the boxes of their ancestors, so those
+        # do not prune the search, and labware without one always count
+        unbounded = footprints is not None and (
+            not labware or obj not in footprints)
+        if not (unbounded or _segment_hits_box(start, end, lo, hi)):
+            continue
+        if labware:
+            res = hi[2] if res is None else max(res, hi[2])
+        else:
+            stack.extend(children)
+    return None if res is None else float(res)
+
+
+def _with_footprint(box, footprint):
+    """ box with its X and Y replaced by those of footprint """
+    (lo_x, lo_y), (hi_x, hi_y) = footprint
+    return (
+        np.array([lo_x, lo_y, box[0][2]]),
+        np.array([hi_x, hi_y, box[1][2]]))
 
-    # Find common prefix. Last item is common root
-    root = [n1 for n1, n2 in zip(reversed(up), down) if n1 is n2].pop()
 
-    # Nodes up to root, EXCLUDING root
-    up = list(itertools.takewhile(lambda node: node is not root, up))
+def change_base(state, point=Point(0, 0, 0), src=ROOT, dst=ROOT):
+    """
+    Transforms point from source coordinate system to destination.
+    Point(0, 0, 0) means the origin of the source.
+    """
+    src_up_inv, dst_down = world(state, src).up_inv, world(state, dst).down
 
-    # Nodes down from root, EXCLUDING root
-    down = list(itertools.dropwhile(lambda node: node is not root, down))[1:]
+    root = common_ancestor(state, src, dst)
+    if root is not ROOT:
+        # Only transforms below the common ancestor take part
+        root_world = world(state, root)
+        src_up_inv = root_world.up.dot(src_up_inv)
+        dst_down = root_world.down_inv.dot(dst_down)
 
     # Point in root's coordinate system
-    point_in_root = inv(fold(up)).dot((*point, 1))
+    point_in_root = src_up_inv.dot((*point, 1))
 
     # Return point in destination's coordinate system
-    return fold(down).dot(point_in_root)[:-1]
+    return dst_down.dot(point_in_root)[:-1]
 
 
 def absolute(state, obj):
@@ -166,24 +576,21 @@ def absolute(state, obj):
 
 
 def max_z(state, root):
-    test = [
-        (obj, Point(*change_base(state, src=obj, dst=root)).z)
-        for obj, _ in descendants(state, root)
-    ]
-
-    # from pprint import pprint
-    # pprint(test, indent=2)
-    m = max([i[1] for i in test])
-    return m
+    box = bounds(state, root)
+    if box is None:
+        raise ValueError('{} has no descendants'.format(root))
+    return float(box[1][2])
 
 
 def stringify(state, root=None):
     if root is None:
         root = ascend(state, next(iter(state)))[-1]
 
+    nodes = [(root, 0)] + descendants(state, root, level=1)
+    positions = change_base_many(state, [obj for obj, _ in nodes], dst=root)
     info = [
-        (obj, level, change_base(state, src=obj, dst=root))
-        for obj, level in [(root, 0)] + descendants(state, root, level=1)]
+        (obj, level, position)
+        for (obj, level), position in zip(nodes, positions)]
 
     return '\n'.join([
         ' ' * level + '{} {}'.format(str(obj), world)
@@ -191,9 +598,7 @@ def stringify(state, root=None):
     ])
 
 
-def bind(state):
-    state = UserDict(state.copy())
-    # add syntax sugar for chaining add operations
-    state.add = functools.partial(add, state)
-
-    return state
+def bind(state) -> PoseTree:
+    if isinstance(state, PoseTree):
+        return state
+    return PoseTree(state)
@@ -6,7 +6,6 @@ from opentrons.trackers.pose_tracker import (
 from opentrons.robot import robot_configs
 from opentrons.data_storage import database
 from opentrons.trackers.pose_tracker import absolute
-from opentrons.config import feature_flags as ff
 
 import logging
 
@@ -46,11 +45,7 @@ def calibrate_container_with_delta(
 
     pose_tree = update(pose_tree, container, new_coordinates)
 
-    if ff.split_labware_definitions():
-        for well in container.wells():
-            well._coordinates = well._coordinates + delta
-    else:
-        container._coordinates = container._coordinates + delta
+    container._coordinates = container._coordinates + delta
 
     if save and new_container_name:
         database.save_new_container(container, new_container_name)
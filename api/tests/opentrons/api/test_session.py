@@ -136,6 +136,25 @@ def test_set_state(run_session):
         run_session.set_state('impossible-state')
 
 
+def test_estimated_duration(virtual_smoothie_env):
+    protocol = '\n'.join([
+        'from opentrons import containers, instruments',
+        'tiprack = containers.load("tiprack-200ul", "1")',
+        'p = instruments.P300_Single(mount="right", tip_racks=[tiprack])',
+        'p.pick_up_tip()',
+        'p.delay(seconds=1.5)',
+        'p.drop_tip(tiprack[0])'])
+    session = Session('estimate', protocol)
+
+    pick_up, delay, drop = [
+        session.command_durations[command['id']]
+        for command in session.commands]
+    assert delay == 1.5
+    assert pick_up > 0 and drop > 0
+    assert session.estimated_duration == pytest.approx(
+        pick_up + delay + drop, abs=0.01)
+
+
 def test_error_append(run_session):
     foo = Exception('Foo')
     bar = Exception('Bar')
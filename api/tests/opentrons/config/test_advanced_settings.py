@@ -0,0 +1,28 @@
+import json
+from unittest import mock
+
+from opentrons.config import advanced_settings as advs, get_config_index
+
+
+def test_settings_are_read_once():
+    settings_file = get_config_index().get('featureFlagFile')
+    assert advs.get_adv_setting('shortFixedTrash') is False
+
+    with mock.patch.object(
+            advs, '_read_settings_file',
+            wraps=advs._read_settings_file) as read:
+        for _ in range(10):
+            assert advs.get_adv_setting('shortFixedTrash') is False
+        assert read.call_count == 0
+
+        advs.set_adv_setting('shortFixedTrash', True)
+        assert advs.get_adv_setting('shortFixedTrash') is True
+        assert advs.get_adv_setting('short-fixed-trash') is True
+
+        # edits made by other processes are picked up too
+        with open(settings_file, 'w') as f:
+            json.dump({'shortFixedTrash': False, 'calibrateToBottom': True},
+                      f)
+        assert advs.get_adv_setting('shortFixedTrash') is False
+        assert advs.get_adv_setting('calibrateToBottom') is True
+        assert advs.get_all_adv_settings()['calibrateToBottom']['value']
@@ -48,6 +48,24 @@ class PlaceableTestCase(unittest.TestCase):
 
         self.assertEqual(next(well), expected)
 
+    def test_next_walks_all_children(self):
+        c = generate_plate(96, 8, (9, 9), (16, 11), 2.5, 40)
+        well, walked = c[0], [c[0]]
+        for _ in range(len(c) - 1):
+            well = next(well)
+            walked.append(well)
+        self.assertListEqual(walked, c.get_children_list())
+        self.assertRaises(IndexError, next, well)
+
+    def test_slice_is_a_view(self):
+        c = generate_plate(96, 8, (9, 9), (16, 11), 2.5, 40)
+        series = c[8:40:2]
+        self.assertIs(series.values._array, c._child_array())
+        self.assertEqual(len(series), 16)
+        self.assertIs(series[1], c[10])
+        self.assertIs(series['E2'], c[12])
+        self.assertWellSeriesEqual(series[2:4], c[12:16:2])
+
     def test_cycle(self):
         c = generate_plate(4, 2, (5, 5), (0, 0), 5)
         cycle_iter = c.cycle()
@@ -137,6 +155,29 @@ class PlaceableTestCase(unittest.TestCase):
 
         self.assertEqual(plate['A1'].coordinates(deck), (105, 215, 0))
 
+    def test_coordinates_follow_moves(self):
+        deck = Deck()
+        slot = Slot()
+        c = generate_plate(4, 2, (5, 5), (0, 0), 5)
+        deck.add(slot, 'A1', (10, 20, 0))
+        slot.add(c, 'plate', (1, 1, 0))
+
+        well = c['B2']
+        self.assertEqual(well.coordinates(), (16, 26, 0))
+        self.assertIs(well.coordinates(), well.coordinates())
+
+        # moving an ancestor invalidates memoized coordinates
+        slot._coordinates = slot._coordinates + (0, 0, 5)
+        self.assertEqual(well.coordinates(), (16, 26, 5))
+        c._coordinates = Vector(0, 0, 0)
+        self.assertEqual(well.coordinates(), (15, 25, 5))
+        self.assertEqual(well.coordinates(c), (5, 5, 0))
+
+        other_slot = Slot()
+        deck.add(other_slot, 'A2', (100, 0, 0))
+        other_slot.add(c, 'plate')
+        self.assertEqual(well.coordinates(), (105, 5, 0))
+
     def test_get_container_name(self):
         deck = Deck()
         slot = Slot()
@@ -68,3 +68,27 @@ def test_invalid_container_name():
         error_type = ValueError
     with pytest.raises(error_type):
         database.load_container("fake_container")
+
+
+def test_save_and_load_container_in_bulk():
+    plate = Container()
+    plate._coordinates = Vector(1, 2, 3)
+    for row in range(16):
+        for col in range(24):
+            well = Well(properties={
+                'depth': 11.5, 'diameter': 3.4, 'total-liquid-volume': 50})
+            plate.add(
+                well, '{}{}'.format(chr(ord('A') + row), col + 1),
+                (col * 4.5, row * 4.5, 0))
+    assert database.save_new_containers([('384-bulk', plate)])
+
+    with database._database() as first, database._database() as second:
+        assert first is second
+        assert first.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+
+    loaded = database.load_container('384-bulk')
+    assert loaded._coordinates == (1, 2, 3)
+    assert [w.get_name() for w in loaded] == [w.get_name() for w in plate]
+    for name in ['A1', 'H13', 'P24']:
+        assert loaded[name].coordinates() == plate[name].coordinates()
+        assert loaded[name].properties == plate[name].properties
@@ -0,0 +1,66 @@
+import os
+import json
+from unittest import mock
+from opentrons.containers.placeable import WellArray
+from opentrons.data_storage import labware_definitions as ldef
+from opentrons.data_storage import labware_bundle, serializers
+file_dir = os.path.abspath(os.path.dirname(__file__))
+
+shared_defn_dir = os.path.join(
+    file_dir, '..', '..', '..', '..', 'shared-data', 'definitions')
+
+
+def _definition(name):
+    with open(os.path.join(shared_defn_dir, name + '.json')) as defn_file:
+        return json.load(defn_file)
+
+
+def test_bundle_round_trip(tmpdir):
+    assert labware_bundle.COLUMNS == WellArray.columns
+    path = str(tmpdir.join('labware-bundle.bin'))
+    labware_bundle.build_bundle(shared_defn_dir, path)
+    bundle = labware_bundle.LabwareBundle.open(path)
+
+    for name in ['384-plate', 'trough-12row', 'tiprack-200ul']:
+        assert name in bundle
+        definition = _definition(name)
+        assert bundle.get(name).to_json() == definition
+
+        from_json = serializers.json_to_labware(definition)
+        from_bundle = serializers.bundled_to_labware(bundle.get(name))
+        assert from_bundle.ordering == from_json.ordering
+        assert serializers.labware_to_json(from_bundle, name) == \
+            serializers.labware_to_json(from_json, name)
+
+    assert 'no-such-labware' not in bundle
+    assert labware_bundle.LabwareBundle.open(
+        str(tmpdir.join('missing.bin'))) is None
+
+
+def test_load_bundled(tmpdir):
+    bundle_path = str(tmpdir.join('labware-bundle.bin'))
+    labware_bundle.build_bundle(shared_defn_dir, bundle_path)
+    user_dir = tmpdir.mkdir('user')
+    offsets = tmpdir.mkdir('offsets')
+    offsets.join('6-well-plate.json').write(
+        json.dumps({'x': 1.5, 'y': -2, 'z': 0.25}))
+
+    with mock.patch.object(ldef, 'bundle_file', return_value=bundle_path), \
+            mock.patch.object(
+                ldef, 'user_defn_dir', return_value=str(user_dir)), \
+            mock.patch.object(
+                ldef, 'offset_dir', return_value=str(offsets)):
+        base = _definition('6-well-plate')['wells']['A1']
+        well = ldef.load_json('6-well-plate')['wells']['A1']
+        assert [well[axis] for axis in 'xyz'] == [
+            round(base['x'] + 1.5, 2),
+            round(base['y'] - 2, 2),
+            round(base['z'] + 0.25, 2)]
+        well = ldef.load_json('6-well-plate', with_offset=False)['wells']['A1']
+        assert well == base
+
+        # user definitions take precedence over the bundle
+        assert ldef.load_bundled('6-well-plate') is not None
+        user_dir.join('6-well-plate.json').write('{}')
+        assert ldef.load_bundled('6-well-plate') is None
+        assert ldef.load_bundled('no-such-labware') is None
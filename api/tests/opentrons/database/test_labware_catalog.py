@@ -0,0 +1,56 @@
+import os
+import json
+import shutil
+from unittest import mock
+from opentrons.data_storage import labware_catalog as catalog
+file_dir = os.path.abspath(os.path.dirname(__file__))
+
+shared_defn_dir = os.path.join(
+    file_dir, '..', '..', '..', '..', 'shared-data', 'definitions')
+
+
+def test_catalog(tmpdir):
+    default_dir = tmpdir.mkdir('default')
+    user_dir = tmpdir.mkdir('user')
+    for name in ['384-plate', 'trough-12row', '6-well-plate']:
+        shutil.copy(
+            os.path.join(shared_defn_dir, name + '.json'), str(default_dir))
+    dirs = {'default': str(default_dir), 'user': str(user_dir)}
+    catalog.clear()
+
+    with mock.patch.object(catalog, '_definition_dir', side_effect=dirs.get):
+        with mock.patch.object(catalog.json, 'load') as load:
+            assert catalog.names('default') == [
+                '384-plate', '6-well-plate', 'trough-12row']
+            assert load.call_count == 0
+
+        plate = catalog.find('384-plate')
+        assert plate.source == 'default'
+        assert plate.well_count == 384
+        assert plate.footprint[0] > 23 * 4.5 and plate.footprint[1] > 15 * 4.5
+        assert catalog.find('trough-12row').well_count == 12
+
+        legacy = catalog.find('96-flat')
+        assert legacy.source == 'legacy'
+        assert legacy.well_count == 96
+        assert catalog.find('no-such-labware') is None
+
+        # nothing is parsed again until files change
+        catalog.catalog()
+        with mock.patch.object(catalog.json, 'load') as load:
+            catalog.catalog()
+            assert load.call_count == 0
+
+        # user definitions take precedence and are picked up once written
+        defn = {'metadata': {'name': '6-well-plate'}, 'ordering': [['A1']],
+                'wells': {'A1': {'x': 1, 'y': 2, 'z': 3, 'depth': 4,
+                                 'diameter': 5}}}
+        user_dir.join('6-well-plate.json').write(json.dumps(defn))
+        os.utime(str(user_dir), ns=(1, 1))
+        entry = catalog.find('6-well-plate')
+        assert entry.source == 'user'
+        assert entry.well_count == 1
+        assert entry.footprint == (6, 7, 7)
+        names = [e.name for e in catalog.catalog()]
+        assert names.count('6-well-plate') == 1
+        assert '96-flat' in names
@@ -1,6 +1,7 @@
 import os
 import json
 import tempfile
+from unittest import mock
 from opentrons.data_storage import labware_definitions as ldef
 from opentrons.data_storage import database
 from opentrons.config import get_config_index
@@ -69,6 +70,50 @@ def test_load_without_offset():
     assert lw['wells']['A1']['z'] == expected_z
 
 
+def test_load_is_cached():
+    lw = ldef._load(
+        defn_dir, user_defn_dir, test_lw_name, offset_dir, with_offset=True)
+    lw['wells']['A1']['x'] = -1
+    lw['ordering'][0].append('C1')
+
+    with mock.patch.object(
+            ldef, '_load_definition', wraps=ldef._load_definition) as load:
+        again = ldef._load(
+            defn_dir, user_defn_dir, test_lw_name, offset_dir, True)
+        assert load.call_count == 0
+    # callers get their own copy
+    assert again['wells']['A1']['x'] == expected_final_x
+    assert again['ordering'][0] == ['A1', 'B1']
+
+    # saving a new offset invalidates the cached definition
+    ldef.save_labware_offset(test_lw_name, {'x': 0, 'y': 0, 'z': 0})
+    lw = ldef._load(
+        defn_dir, user_defn_dir, test_lw_name, offset_dir, with_offset=True)
+    assert lw['wells']['A1']['x'] == expected_x
+
+
+def test_offset_applied_to_labware():
+    lw = database.load_labware(test_lw_name)
+    assert lw._coordinates == (
+        expected_x_offset, expected_y_offset, expected_z_offset)
+    assert lw.wells('A1')._coordinates == (expected_x, expected_y, expected_z)
+    assert lw.wells('A1').coordinates() == (
+        expected_final_x, expected_final_y, expected_final_z)
+    # the definition is shared rather than copied for each labware
+    assert ldef.load_definition(test_lw_name) is \
+        ldef.load_definition(test_lw_name)
+
+    lw._coordinates = lw._coordinates + (1, 2, 3)
+    database.save_labware_offset(lw, test_lw_name)
+    assert ldef.load_offset(test_lw_name) == {
+        'x': expected_x_offset + 1,
+        'y': expected_y_offset + 2,
+        'z': expected_z_offset + 3}
+    again = database.load_labware(test_lw_name)
+    assert again.wells('A1').coordinates() == (
+        expected_final_x + 1, expected_final_y + 2, expected_final_z + 3)
+
+
 def test_list_labware():
     # Minor spot-checks, function is simple. Values will need to be updated if
     # labware is added to library
@@ -107,8 +107,9 @@ def test_fail_set_temp_deck_temperature(monkeypatch):
         nonlocal error_msg
         return error_msg
 
-    serial_communication.write_and_return = types.MethodType(
-        _raise_error, serial_communication)
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return',
+        types.MethodType(_raise_error, serial_communication))
 
     from opentrons.drivers.temp_deck import TempDeck
     temp_deck = TempDeck()
@@ -123,8 +124,9 @@ def test_fail_set_temp_deck_temperature(monkeypatch):
         nonlocal error_msg
         return error_msg
 
-    serial_communication.write_and_return = types.MethodType(
-        _raise_error, serial_communication)
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return',
+        types.MethodType(_raise_error, serial_communication))
 
     res = temp_deck.set_temperature(-9)
     assert res == error_msg
@@ -0,0 +1,123 @@
+from time import monotonic
+
+import pytest
+
+from opentrons.drivers.smoothie_drivers.driver_3_0 import (
+    SmoothieDriver_3_0_0, SmoothieError, HOMED_POSITION)
+from opentrons.drivers.smoothie_drivers.emulator import SmoothieEmulator
+from opentrons.robot import robot_configs
+
+
+@pytest.fixture
+def emulated(monkeypatch):
+    monkeypatch.setenv('ENABLE_VIRTUAL_SMOOTHIE', 'false')
+    emulator = SmoothieEmulator(
+        motion_scale=0,
+        pipettes={'right': {'id': 'P3HSV1', 'model': 'p300_single_v1'}})
+    driver = SmoothieDriver_3_0_0(config=robot_configs.load())
+    driver.connect(emulator.start())
+    yield emulator, driver
+    driver.disconnect()
+    emulator.stop()
+
+
+def test_emulated_smoothie(emulated):
+    emulator, driver = emulated
+    assert not driver.simulating
+    assert driver.get_fw_version() == 'emulator'
+    assert driver.read_pipette_model('right') == 'p300_single_v1'
+    assert driver.read_pipette_model('left') is None
+    driver.write_pipette_id('left', 'P10SV1')
+    assert driver.read_pipette_id('left') == {'pipette_id': 'P10SV1'}
+
+    driver.home()
+    assert emulator.position == driver.position
+    assert emulator.position['X'] == HOMED_POSITION['X']
+    assert all(driver.homed_flags.values())
+    driver.move({'X': 100, 'Y': 50, 'B': 10})
+    driver.update_position()
+    assert driver.position['X'] == 100
+    assert emulator.position['B'] == 10
+    assert not any(driver.switch_state.values())
+
+    # hitting a limit switch halts the board, the driver resets it, homes
+    # the axis and raises
+    with pytest.raises(SmoothieError):
+        driver.move({'Z': HOMED_POSITION['Z'] + 10})
+    assert not emulator.halted
+    assert emulator.position['Z'] == HOMED_POSITION['Z']
+    assert any(line.startswith('M999') for line in emulator.lines)
+
+    # so does an alarm sent between commands, with async I/O
+    driver.set_async_io(True)
+    emulator.alarm('ALARM: Hard limit +Y')
+    for _ in range(100):
+        if driver._alarm:
+            break
+        driver.run_flag.wait(0.01)
+    with pytest.raises(SmoothieError):
+        driver.move({'X': 110})
+    assert emulator.position['X'] == 100
+    driver.move({'X': 120})
+    assert emulator.position['X'] == 120
+
+
+def test_emulated_motion_time(emulated):
+    emulator, driver = emulated
+    driver.home()
+    emulator.motion_scale = 1
+    driver.set_speed(200)
+    start = monotonic()
+    driver.move({'X': HOMED_POSITION['X'] - 200})
+    # 200mm at 200mm/sec, and accelerating and decelerating at 3000mm/sec^2
+    assert monotonic() - start > 1
+
+
+def test_emulated_position_queries(emulated):
+    emulator, driver = emulated
+
+    def position_queries():
+        return sum(line.startswith('M114.2') for line in emulator.lines)
+
+    # the position after homing is read back the first time only
+    driver.home()
+    queries = position_queries()
+    driver.move({'X': 100, 'Y': 50})
+    driver.home()
+    driver.update_position()
+    assert position_queries() == queries
+    assert driver.position == emulator.position
+    driver.home('X')
+    assert position_queries() == queries
+    assert driver.position == emulator.position
+
+    # until the axes may have moved without the driver knowing
+    driver.disengage_axis('B')
+    emulator.position['B'] = 5
+    driver.update_position()
+    assert position_queries() == queries + 1
+    assert driver.position['B'] == 5
+
+    with pytest.raises(SmoothieError):
+        driver.move({'Z': HOMED_POSITION['Z'] + 10})
+    assert position_queries() == queries + 2
+    assert driver.position == emulator.position
+
+
+def test_emulated_fast_homing(emulated):
+    emulator, driver = emulated
+    driver.home()
+    driver.move({'X': 100, 'Y': 50, 'Z': 50, 'A': 50})
+    driver.move({'B': 0, 'C': 0})
+
+    # axes whose position is known are moved near their switch at full
+    # speed first, and independent axes are homed together
+    sent = len(emulator.lines)
+    driver.home()
+    lines = list(emulator.lines)[sent:]
+    homes = [line for line in lines if 'G28.2' in line]
+    assert [line.split('G28.2')[1].split()[0] for line in homes] == \
+        ['AZ', 'BCX', 'Y', 'Y']
+    approach = [line for line in lines if 'G0Z' in line or 'G0A' in line]
+    assert approach and lines.index(approach[0]) < lines.index(homes[0])
+    assert driver.position == emulator.position
@@ -0,0 +1,53 @@
+import pytest
+
+from opentrons.drivers.smoothie_drivers.motion_time import (
+    MotionTimeModel, parse_acceleration, trapezoid_time)
+from opentrons.robot import robot_configs
+
+START = {axis: 0 for axis in 'XYZABC'}
+
+
+def test_parse_acceleration():
+    assert parse_acceleration('M204 S10000 X3000 Y2000') == (
+        10000, {'X': 3000, 'Y': 2000})
+
+
+def test_trapezoid_time():
+    # accelerates for 1s over 50mm, cruises 100mm in 1s, decelerates for 1s
+    assert trapezoid_time(200, 100, 100) == pytest.approx(3)
+    # never gets to full speed: 2 * sqrt(100 / 100)
+    assert trapezoid_time(100, 1000, 100) == pytest.approx(2)
+    assert trapezoid_time(0, 100, 100) == 0
+
+
+def test_move_time():
+    model = MotionTimeModel(
+        {'X': 100, 'Y': 50, 'B': 10}, 1000, {'X': 100, 'Y': 100, 'B': 100})
+    # X is limited by its own acceleration and max speed
+    assert model.move_time(START, {'X': 200}, 400) == pytest.approx(3)
+    # and by the feed rate
+    assert model.move_time(START, {'X': 200}, 50) == pytest.approx(4.5)
+    # a diagonal is limited by the slower Y axis
+    assert model.move_time(START, {'X': 30, 'Y': 40}, 400) == \
+        pytest.approx(trapezoid_time(50, 50 / 0.8, 100 / 0.8))
+    # moves of other axes only use the distance of the one that goes furthest
+    assert model.move_time(START, {'B': 20, 'C': 5}, 400) == \
+        pytest.approx(trapezoid_time(20, 10, 100))
+    assert model.move_time(START, {'X': 0, 'Y': None}, 400) == 0
+
+    assert model.path_time(START, [{'X': 200}, {'X': 0}], 400) == \
+        pytest.approx(6)
+
+
+def test_from_config_and_calibrate():
+    model = MotionTimeModel.from_config(robot_configs.load())
+    assert model.acceleration == 10000
+    assert model.axis_accelerations['Z'] == 1500
+    assert model.max_speeds['X'] == 600
+    assert model.command_time(2) == 2
+
+    fitted = model.calibrate([(1, 1.6), (2, 2.8), (4, 5.2)])
+    assert fitted.scale == pytest.approx(1.2)
+    assert fitted.overhead == pytest.approx(0.4)
+    assert fitted.command_time(3) == pytest.approx(4)
+    assert model.calibrate([]) is model
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+from threading import Thread
+
+import pytest
+import serial
+
+from opentrons.drivers.async_serial import AsyncSerial
+from opentrons.drivers.smoothie_drivers.driver_3_0 import SmoothieError
+from opentrons.drivers.temp_deck import TempDeck
+from opentrons.drivers.serial_communication import SerialNoResponse
+
+
+def _fake_device(responses, delay=0):
+    """
+    Opens a pseudo-terminal with a thread that answers each line written to
+    it with the first matching entry of responses, after delay seconds.
+    Returns the connection, a list of the lines written to it, and the file
+    descriptor to write unsolicited data to
+    """
+    master, slave = os.openpty()
+    lines = []
+
+    def run():
+        buffer = b''
+        while True:
+            try:
+                data = os.read(master, 1024)
+            except OSError:
+                return
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                line = line.strip().decode()
+                if not line:
+                    continue
+                lines.append(line)
+                time.sleep(delay)
+                for prefix, response in responses:
+                    if line.startswith(prefix):
+                        os.write(master, response.encode())
+                        break
+
+    Thread(target=run, daemon=True).start()
+    connection = serial.Serial(os.ttyname(slave), timeout=1)
+    return connection, lines, master
+
+
+async def test_commands_in_order(loop):
+    connection, lines, _ = _fake_device(
+        [('M119', 'X_max:0\r\nok\r\n'), ('', 'ok\r\n')])
+    device = AsyncSerial(connection)
+    # tasks start in the order they are created
+    commands = ['G0X{}'.format(i) for i in range(5)] + ['M119']
+    responses = await asyncio.gather(
+        *[loop.create_task(device.write_and_return(
+            command + '\r\n', 'ok\r\n', 1)) for command in commands],
+        loop=loop)
+    assert responses == [''] * 5 + ['X_max:0']
+    assert lines == commands
+
+    with pytest.raises(SerialNoResponse):
+        await device.write_and_return('G0X1\r\n', 'never\r\n', 0.2)
+    assert await device.write_and_return('G0X1\r\n', 'ok\r\n', 1) == ''
+
+    device.close()
+    connection.close()
+
+
+async def test_unsolicited_lines(loop):
+    connection, lines, master = _fake_device([('', 'ok\r\n')])
+    unsolicited = []
+    device = AsyncSerial(connection, on_unsolicited=unsolicited.append)
+    assert await device.write_and_return('M400\r\n', 'ok\r\n', 1) == ''
+
+    # lines arriving between commands are passed on as soon as they are read
+    os.write(master, b'ALARM: Hard limit +X\r\n\r\nok\r')
+    for _ in range(20):
+        if unsolicited:
+            break
+        await asyncio.sleep(0.05, loop=loop)
+    assert unsolicited == ['ALARM: Hard limit +X']
+    # and do not end up in the response to the next command
+    assert await device.write_and_return('M400\r\n', 'ok\r\n', 1) == ''
+
+    device.close()
+    connection.close()
+
+
+async def test_devices_overlap(loop):
+    slow_connection, _, _ = _fake_device([('', 'ok\r\n')], delay=0.5)
+    fast_connection, _, _ = _fake_device([('', 'ok\r\n')])
+    slow = AsyncSerial(slow_connection)
+    fast = AsyncSerial(fast_connection)
+
+    done = []
+
+    async def command(device, name):
+        await device.write_and_return('M400\r\n', 'ok\r\n', 2)
+        done.append(name)
+
+    await asyncio.gather(
+        command(slow, 'slow'), command(fast, 'fast'), loop=loop)
+    assert done == ['fast', 'slow']
+
+    # the synchronous wrapper shares the queue
+    assert fast.write_and_return_sync('M400\r\n', 'ok\r\n', 1) == ''
+
+    for device in (slow, fast):
+        device.close()
+        device.connection.close()
+
+
+def test_smoothie_async_io(smoothie):
+    connection, lines, _ = _fake_device([
+        ('M119', 'X_max:0 Y_max:0 Z_max:0 A_max:0 B_max:0 C_max:1 Probe: 0 '
+                 'ok\r\nok\r\n'),
+        ('M114.2', 'ok MCS: X:1 Y:2 Z:3 A:4 B:5 C:6\r\nok\r\nok\r\n'),
+        ('G28.6', 'X:1 Y:1 Z:1 A:1 B:1 C:1 ok\r\nok\r\n'),
+        ('', 'ok\r\nok\r\n')])
+    smoothie._connection = connection
+    smoothie.simulating = False
+    smoothie.set_async_io(True)
+    assert smoothie._async_connection
+
+    switches = smoothie.switch_state
+    assert switches['C'] is True and switches['X'] is False
+
+    smoothie.move({'X': 10, 'Y': 20})
+    assert smoothie.position['X'] == 10
+    assert lines[-1].endswith('G0X10Y20 M400')
+
+    smoothie.invalidate_position()
+    smoothie.update_position()
+    assert smoothie.position == {
+        'X': 1, 'Y': 2, 'Z': 3, 'A': 4, 'B': 5, 'C': 6}
+
+    # an alarm sent between commands fails the next one
+    smoothie._handle_unsolicited('ALARM: Hard limit +C')
+    sent = len(lines)
+    with pytest.raises(SmoothieError):
+        smoothie._send_command('M400')
+    assert lines[sent].startswith('M999')
+    assert any('G28.2C' in line for line in lines[sent:])
+    assert not any(line.startswith('M400') for line in lines[sent:])
+
+    smoothie.set_async_io(False)
+    assert smoothie._async_connection is None
+
+
+def test_temp_deck_async_io():
+    connection, lines, _ = _fake_device([
+        ('M105', 'T:none C:25.5 ok\r\nok\r\n'),
+        ('', 'ok\r\nok\r\n')])
+    temp_deck = TempDeck()
+    temp_deck._connection = connection
+    temp_deck.set_async_io(True)
+    assert temp_deck._async_connection
+
+    temp_deck._recursive_update_temperature(1)
+    assert temp_deck.temperature == 25.5
+    assert lines == ['M105']
+    temp_deck.disconnect()
+    assert temp_deck._async_connection is None
@@ -147,10 +147,10 @@ def test_dwell_and_activate_axes(smoothie, monkeypatch):
     smoothie._set_saved_current()
     expected = [
         ['M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400'],
-        ['M907 A0.1 B0.5 C0.5 X1.25 Y1.25 Z0.1 G4P0.005 M400'],
-        ['M907 A0.1 B0.5 C0.05 X0.3 Y1.25 Z0.1 G4P0.005 M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400']
+        ['M907 X0.3 G4P0.005 M400'],
+        ['M907 B0.5 C0.5 X1.25 Y1.25 G4P0.005 M400'],
+        ['M907 C0.05 X0.3 G4P0.005 M400'],
+        ['M907 B0.05 Y0.3 G4P0.005 M400']
     ]
     # from pprint import pprint
     # pprint(command_log)
@@ -210,22 +210,22 @@ def test_plunger_commands(smoothie, monkeypatch):
 
     smoothie.home()
     expected = [
-        ['M907 A0.8 B0.5 C0.5 X0.3 Y0.3 Z0.8 G4P0.005 G28.2.+[ABCZ].+ M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400'],
+        ['M907 A0.8 B0.05 C0.05 X0.3 Y0.3 Z0.8 G4P0.005 G28.2AZ M400'],
+        ['M907 A0.1 Z0.1 G4P0.005 M400'],
         ['M203.1 Y50 M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.8 Z0.1 G4P0.005 G91 G0Y-28 G0Y10 G90 M400'],  # NOQA
+        ['M907 Y0.8 G4P0.005 G91 G0Y-28 G0Y10 G90 M400'],
         ['M203.1 X80 M400'],
-        ['M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 G28.2X M400'],
+        ['M907 B0.5 C0.5 X1.25 Y0.3 G4P0.005 G28.2BCX M400'],
         ['M203.1 A125 B50 C50 X600 Y400 Z125 M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400'],
+        ['M907 B0.05 C0.05 X0.3 G4P0.005 M400'],
         ['M203.1 Y80 M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y1.25 Z0.1 G4P0.005 G28.2Y M400'],
+        ['M907 Y1.25 G4P0.005 G28.2Y M400'],
         ['M203.1 Y8 M400'],
         ['G91 G0Y-3 G90 M400'],
         ['G28.2Y M400'],
         ['G91 G0Y-3 G90 M400'],
-        ['M203.1 A125 B50 C50 X600 Y400 Z125 M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400'],
+        ['M203.1 Y400 M400'],
+        ['M907 Y0.3 G4P0.005 M400'],
         ['M114.2 M400']
     ]
     # from pprint import pprint
@@ -235,7 +235,7 @@ def test_plunger_commands(smoothie, monkeypatch):
 
     smoothie.move({'X': 0, 'Y': 1.123456, 'Z': 2, 'A': 3})
     expected = [
-        ['M907 A0.8 B0.05 C0.05 X1.25 Y1.25 Z0.8 G4P0.005 G0.+ M400']
+        ['M907 A0.8 X1.25 Y1.25 Z0.8 G4P0.005 G0.+ M400']
     ]
     # from pprint import pprint
     # pprint(command_log)
@@ -244,8 +244,8 @@ def test_plunger_commands(smoothie, monkeypatch):
 
     smoothie.move({'B': 2})
     expected = [
-        ['M907 A0.1 B0.5 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 G0B2 M400'],
-        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400']
+        ['M907 A0.1 B0.5 X0.3 Y0.3 Z0.1 G4P0.005 G0B2 M400'],
+        ['M907 B0.05 G4P0.005 M400']
     ]
     # from pprint import pprint
     # pprint(command_log)
@@ -263,13 +263,82 @@ def test_plunger_commands(smoothie, monkeypatch):
         # Set active axes high
         ['M907 A0.8 B0.5 C0.5 X1.25 Y1.25 Z0.8 G4P0.005 G0.+[BC].+ M400'],
         # Set plunger current low
-        ['M907 A0.8 B0.05 C0.05 X1.25 Y1.25 Z0.8 G4P0.005 M400'],
+        ['M907 B0.05 C0.05 G4P0.005 M400'],
     ]
     # from pprint import pprint
     # pprint(command_log)
     fuzzy_assert(result=command_log, expected=expected)
 
 
+def test_move_path(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    command_log = []
+    smoothie._setup()
+    smoothie.home()
+    smoothie.simulating = False
+
+    def write_with_log(command, ack, connection, timeout):
+        command_log.append(command.strip())
+        return driver_3_0.SMOOTHIE_ACK
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_with_log)
+
+    smoothie.move_path([{'A': 100}, {'X': 10, 'Y': 20}, {'A': 110}])
+    expected = [
+        ['M907 A0.8 B0.05 C0.05 X1.25 Y1.25 Z0.1 G4P0.005 G0A100 G0X10Y20 G0A110 M400']  # NOQA
+    ]
+    fuzzy_assert(result=command_log, expected=expected)
+    assert smoothie.position['A'] == 110
+    assert smoothie.position['X'] == 10
+    command_log = []
+
+    # segments that do not move anything are left out
+    smoothie.move_path([{'A': 110}, {'X': 10, 'Y': 25}])
+    expected = [
+        ['M907 A0.1 G4P0.005 G0Y25 M400']
+    ]
+    fuzzy_assert(result=command_log, expected=expected)
+    command_log = []
+
+    smoothie.move_path([{'A': 110}])
+    assert command_log == []
+
+
+def test_move_timeout(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    timeouts = []
+    smoothie.home()
+    smoothie.simulating = False
+
+    def write_with_log(command, ack, connection, timeout):
+        timeouts.append(timeout)
+        return driver_3_0.SMOOTHIE_ACK
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_with_log)
+
+    estimated = smoothie.estimated_time
+    smoothie.move({'X': 10})
+    assert timeouts[-1] == driver_3_0.DEFAULT_MOVEMENT_TIMEOUT
+    assert smoothie.estimated_time > estimated
+    assert len(smoothie.motion_timings) == 1
+
+    # moves expected to take longer get a longer timeout
+    smoothie.set_speed(1)
+    smoothie.move({'X': 100})
+    assert timeouts[-1] == pytest.approx(180, abs=1)
+
+    smoothie.motion_timings.clear()
+    smoothie.motion_timings.extend([(1, 2), (2, 3)])
+    model = smoothie.calibrate_motion_time()
+    assert model.scale == pytest.approx(1)
+    assert model.overhead == pytest.approx(1)
+    assert smoothie.motion_time is model
+
+
 def test_set_active_current(smoothie, monkeypatch):
     from opentrons.drivers import serial_communication
     from opentrons.drivers.smoothie_drivers import driver_3_0
@@ -301,11 +370,11 @@ def test_set_active_current(smoothie, monkeypatch):
     smoothie.home('BC')
     expected = [
         ['M907 A2 B2 C2 X2 Y2 Z2 G4P0.005 G0A0B0C0X0Y0Z0 M400'],  # move all
-        ['M907 A2 B0 C0 X2 Y2 Z2 G4P0.005 M400'],  # disable BC axes
+        ['M907 B0 C0 G4P0.005 M400'],  # disable BC axes
         ['M907 A0 B2 C2 X0 Y0 Z0 G4P0.005 G0B1.3C1.3 G0B1C1 M400'],  # move BC
-        ['M907 A0 B0 C0 X0 Y0 Z0 G4P0.005 M400'],  # disable BC axes
-        ['M907 A0 B0.42 C0.42 X0 Y0 Z0 G4P0.005 G28.2BC M400'],  # home BC
-        ['M907 A0 B0 C0 X0 Y0 Z0 G4P0.005 M400'],  # dwell all axes after home
+        ['M907 B0 C0 G4P0.005 M400'],  # disable BC axes
+        ['M907 B0.42 C0.42 G4P0.005 G28.2BC M400'],  # home BC
+        ['M907 B0 C0 G4P0.005 M400'],  # dwell all axes after home
         ['M114.2 M400']  # update the position
     ]
     # from pprint import pprint
@@ -374,12 +443,9 @@ def test_set_pick_upcurrent(model):
     expected = [
         {'C': 0.5},
         {'C': 0.05},
-        {'A': 0.8},
-        {'A': 0.1},
-        {'X': 1.25, 'Y': 1.25},
-        {'X': 0.3, 'Y': 0.3},
-        {'A': 0.8},
+        {'A': 0.8, 'X': 1.25, 'Y': 1.25},
         {'A': 0.42},
+        {'X': 0.3, 'Y': 0.3},
         {'A': 0.8},
         {'A': 0.1}
     ]
@@ -414,6 +480,8 @@ def test_drop_tip_current(model):
     # Instrument in `model` is configured to right mount, which is the A axis
     # on the Smoothie (see `Robot._actuators`)
     expected = [
+        {'C': 0.456},   # home C, which has not been homed yet
+        {'C': 0.05},    # dwell
         {'C': 0.456},   # make to 'drop_tip' position
         {'C': 0.05},    # dwell
         {'C': 0.123},   # move to 'bottom' position
@@ -639,10 +707,9 @@ def test_clear_limit_switch(virtual_smoothie_env, model, monkeypatch):
         # set current for homing the failed axis (C)
         'M907 A0.1 B0.05 C0.5 X0.3 Y0.3 Z0.1 G4P0.005 G28.2C M400',
         # set current back to idling after home
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400',
+        'M907 C0.05 G4P0.005 M400',
         # update position
-        'M114.2 M400',
-        'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400'
+        'M114.2 M400'
     ]
 
 
@@ -761,6 +828,58 @@ def test_max_speed_change(model, monkeypatch):
     fuzzy_assert(result=command_log, expected=expected)
 
 
+def test_unchanged_settings_not_sent(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    command_log = []
+    smoothie.simulating = False
+
+    def write_with_log(command, ack, connection, timeout):
+        command_log.append(command.strip())
+        return driver_3_0.SMOOTHIE_ACK
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_with_log)
+
+    smoothie.set_speed(100)
+    smoothie.push_speed()
+    smoothie.set_speed(100)
+    smoothie.pop_speed()
+    smoothie.set_axis_max_speed({'X': 600, 'Y': 400})
+    smoothie.set_axis_max_speed({'X': 600, 'Y': 300})
+    smoothie._set_saved_current()
+    smoothie._set_saved_current()
+    smoothie.activate_axes('X')
+    smoothie._set_saved_current()
+    expected = [
+        ['G0F6000 M400'],
+        ['M203.1 X600 Y400 M400'],
+        ['M203.1 Y300 M400'],
+        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 M400'],
+        ['M907 X1.25 G4P0.005 M400']
+    ]
+    fuzzy_assert(result=command_log, expected=expected)
+    command_log.clear()
+
+    # after an error Smoothieware is sent every value again
+    smoothie._reset_from_error()
+    smoothie.set_speed(100)
+    smoothie.set_axis_max_speed({'X': 600})
+    smoothie._set_saved_current()
+    expected = [
+        ['M999 M400'],
+        ['G0F6000 M400'],
+        ['M203.1 X600 M400'],
+        ['M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 M400']
+    ]
+    fuzzy_assert(result=command_log, expected=expected)
+    command_log.clear()
+
+    smoothie.resync_settings()
+    smoothie.set_speed(100)
+    assert command_log == ['G0F6000 M400']
+
+
 def test_pause_in_protocol(model):
     model.robot._driver.simulating = True
 
@@ -905,3 +1024,173 @@ def test_unstick_axes(model):
     # from pprint import pprint
     # pprint(current_log)
     assert current_log == expected
+
+
+class _StreamingSmoothie:
+    """
+    Stands in for the serial connection to Smoothieware, acknowledging each
+    line with 'ok' once it is read
+    """
+    timeout = 1
+    is_open = True
+
+    def __init__(self):
+        self.lines = []
+        self.buffer = b''
+
+    def write(self, data):
+        data = data.decode()
+        for line in data.split('\r\n')[:-1]:
+            self.lines.append(line.strip())
+            if 'C100' in line:
+                self.buffer += b'ALARM: Hard limit +C\r\n'
+            elif 'G28.6' in line:
+                self.buffer += b'X:1 Y:1 Z:1 A:1 B:1 C:1 '
+            elif 'M114.2' in line:
+                self.buffer += b'ok MCS: X:0 Y:0 Z:0 A:0 B:0 C:0\r\n'
+            self.buffer += b'ok\r\n'
+
+    def read_until(self, ack):
+        end = self.buffer.find(ack) + len(ack)
+        if end < len(ack):
+            end = len(self.buffer)
+        response, self.buffer = self.buffer[:end], self.buffer[end:]
+        return response
+
+    def reset_input_buffer(self):
+        self.buffer = b''
+
+    def close(self):
+        pass
+
+
+def test_streaming(smoothie):
+    from opentrons.drivers.smoothie_drivers.driver_3_0 import SmoothieError
+    connection = _StreamingSmoothie()
+    smoothie.simulating = False
+    smoothie._connection = connection
+    smoothie.set_streaming(True, window=2)
+
+    smoothie.move({'X': 10})
+    smoothie.move({'X': 20})
+    smoothie.move({'X': 30})
+    # moves are sent without M400 and only read back to keep the window
+    assert len(smoothie._streamed_commands) == 2
+    assert [line for line in connection.lines if line] == [
+        'M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 G0X10',
+        'G0X20',
+        'G0X30']
+
+    # commands that wait for motion are synchronization points
+    smoothie.delay(0)
+    assert smoothie._streamed_commands == []
+    assert connection.lines[-2:] == ['G4P0 M400', '']
+    assert connection.buffer == b''
+
+    # and so is pausing
+    smoothie.move({'X': 35})
+    smoothie.pause()
+    assert smoothie._streamed_commands == []
+    assert connection.lines[-3:] == ['G0X35', 'M400', '']
+    smoothie.resume()
+
+    # an alarm from a streamed move is raised once it is read
+    smoothie.move({'C': 100})
+    with pytest.raises(SmoothieError):
+        smoothie.delay(0)
+    assert 'M999 M400' in connection.lines
+    assert smoothie._streamed_commands == []
+
+    smoothie.set_streaming(False)
+    smoothie.move({'X': 40})
+    assert connection.lines[-2].endswith('G0X40 M400')
+
+
+def test_plan_homing():
+    from opentrons.drivers.smoothie_drivers.driver_3_0 import _plan_homing
+    assert _plan_homing('ZABCXY') == ['ZA', 'XBC', 'Y']
+    assert _plan_homing('ZAXY') == ['ZA', 'X', 'Y']
+    assert _plan_homing('ZAB') == ['ZAB']
+    assert _plan_homing('C') == ['C']
+    assert _plan_homing('ZAY') == ['ZA', 'Y']
+
+
+def test_move_homes_flagged_axes_first(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    smoothie.home()
+    smoothie.simulating = False
+    command_log = []
+
+    def write_with_log(command, ack, connection, timeout):
+        command_log.append(command.strip())
+        return driver_3_0.SMOOTHIE_ACK
+
+    def _parse_position_response(arg):
+        return smoothie.position
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_with_log)
+    monkeypatch.setattr(
+        driver_3_0, '_parse_position_response', _parse_position_response)
+
+    # Smoothieware has the active current of Z from this move
+    smoothie.move({'Z': 100})
+    smoothie.homed_flags['Z'] = False
+    command_log.clear()
+
+    smoothie.move({'Z': 150}, home_flagged_axes=True)
+    home = next(i for i, c in enumerate(command_log) if 'G28.2Z' in c)
+    move = next(i for i, c in enumerate(command_log) if 'G0Z150' in c)
+    assert home < move
+    # the move sets the current homing rested the axis at
+    assert 'Z0.8' in command_log[move]
+
+
+def test_stream_ack_timeout(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    connection = _StreamingSmoothie()
+    smoothie.simulating = False
+    smoothie._connection = connection
+    smoothie.set_streaming(True)
+    timeouts = []
+    read_response = serial_communication.read_response
+
+    def read_with_timeout(ack, serial_connection, timeout):
+        timeouts.append(timeout)
+        return read_response(ack, serial_connection, timeout)
+
+    monkeypatch.setattr(
+        serial_communication, 'read_response', read_with_timeout)
+
+    smoothie.move({'X': 10})
+    # slow streamed moves before it extend the wait for its 'ok'
+    smoothie._streamed_motion_end += 100
+    smoothie._flush_stream()
+    assert timeouts[0] > 100
+    smoothie.set_streaming(False)
+
+
+def test_streamed_serial_stats(smoothie):
+    from opentrons.drivers import serial_stats
+    connection = _StreamingSmoothie()
+    connection.port = '/dev/streaming-stats'
+    smoothie.simulating = False
+    smoothie._connection = connection
+    smoothie.set_streaming(True)
+
+    serial_stats.reset()
+    smoothie.move({'X': 10})
+    smoothie.move({'X': 20})
+    smoothie._flush_stream()
+    smoothie.set_streaming(False)
+
+    # streamed moves are counted once their 'ok' is read
+    device = serial_stats.stats()['/dev/streaming-stats']
+    serial_stats.reset()
+    assert sorted(device) == ['G0', 'M907 G4 G0']
+    for verb in device.values():
+        assert verb['count'] == 1
+        assert verb['bytes_received'] == len('ok\r\n')
+        assert sum(
+            bucket['count'] for bucket in verb['latency']['histogram']) == 1
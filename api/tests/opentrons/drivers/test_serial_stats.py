@@ -0,0 +1,82 @@
+import pytest
+
+from opentrons.drivers import serial_communication, serial_stats
+from opentrons.drivers.temp_deck import TempDeck
+
+
+class _FakeConnection:
+    def __init__(self, port, responses):
+        self.port = port
+        self.timeout = 1
+        self.responses = responses
+
+    def write(self, data):
+        pass
+
+    def read_until(self, ack):
+        return self.responses.pop(0)
+
+    def reset_input_buffer(self):
+        pass
+
+
+@pytest.fixture
+def stats():
+    serial_stats.reset()
+    yield
+    serial_stats.reset()
+
+
+def test_command_verb():
+    assert serial_stats.command_verb(
+        'M907 A0.1 B0.05 G4P0.005 G0X10 G0Y20 M400\r\n\r\n') == 'M907 G4 G0'
+    assert serial_stats.command_verb('G0F2400 M400\r\n\r\n') == 'G0'
+    assert serial_stats.command_verb('M114.2 M400\r\n\r\n') == 'M114.2'
+    assert serial_stats.command_verb(' M400\r\n\r\n') == 'M400'
+    assert serial_stats.command_verb('version') == 'version'
+    assert serial_stats.command_verb('\r\n') == '(blank)'
+
+
+def test_write_and_return(stats):
+    connection = _FakeConnection(
+        '/dev/fake', [b'ok\r\nok\r\n', b'ok MCS: X:1\r\nok\r\nok\r\n', b''])
+    serial_stats.name_device(connection, 'smoothie')
+    for command in ['G0X1 M400\r\n\r\n', 'M114.2 M400\r\n\r\n']:
+        serial_communication.write_and_return(
+            command, 'ok\r\nok\r\n', connection)
+    with pytest.raises(serial_communication.SerialNoResponse):
+        serial_communication.write_and_return(
+            'G0X2 M400\r\n\r\n', 'ok\r\nok\r\n', connection)
+
+    device = serial_stats.stats()['smoothie /dev/fake']
+    assert device['G0']['count'] == 2
+    assert device['G0']['bytes_sent'] == 2 * len('G0X1 M400\r\n\r\n')
+    assert device['G0']['bytes_received'] == len(b'ok\r\nok\r\n')
+    assert device['G0']['no_responses'] == 1
+    assert device['M114.2']['bytes_received'] == len(
+        b'ok MCS: X:1\r\nok\r\nok\r\n')
+    histogram = device['M114.2']['latency']['histogram']
+    assert sum(bucket['count'] for bucket in histogram) == 1
+    assert histogram[-1]['le'] is None
+
+
+def test_retries_and_recoveries(stats, monkeypatch):
+    failures = [serial_communication.SerialNoResponse('No response')]
+
+    def write_and_return(command, ack, connection, timeout):
+        if failures:
+            raise failures.pop()
+        return 'T:none C:25'
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_and_return)
+    temp_deck = TempDeck()
+    temp_deck._connection = _FakeConnection('/dev/temp', [])
+    serial_stats.name_device(temp_deck._connection, 'temp-deck')
+    temp_deck._connection.close = temp_deck._connection.open = lambda: None
+
+    assert temp_deck._send_command('M105') == 'T:none C:25'
+    temp_deck._send_command('M105')
+    m105 = serial_stats.stats()['temp-deck /dev/temp']['M105']
+    assert m105['retries'] == 1
+    assert m105['recoveries'] == 1
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import timeit
+import tracemalloc
+
+from opentrons.containers.placeable import Container, Well
+from opentrons.data_storage import serializers
+
+log = logging.getLogger(__name__)
+
+file_dir = os.path.abspath(os.path.dirname(__file__))
+definition_file = os.path.join(
+    file_dir, '..', '..', '..', '..',
+    'shared-data', 'definitions', '384-plate.json')
+
+
+def _well_by_well(json_defn):
+    """ Build the labware from one standalone Well per definition entry """
+    container = Container()
+    for name, json_well in json_defn['wells'].items():
+        properties = dict(json_well)
+        coordinates = tuple(properties.pop(axis) for axis in 'xyz')
+        container.add(Well(properties=properties), name, coordinates)
+    container.ordering = json_defn['ordering']
+    return container
+
+
+def _measure(load, json_defn, repeat=5, number=10):
+    load_time = min(timeit.repeat(
+        lambda: load(json_defn), repeat=repeat, number=number)) / number
+    tracemalloc.start()
+    container = load(json_defn)  # NOQA
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return load_time, memory
+
+
+def test_384_plate_is_array_backed():
+    """
+    Benchmark: loading the 384-plate definition into a struct-of-arrays
+    container against one standalone Well per entry
+    """
+    with open(definition_file) as f:
+        json_defn = json.load(f)
+
+    array_time, array_memory = _measure(
+        serializers.json_to_labware, json_defn)
+    wells_time, wells_memory = _measure(_well_by_well, json_defn)
+    log.info('384-plate: {:.2f}ms / {}KiB array backed, '
+             '{:.2f}ms / {}KiB well by well'.format(
+                 array_time * 1e3, array_memory // 1024,
+                 wells_time * 1e3, wells_memory // 1024))
+    assert array_memory < wells_memory / 2
+
+    plate = serializers.json_to_labware(json_defn)
+    expected = _well_by_well(json_defn)
+    for well, expected_well in zip(plate, expected):
+        assert well.get_name() == expected_well.get_name()
+        assert well.coordinates() == expected_well.coordinates()
+        assert well.top() == (well, expected_well.top()[1])
+        assert well.bottom(1) == (well, expected_well.bottom(1)[1])
+        assert well.center() == expected_well.center()
+        assert well.properties == expected_well.properties
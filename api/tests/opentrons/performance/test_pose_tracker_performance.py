@@ -0,0 +1,52 @@
+import logging
+import timeit
+
+from opentrons.containers import load as containers_load
+from opentrons.trackers import pose_tracker
+
+log = logging.getLogger(__name__)
+
+SLOTS = ['1', '2', '3', '4', '5', '6']
+
+
+def _move_time(robot, repeat=5, number=200):
+    mover = robot._actuators['left']['carriage']
+
+    def move():
+        robot.poses = mover.move(robot.poses, z=100)
+
+    return min(timeit.repeat(move, repeat=repeat, number=number)) / number
+
+
+def test_move_overhead_is_flat(robot):
+    """
+    Benchmark: the cost of a move should not depend on the number of wells
+    tracked by the pose tree, since each update only copies O(depth) nodes
+    """
+    robot.home()
+    empty_deck = _move_time(robot)
+
+    for slot in SLOTS:
+        containers_load(robot, '384-plate', slot)
+    tracked = len(robot.poses)
+    assert tracked > 384 * len(SLOTS)
+
+    full_deck = _move_time(robot)
+    log.info(
+        'move: {:.1f}us with empty deck, {:.1f}us with {} tracked'.format(
+            empty_deck * 1e6, full_deck * 1e6, tracked))
+    assert full_deck < empty_deck * 2
+
+
+def test_update_keeps_previous_versions(robot):
+    for slot in SLOTS[:2]:
+        containers_load(robot, '384-plate', slot)
+    mover = robot._actuators['left']['carriage']
+
+    before = robot.poses
+    z_before = pose_tracker.absolute(before, mover)[2]
+    after = pose_tracker.update(before, mover, pose_tracker.Point(0, 0, 10))
+
+    assert pose_tracker.absolute(before, mover)[2] == z_before
+    assert pose_tracker.absolute(after, mover)[2] == 10
+    assert len(before) == len(after)
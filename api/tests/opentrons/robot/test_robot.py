@@ -103,8 +103,10 @@ def test_create_arc(virtual_smoothie_env):
     trash_height = robot.max_placeable_height_on_deck(robot.fixed_trash)
     assert robot.max_deck_height() == trash_height
 
+    # the trash is not under the path, so the arc only clears the plate
     res = robot._create_arc(p300, (0, 0, 0), plate[0])
-    arc_top = robot.max_deck_height() + TIP_CLEARANCE_DECK
+    arc_top = robot.max_placeable_height_on_deck(plate) + TIP_CLEARANCE_DECK
+    assert arc_top < trash_height
     expected = [
         {'z': arc_top},
         {'x': 0, 'y': 0},
@@ -137,6 +139,73 @@ def test_create_arc(virtual_smoothie_env):
     assert res == expected
 
 
+def test_arc_follows_path(virtual_smoothie_env):
+    from opentrons.robot.robot import TIP_CLEARANCE_DECK
+    robot.reset()
+
+    p300 = instruments.P300_Single(mount='left')
+    plate = containers_load(robot, '96-flat', '1')
+    plate2 = containers_load(robot, '96-flat', '3')
+    plate_height = robot.max_placeable_height_on_deck(plate)
+    trash_height = robot.max_placeable_height_on_deck(robot.fixed_trash)
+
+    robot.move_to(plate[0], p300)
+    target = pose_tracker.absolute(robot.poses, plate2[0])
+    assert robot.max_deck_height_along(
+        pose_tracker.absolute(robot.poses, p300), target) == plate_height
+    res = robot._create_arc(p300, target, plate2[0])
+    assert res[0] == {'z': plate_height + TIP_CLEARANCE_DECK}
+
+    # moving towards the trash has to clear it
+    target = pose_tracker.absolute(robot.poses, robot.fixed_trash[0])
+    res = robot._create_arc(p300, target, robot.fixed_trash[0])
+    assert res[0] == {'z': min(
+        trash_height + TIP_CLEARANCE_DECK, p300._max_deck_height())}
+
+
+def test_arc_over_empty_deck(virtual_smoothie_env):
+    from opentrons.robot.robot import TIP_CLEARANCE_DECK
+    robot.reset()
+
+    p300 = instruments.P300_Single(mount='left')
+    robot.move_to((robot._deck['4'], (10, 10, 1)), p300)
+    slot = pose_tracker.absolute(robot.poses, robot._deck['5'])
+    target = (slot[0] + 10, slot[1] + 10, 1)
+    assert robot._max_height_under_path(p300, target) is None
+    res = robot._create_arc(p300, target)
+    assert res[0] == {'z': TIP_CLEARANCE_DECK}
+
+
+def test_arc_clears_labware_beside_path(virtual_smoothie_env):
+    from opentrons.robot.robot import TIP_CLEARANCE_DECK
+    robot.reset()
+
+    p300 = instruments.P300_Single(mount='left')
+    rack = containers_load(robot, 'opentrons-tuberack-50ml', '2')
+    rack_height = robot.max_placeable_height_on_deck(rack)
+    slot_2 = pose_tracker.absolute(robot.poses, robot._deck['2'])
+    slot_9 = pose_tracker.absolute(robot.poses, robot._deck['9'])
+    back_of_slot_2 = slot_2[1] + robot._deck['2'].y_size()
+
+    # along slots 4 to 6, 5 mm behind the slot the rack is in
+    robot.move_to((robot._deck['4'], (10, 5, 1)), p300)
+    target = (slot_9[0] + 100, back_of_slot_2 + 5, 1)
+    assert robot._max_height_under_path(p300, target) == rack_height
+    res = robot._create_arc(p300, target)
+    assert res[0] == {'z': min(
+        rack_height + TIP_CLEARANCE_DECK, p300._max_deck_height())}
+
+    # 10 mm into its slot, short of its wells
+    robot.move_to((robot._deck['1'], (60, 45, 1)), p300)
+    target = (slot_2[0] + 10, slot_2[1] + 45, 1)
+    assert robot._max_height_under_path(p300, target) == rack_height
+
+    # but not a row of slots further
+    robot.move_to((robot._deck['7'], (10, 45, 1)), p300)
+    target = (slot_9[0] + 100, slot_9[1] + 45, 1)
+    assert robot._max_height_under_path(p300, target) is None
+
+
 def test_robot_move_to(virtual_smoothie_env):
     robot.reset()
     robot.home()
@@ -150,6 +219,28 @@ def test_robot_move_to(virtual_smoothie_env):
     ).all()
 
 
+def test_arc_move_is_one_driver_command(virtual_smoothie_env):
+    robot.reset()
+    robot.home()
+    p300 = instruments.P300_Single(mount='right')
+    plate = containers_load(robot, '96-flat', '1')
+    robot.move_to(plate[0], p300)
+
+    with mock.patch.object(
+            robot._driver, 'move_path',
+            wraps=robot._driver.move_path) as move_path, \
+            mock.patch.object(robot._driver, 'move') as move:
+        robot.move_to(plate[95], p300)
+        assert move_path.call_count == 1
+        assert move.call_count == 0
+        assert len(move_path.call_args[0][0]) == 3
+
+    assert isclose(
+        pose_tracker.absolute(robot.poses, p300),
+        pose_tracker.absolute(robot.poses, plate[95])
+    ).all()
+
+
 def test_move_head(virtual_smoothie_env):
     robot.reset()
     robot.move_head(x=100, y=0)
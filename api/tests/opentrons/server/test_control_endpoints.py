@@ -206,6 +206,27 @@ async def test_disengage_axes(
     assert json.loads(result2) == alltrue
 
 
+async def test_serial_stats(virtual_smoothie_env, loop, test_client):
+    from opentrons.drivers import serial_stats
+    app = init(loop)
+    cli = await loop.create_task(test_client(app))
+
+    class Connection:
+        port = '/dev/stats-test'
+
+    serial_stats.reset()
+    serial_stats.record(Connection(), 'M119 M400\r\n\r\n', 20, 0.015)
+    res = await cli.get('/debug/serial-stats?reset=true')
+    assert res.status == 200
+    stats = json.loads(await res.text())['/dev/stats-test']['M119']
+    assert stats['count'] == 1
+    assert stats['bytes_received'] == 20
+    assert {'le': 0.02, 'count': 1} in stats['latency']['histogram']
+
+    res = await cli.get('/debug/serial-stats')
+    assert json.loads(await res.text()) == {}
+
+
 async def test_robot_info(virtual_smoothie_env, loop, test_client):
     app = init(loop)
     cli = await loop.create_task(test_client(app))
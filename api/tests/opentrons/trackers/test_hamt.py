@@ -0,0 +1,62 @@
+import random
+
+import pytest
+from opentrons.trackers.hamt import HAMT
+
+
+class Colliding:
+    """ Key with a deliberately poor hash to exercise collision nodes """
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return self.value % 3
+
+    def __eq__(self, other):
+        return isinstance(other, Colliding) and other.value == self.value
+
+
+def test_set_and_delete_do_not_mutate():
+    empty = HAMT()
+    one = empty.set('a', 1)
+    two = one.set('b', 2)
+    replaced = two.set('a', 10)
+
+    assert empty == {}
+    assert one == {'a': 1}
+    assert two == {'a': 1, 'b': 2}
+    assert replaced == {'a': 10, 'b': 2}
+    assert len(replaced) == 2
+
+    removed = replaced.delete('a')
+    assert removed == {'b': 2}
+    assert replaced == {'a': 10, 'b': 2}
+
+    with pytest.raises(KeyError):
+        removed.delete('a')
+    with pytest.raises(KeyError):
+        empty['a']
+
+
+def test_matches_dict():
+    rand = random.Random(42)
+    keys = [rand.randint(-10**12, 10**12) for _ in range(200)] \
+        + [Colliding(i) for i in range(20)] \
+        + ['key-{}'.format(i) for i in range(50)]
+
+    expected = {}
+    state = HAMT()
+    for _ in range(2000):
+        key = rand.choice(keys)
+        if key in expected and rand.random() < 0.4:
+            del expected[key]
+            state = state.delete(key)
+        else:
+            value = rand.random()
+            expected[key] = value
+            state = state.set(key, value)
+        assert len(state) == len(expected)
+
+    assert state == expected
+    assert set(state) == set(expected)
+    assert all((key in state) == (key in expected) for key in keys)
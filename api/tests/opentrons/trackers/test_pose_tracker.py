@@ -1,7 +1,9 @@
 import pytest
 from opentrons.trackers.pose_tracker import (
     Point, Node, add, descendants, ascend, change_base, max_z,
-    update, remove, translate, init, ROOT, has_children
+    update, remove, translate, init, ROOT, has_children, world,
+    add_many, change_base_many, preorder, subtree_size, is_descendant,
+    bounds, max_z_along
 )
 from numpy import isclose, array, ndarray
 
@@ -84,6 +86,28 @@ def test_descendants(state):
     assert descendants(state, '1-1-1') == []
 
 
+def test_preorder(state):
+    expected = descendants(state, '1', level=2)
+    index = preorder(state)
+    assert index.order == [
+        ROOT, '1', '1-1', '1-1-1', '1-2', '2', '2-1', '2-2']
+    assert descendants(state, '1', level=2) == expected
+    assert descendants(state, '2-2') == []
+
+    assert subtree_size(state, ROOT) == 7
+    assert subtree_size(state, '1') == 3
+    assert subtree_size(state, '1-1-1') == 0
+
+    assert is_descendant(state, '1-1-1', '1')
+    assert is_descendant(state, '2-2', ROOT)
+    assert not is_descendant(state, '1', '1')
+    assert not is_descendant(state, '2-1', '1')
+
+    # moves keep the index, changing the shape of the tree does not
+    assert preorder(update(state, '1', Point(0, 0, 0))) is index
+    assert subtree_size(remove(state, '1-1'), '1') == 1
+
+
 def test_has_children(state):
     assert not has_children(state, '2-2')
     assert has_children(state, '2')
@@ -130,11 +154,98 @@ def test_max_z(state):
     assert max_z(state, '1') == 23.0
 
 
+def test_bounds_follow_updates(state):
+    lo, hi = bounds(state, ROOT)
+    assert (lo == (-22, -24, -26)).all()
+    assert (hi == (22, 24, 26)).all()
+    assert bounds(state, '1-1-1') is None
+
+    # moving a node only rebuilds the boxes of its ancestors
+    new_state = update(state, '1-1-1', Point(0, 0, 30))
+    assert new_state['2']._bounds is state['2']._bounds
+    assert max_z(new_state, ROOT) == 46
+    assert max_z(state, ROOT) == 26
+
+    new_state = add(new_state, '2-3', parent='2', point=Point(0, 0, 60))
+    assert max_z(new_state, ROOT) == 57
+    assert max_z(remove(new_state, '2'), ROOT) == 46
+
+
+def test_max_z_along():
+    state = init() \
+        .add('slot-1', point=Point(0, 0, 0)) \
+        .add('slot-2', point=Point(100, 0, 0)) \
+        .add('plate', parent='slot-1') \
+        .add('A1', parent='plate', point=Point(10, 10, 15)) \
+        .add('B1', parent='plate', point=Point(20, 20, 15)) \
+        .add('tiprack', parent='slot-2') \
+        .add('tip-A1', parent='tiprack', point=Point(10, 10, 60)) \
+        .add('tip-B1', parent='tiprack', point=Point(20, 20, 60))
+
+    assert max_z_along(state, ROOT, (15, 15), (15, 100)) == 15
+    assert max_z_along(state, ROOT, (15, 15), (115, 15)) == 60
+    assert max_z_along(state, ROOT, (50, 50), (50, 100)) is None
+    assert max_z_along(state, ROOT, (25, 0), (25, 100)) is None
+    assert max_z_along(state, ROOT, (25, 0), (25, 100), margin=5) == 15
+
+    # a footprint reaching past the wells, and one labware without any
+    footprints = {'plate': ((0, 0), (30, 30))}
+    assert max_z_along(
+        state, ROOT, (25, 0), (25, 100), footprints=footprints) == 60
+    footprints['tiprack'] = ((0, 0), (30, 30))
+    assert max_z_along(
+        state, ROOT, (25, 0), (25, 100), footprints=footprints) == 15
+    assert max_z_along(
+        state, ROOT, (50, 50), (50, 100), footprints=footprints) is None
+
+
+def test_change_base_many(state):
+    objs = [ROOT, '1', '1-1', '1-1-1', '1-2', '2', '2-1', '2-2']
+    for dst in objs:
+        expected = [change_base(state, src=obj, dst=dst) for obj in objs]
+        assert isclose(
+            change_base_many(state, objs, dst=dst), expected).all()
+
+    point = Point(1, 1, 1)
+    assert isclose(
+        change_base_many(state, ['1-1', '2-1'], point=point, dst='1'),
+        [change_base(state, point, src='1-1', dst='1'),
+         change_base(state, point, src='2-1', dst='1')]).all()
+    assert change_base_many(state, [], dst='1').shape == (0, 3)
+
+
+def test_add_many(state):
+    points = [Point(1, 1, 1), Point(2, 2, 2)]
+    new_state = add_many(state, ['2-3', '2-4'], parent='2', points=points)
+    expected = add(state, '2-3', parent='2', point=points[0]) \
+        .add('2-4', parent='2', point=points[1])
+    assert new_state == expected
+    assert new_state['2'].children == ['2-1', '2-2', '2-3', '2-4']
+
+    with pytest.raises(AssertionError):
+        add_many(state, ['2-1'], parent='2')
+
+
 def test_update(state):
     state = update(state, '1-1', Point(0, 0, 0))
     assert (change_base(state, src='1-1-1') == (1, 2, 3)).all()
 
 
+def test_update_invalidates_subtree(state):
+    # memoize world transforms for the whole tree
+    assert (change_base(state, src='1-1-1') == (12, 14, 16)).all()
+    assert (change_base(state, src='2-1') == (-12, -14, -16)).all()
+
+    new_state = update(state, '1', Point(0, 0, 0))
+    assert (change_base(new_state, src='1-1-1') == (11, 12, 13)).all()
+    assert (change_base(new_state, src='1-1', dst='2-1') == (23, 26, 29)) \
+        .all()
+    # nodes outside of the updated subtree keep their memoized transforms
+    assert world(new_state, '2-1') is world(state, '2-1')
+    # and the previous version of the tree is untouched
+    assert (change_base(state, src='1-1-1') == (12, 14, 16)).all()
+
+
 def test_remove(state):
     state = remove(state, '1')
     assert {*state} == {'2-1', '2', '2-2', ROOT}